@@ -51,6 +51,7 @@ __all__ = ['Expression',
            'DetRootN_Exp',
            'Sum_k_Largest_Exp',
            'Variable',
+           'Parameter',
            'Set',
            'Ball',
            'Truncated_Simplex'
@@ -59,6 +60,112 @@ __all__ = ['Expression',
 global INFINITY
 INFINITY = 1e16
 
+
+def _term_string(tstring):
+    """string appended to the string of an affine expression
+    when an affine expression with string ``tstring`` is added to it"""
+    if tstring in ['0', '', '|0|', '0.0', '|0.0|']:
+        return ''
+    if tstring[0] == '-':
+        import re
+        if ('+' not in tstring[1:]) and (
+                '-' not in tstring[1:]):
+            return ' ' + tstring
+        elif (tstring[1] == '(') and (
+                re.search('.*\)((\[.*\])|(.T))*$', tstring)):  # a group in a (...)
+            return ' ' + tstring
+        else:
+            return ' + (' + tstring + ')'
+    else:
+        return ' + ' + tstring
+
+
+def _neg_string(sstring):
+    """string of the opposite of an expression with string ``sstring``"""
+    if sstring == '':
+        return sstring
+    if sstring[0] == '-':
+        import re
+        if ('+' not in sstring[1:]) and ('-' not in sstring[1:]):
+            return sstring[1:]
+        elif (sstring[1] == '(') and (
+                re.search('.*\)((\[.*\])|(.T))*$', sstring)):  # a group in a (...)
+            if sstring[-1] == ')':
+                return sstring[2:-1]  # we remove the parenthesis
+            else:
+                return sstring[1:]  # we keep the parenthesis
+        else:
+            return '-(' + sstring + ')'
+    else:
+        if ('+' in sstring) or ('-' in sstring):
+            return '-(' + sstring + ')'
+        else:
+            return '-' + sstring
+
+
+def _prod_string(lstring, rstring):
+    """string of the product of two expressions with strings
+    ``lstring`` and ``rstring``"""
+    if ('+' in lstring) or ('-' in lstring):
+        lstring = '( ' + lstring + ' )'
+    if ('+' in rstring) or ('-' in rstring):
+        rstring = '( ' + rstring + ' )'
+    return lstring + '*' + rstring
+
+
+def _string_mode(exp):
+    """value of the option ``strings`` of the problem
+    to which the variables of ``exp`` belong
+    (``True`` for constant expressions)"""
+    for var in getattr(exp, 'factors', ()):
+        return var.parent_problem.options['strings']
+    return True
+
+
+class _DeferredString(object):
+    """Symbolic recipe for the string of an expression, used when the
+    option ``strings`` is set to ``'lazy'``. The string is
+    ``fun(*args)``, where the arguments which are themselves deferred
+    are rendered first; it is computed only once, the first time
+    it is needed."""
+    __slots__ = ('fun', 'args', 'rendered')
+
+    def __init__(self, fun, *args):
+        self.fun = fun
+        self.args = args
+        self.rendered = None
+
+    def render(self):
+        # iterative traversal, because long chains of inplace additions
+        # would otherwise exceed the recursion limit
+        stack = [self]
+        while stack:
+            rec = stack[-1]
+            if rec.rendered is not None:
+                stack.pop()
+                continue
+            pending = [a for a in rec.args
+                       if isinstance(a, _DeferredString) and a.rendered is None]
+            if pending:
+                stack.extend(pending)
+                continue
+            rec.rendered = rec.fun(*[a.rendered if isinstance(a, _DeferredString)
+                                     else a for a in rec.args])
+            rec.fun = rec.args = None
+            stack.pop()
+        return self.rendered
+
+    def __reduce__(self):
+        # the recipe may contain lambdas, so the rendered string is pickled
+        return (str, (self.render(),))
+
+
+def _problem_member(prob, table, name):
+    """returns ``prob.variables[name]`` or ``prob.parameters[name]``,
+    cf. :func:`Variable.__reduce_ex__`"""
+    return getattr(prob, table)[name]
+
+
 #----------------------------------
 #                Expression
 #----------------------------------
@@ -75,7 +182,34 @@ class Expression(object):
 
     def __init__(self, string):
         self.string = string
+
+    @property
+    def string(self):
         """String representation of the expression"""
+        if isinstance(self._string, _DeferredString):
+            self._string = self._string.render()
+        return self._string
+
+    @string.setter
+    def string(self, value):
+        self._string = value
+
+    def _set_string(self, fun, *args):
+        """Sets the string of the expression to ``fun(*strings)``,
+        where ``strings`` are the strings of ``args``
+        (expressions, or str). Depending on the option ``strings``
+        of the problem, the string is computed now, deferred, or not
+        computed at all."""
+        mode = _string_mode(self)
+        if mode is False:
+            self._string = '?'
+        elif mode == 'lazy':
+            self._string = _DeferredString(
+                fun, *[a._string if isinstance(a, Expression) else a
+                       for a in args])
+        else:
+            self._string = fun(*[a.string if isinstance(a, Expression) else a
+                                 for a in args])
 
     def eval(self):
         pass
@@ -242,6 +376,9 @@ class AffinExp(Expression):
         """constant of the affine expression,
                 stored as a :func:`cvxopt sparse matrix <cvxopt:cvxopt.spmatrix>`.
                 """
+
+        self._Gh_cache = None
+        """cache for the blocks (G,h) of :func:`Problem._makeGandh`"""
         
         assert len(size)==2 and _is_integer(size[0]) and _is_integer(size[1])
         #make sure they are of class `int`, otherwise compatibility problem with py3...
@@ -282,15 +419,15 @@ class AffinExp(Expression):
             facopy[f] = copy.deepcopy(m)
 
         conscopy = copy.deepcopy(self.constant)
-        return AffinExp(facopy, conscopy, self.size, self.string)
+        return AffinExp(facopy, conscopy, self.size, self._string)
 
     def copy(self):
         excopy = 1*self
-        excopy.string = self.string
+        excopy._string = self._string
         return excopy
 
     def soft_copy(self):
-        return AffinExp(self.factors, self.constant, self.size, self.string)
+        return AffinExp(self.factors, self.constant, self.size, self._string)
 
     def affstring(self):
         return self.string
@@ -317,10 +454,8 @@ class AffinExp(Expression):
                     raise Exception(k + ' is not valued')
             else:
                 if ind in k.value_alt:
-                    if k.vtype == 'symmetric':
-                        val = val + self.factors[k] * svec(k.value_alt[ind])
-                    else:
-                        val = val + self.factors[k] * k.value_alt[ind][:]
+                    # (value_alt is already svec'd for symmetric variables)
+                    val = val + self.factors[k] * k.value_alt[ind][:]
                 else:
                     raise Exception(
                         k + ' does not have a value for the index ' + str(ind))
@@ -556,6 +691,7 @@ class AffinExp(Expression):
         if isinstance(self, Variable):
             raise Exception(
                 'inplace_transpose should not be called on a Variable object')
+        self._Gh_cache = None
         for k in self.factors:
             bsize = self.size[0]
             bsize2 = self.size[1]
@@ -597,6 +733,7 @@ class AffinExp(Expression):
         if isinstance(self, Variable):
             raise Exception(
                 'inplace_conjugate should not be called on a Variable object')
+        self._Gh_cache = None
         for k in self.factors:
             if k.vtype == 'hermitian':
                 fack = self.factors[k]
@@ -640,6 +777,7 @@ class AffinExp(Expression):
         if isinstance(self, Variable):
             raise Exception(
                 'inplace_transpose should not be called on a Variable object')
+        self._Gh_cache = None
         for k in self.factors:
             if k.vtype == 'hermitian':
                 bsize = self.size[0]
@@ -694,6 +832,7 @@ class AffinExp(Expression):
         if isinstance(self, Variable):
             raise Exception(
                 'partial_transpose should not be called on a Variable object')
+        self._Gh_cache = None
         size = self.size
 
         if dim_1 is None:
@@ -954,7 +1093,9 @@ class AffinExp(Expression):
                 facString = '[ {0} x {1} MAT ]'.format(*fact.size)
                 fac = fact
             bfac = _blocdiag(fac, self.size[1])
-            return AffinExp(factors={self: bfac}, size=(fac.size[0], self.size[1]), string=facString+'*'+self.string)
+            prod = AffinExp(factors={self: bfac}, size=(fac.size[0], self.size[1]))
+            prod._set_string(lambda s: facString + '*' + s, self)
+            return prod
 
         if not isinstance(fact, AffinExp):
             fac, facString = _retrieve_matrix(fact, self.size[0])
@@ -970,7 +1111,9 @@ class AffinExp(Expression):
           self.vtype not in ('symmetric','antisym',) and
           self.size[0] == fac.size[1]):
             bfac = _blocdiag(fac, self.size[1])
-            return AffinExp(factors={self: bfac}, size=(fac.size[0], self.size[1]), string=facString+'*'+self.string)
+            prod = AffinExp(factors={self: bfac}, size=(fac.size[0], self.size[1]))
+            prod._set_string(lambda s: facString + '*' + s, self)
+            return prod
 
         selfcopy = self.soft_copy()
 
@@ -979,9 +1122,9 @@ class AffinExp(Expression):
           (hasattr(fact,'size') and fact.size==(1,1)) or (hasattr(fact,'shape') and fact.shape in ((1,),(1,1))) )
 
         if self.size == (1, 1) and fac.size[1] != 1:
-            oldstring = selfcopy.string
+            oldstring = selfcopy._string
             selfcopy = selfcopy.diag(fac.size[1])
-            selfcopy.string = oldstring
+            selfcopy._string = oldstring
         if selfcopy.size[0] != fac.size[1]:
             raise Exception('incompatible dimensions')
         if is_scalar_mult:
@@ -996,18 +1139,11 @@ class AffinExp(Expression):
         else:
             newcons = bfac * selfcopy.constant
 
-        selfcopy = AffinExp(factors=newfac,constant=newcons, size=(fac.size[0], selfcopy.size[1]), string=selfcopy.string)
-
-        sstring = selfcopy.affstring()
-        if len(facString) > 0:
-            if ('+' in sstring) or ('-' in sstring):
-                sstring = '( ' + sstring + ' )'
-            if ('+' in facString) or ('-' in facString):
-                facString = '( ' + facString + ' )'
-
-            selfcopy.string = facString + '*' + sstring
+        prod = AffinExp(factors=newfac,constant=newcons, size=(fac.size[0], selfcopy.size[1]))
+        prod._set_string(lambda s: _prod_string(facString, s)
+                         if len(facString) > 0 else s, selfcopy)
 
-        return selfcopy
+        return prod
 
     def __mul__(self, fact):
         """product of 2 affine expressions"""
@@ -1066,23 +1202,17 @@ class AffinExp(Expression):
                 newcons = None
             else:
                 newcons = alpha * self.constant
-            sstring = self.affstring()
-            if ('+' in sstring) or ('-' in sstring):
-                sstring = '( ' + sstring + ' )'
-            return AffinExp(
-                newfacs,
-                newcons,
-                self.size,
-                facString +
-                '*' +
-                sstring)
+            prod = AffinExp(newfacs, newcons, self.size)
+            prod._set_string(lambda s: facString + '*' + (
+                '( ' + s + ' )' if ('+' in s) or ('-' in s) else s), self)
+            return prod
 
         selfcopy = self.soft_copy()
 
         if self.size == (1, 1) and fac.size[0] != 1:
-            oldstring = selfcopy.string
+            oldstring = selfcopy._string
             selfcopy = selfcopy.diag(fac.size[0])
-            selfcopy.string = oldstring
+            selfcopy._string = oldstring
 
         prod = (selfcopy.T.__rmul__(fac.T)).T
         prod._size = (selfcopy.size[0], fac.size[1])
@@ -1093,15 +1223,8 @@ class AffinExp(Expression):
             if facString[-1] == 'I' and (len(facString) == 1 or facString[-2].isdigit(
             ) or facString[-2] == '.') and(self.size != (1, 1)):
                 facString = facString[:-1]
-        sstring = selfcopy.affstring()
-        if len(facString) > 0:
-            if ('+' in sstring) or ('-' in sstring):
-                sstring = '( ' + sstring + ' )'
-            if ('+' in facString) or ('-' in facString):
-                facString = '( ' + facString + ' )'
-            prod.string = sstring + '*' + facString
-        else:
-            prod.string = selfcopy.string
+        prod._set_string(lambda s: _prod_string(s, facString)
+                         if len(facString) > 0 else s, selfcopy)
         return prod
 
     def __or__(self, fact):  # scalar product
@@ -1161,29 +1284,24 @@ class AffinExp(Expression):
 
     # inplace sum
     def __iadd__(self, term):
+        self._Gh_cache = None
         if isinstance(term, AffinExp):
             if term.size == (1, 1) and self.size != (1, 1):
-                oldstring = term.string
+                oldterm = term
                 term = cvx.matrix(1., self.size) * term.diag(self.size[1])
-                term.string = '|' + oldstring + '|'
+                term._set_string(lambda s: '|' + s + '|', oldterm)
             if self.size == (1, 1) and term.size != (1, 1):
-                oldstring = self.string
                 selfone = cvx.matrix(1., term.size) * self.diag(term.size[1])
-                selfone.string = '|' + oldstring + '|'
+                selfone._set_string(lambda s: '|' + s + '|', self)
                 selfone += term
                 return selfone
             if term.size != self.size:
                 raise Exception('incompatible dimension in the sum')
             for k in term.factors:
                 if k in self.factors:
-                    try:
-                        self.factors[k] += term.factors[k]
-                    except TypeError as ex:
-                        if str(ex).startswith('incompatible') or str(
-                                ex).startswith('invalid'):  # incompatible typecodes
-                            self.factors[k] = self.factors[k] + term.factors[k]
-                        else:
-                            raise
+                    # not inplace: the matrix may be shared with another
+                    # expression, and this also handles mixed typecodes
+                    self.factors[k] = self.factors[k] + term.factors[k]
                 else:
                     self.factors[k] = term.factors[k]
             if self.constant is None and term.constant is None:
@@ -1197,37 +1315,10 @@ class AffinExp(Expression):
                         newCons = cvx.matrix(0., self.size, 'd')[:]
                     self.constant = newCons
                 if not term.constant is None:
-                    try:
-                        self.constant += term.constant
-                    except TypeError as ex:
-                        if str(ex).startswith('incompatible') or str(
-                                ex).startswith('invalid'):  # incompatible typecodes
-                            self.constant = self.constant + term.constant
-                        else:
-                            raise
-                    """old implementation without try-block; the new one is safer !
-
-                                        if ((isinstance(self.constant,spmatrix) and isinstance(term.constant,cvx.matrix))) or (
-                                               term.constant.typecode=='z' and self.constant.typecode=='d'):
-                                                  #inplace op not defined
-                                                  self.constant=cvx.matrix(self.constant,tc=term.constant.typecode)
-                                        self.constant+=term.constant
-                                        """
+                    # not inplace either, for the same reason as above
+                    self.constant = self.constant + term.constant
 
-            if term.affstring() not in ['0', '', '|0|', '0.0', '|0.0|']:
-                if term.string[0] == '-':
-                    import re
-                    if ('+' not in term.string[1:]) and (
-                            '-' not in term.string[1:]):
-                        self.string += ' ' + term.affstring()
-                    elif (term.string[1] == '(') and (
-                            re.search('.*\)((\[.*\])|(.T))*$', term.string)):  # a group in a (...)
-                        self.string += ' ' + term.affstring()
-                    else:
-                        self.string += ' + (' + \
-                            term.affstring() + ')'
-                else:
-                    self.string += ' + ' + term.affstring()
+            self._set_string(lambda s, t: s + _term_string(t), self, term)
             return self
         elif isinstance(term, QuadExp):
             if self.size != (1, 1):
@@ -1245,27 +1336,7 @@ class AffinExp(Expression):
 
     def __neg__(self):
         selfneg = (-1) * self
-        if self.string != '':
-            if self.string[0] == '-':
-                import re
-                if ('+' not in self.string[1:]
-                        ) and ('-' not in self.string[1:]):
-                    selfneg.string = self.string[1:]
-                elif (self.string[1] == '(') and (
-                        re.search('.*\)((\[.*\])|(.T))*$', self.string)):  # a group in a (...)
-                    if self.string[-1] == ')':
-                        # we remove the parenthesis
-                        selfneg.string = self.string[2:-1]
-                    else:
-                        selfneg.string = self.string[
-                            1:]  # we keep the parenthesis
-                else:
-                    selfneg.string = '-(' + self.string + ')'
-            else:
-                if ('+' in self.string) or ('-' in self.string):
-                    selfneg.string = '-(' + self.string + ')'
-                else:
-                    selfneg.string = '-' + self.string
+        selfneg._set_string(_neg_string, self)
         return selfneg
 
     def __sub__(self, term):
@@ -1368,7 +1439,6 @@ class AffinExp(Expression):
             # else:
             # newcons=None
             newsize = (len(rangeT), 1)
-            indstr = slicestr(index)
         elif isinstance(index, tuple):
             if isinstance(index[0], Expression) or isinstance(index[0], int):
                 ind = index[0].__index__()
@@ -1402,35 +1472,45 @@ class AffinExp(Expression):
             # else:
                 # newcons=None
             newsize = (len(range(*idx0)), len(range(*idx1)))
-            indstr = slicestr(index[0]) + ',' + slicestr(index[1])
 
         newfacs = {}
+        rows = np.array(rangeT, dtype=np.int64)
         for k in self.factors:
             Ridx, J, V = self.factors[k].T.CCS  # fast row slicing
-            II, VV, JJ = [], [], []
-            for l, i in enumerate(rangeT):
-                idx = range(Ridx[i], Ridx[i + 1])
-                for j in idx:
-                    II.append(l)
-                    JJ.append(J[j])
-                    VV.append(V[j])
+            Ridx = np.array(Ridx, dtype=np.int64).ravel()
+            counts = Ridx[rows + 1] - Ridx[rows]
+            # positions of the nonzeros of the selected rows in J and V
+            pos = (np.arange(counts.sum()) +
+                   np.repeat(Ridx[rows] - np.cumsum(counts) + counts, counts))
+            II = np.repeat(np.arange(len(rows)), counts)
+            JJ = np.array(J, dtype=np.int64).ravel()[pos]
+            VV = np.array(V).ravel()[pos]
             newfacs[k] = spmatrix(
-                VV, II, JJ, (len(rangeT), self.factors[k].size[1]))
+                VV.tolist(), II.tolist(), JJ.tolist(),
+                (len(rangeT), self.factors[k].size[1]))
 
         if not self.constant is None:
             newcons = self.constant[rangeT]
         else:
             newcons = None
 
-        if ('*' in self.affstring()) or ('+' in self.affstring()) or (
-                '-' in self.affstring()) or ('/' in self.affstring()):
-            newstr = '( ' + self.string + ' )[' + indstr + ']'
-        else:
-            newstr = self.string + '[' + indstr + ']'
+        def getitemstr(sstring):
+            if isinstance(index, slice):
+                indstr = slicestr(index)
+            else:
+                indstr = slicestr(index[0]) + ',' + slicestr(index[1])
+            if ('*' in sstring) or ('+' in sstring) or (
+                    '-' in sstring) or ('/' in sstring):
+                return '( ' + sstring + ' )[' + indstr + ']'
+            else:
+                return sstring + '[' + indstr + ']'
+
         # check size
         if newsize[0] == 0 or newsize[1] == 0:
             raise IndexError('slice of zero-dimension')
-        return AffinExp(newfacs, newcons, newsize, newstr)
+        sliced = AffinExp(newfacs, newcons, newsize)
+        sliced._set_string(getitemstr, self)
+        return sliced
 
     def __setitem__(self, key, value):
         raise AttributeError('slices of an expression are not writable')
@@ -1584,7 +1664,7 @@ class AffinExp(Expression):
         else:
             selfcopy.constant = None
         selfcopy._size = (dim, dim)
-        selfcopy.string = 'diag(' + selfcopy.string + ')'
+        selfcopy._set_string(lambda s: 'diag(' + s + ')', self)
         return selfcopy
 
     def __and__(self, exp):
@@ -1603,6 +1683,7 @@ class AffinExp(Expression):
         return (exp2 & self)
 
     def __iand__(self, exp):
+        self._Gh_cache = None
         if isinstance(exp, AffinExp):
             if exp.size[0] != self.size[0]:
                 raise Exception('incompatible size for concatenation')
@@ -1727,6 +1808,7 @@ class AffinExp(Expression):
 
     def __ifloordiv__(self, exp):
         """inplace vertical concatenation"""
+        self._Gh_cache = None
         if isinstance(exp, AffinExp):
             if exp.size[1] != self.size[1]:
                 raise Exception('incompatible size for concatenation')
@@ -2187,14 +2269,9 @@ class QuadExp(Expression):
         if isinstance(term, QuadExp):
             for ij in self.quad:
                 if ij in term.quad:
-                    try:
-                        self.quad[ij] += term.quad[ij]
-                    except TypeError as ex:
-                        if str(ex).startswith('incompatible') or str(
-                                ex).startswith('invalid'):  # incompatible typecodes
-                            self.quad[ij] = self.quad[ij] + term.quad[ij]
-                        else:
-                            raise
+                    # not inplace: the matrix may be shared with another
+                    # expression, and this also handles mixed typecodes
+                    self.quad[ij] = self.quad[ij] + term.quad[ij]
             for ij in term.quad:
                 if not (ij in self.quad):
                     self.quad[ij] = term.quad[ij]
@@ -2228,7 +2305,7 @@ class QuadExp(Expression):
                 constant=term,
                 size=term.size,
                 string=termString)
-            self + expAE
+            self += expAE
             return self
 
     def __rmul__(self, fact):
@@ -2329,7 +2406,7 @@ class GeneralFun(Expression):
     """
 
     def __init__(self, fun, Exp, funstring):
-        Expression.__init__(self, self.funstring + '( ' + Exp.string + ')')
+        Expression.__init__(self, funstring + '( ' + Exp.string + ')')
         self.fun = fun
         r"""The function ``f`` applied to the affine expression.
                 This function must take in argument a
@@ -3424,6 +3501,15 @@ class Variable(AffinExp):
         return '# variable {0}:({1} x {2}),{3} #'.format(
             self.name, self.size[0], self.size[1], self.vtype)
 
+    def __reduce_ex__(self, protocol):
+        # a variable of a problem is pickled as a reference to the problem,
+        # which is itself pickled in a compact form (cf. Problem.__getstate__)
+        table = 'parameters' if isinstance(self, Parameter) else 'variables'
+        prob = self.parent_problem
+        if getattr(prob, table, {}).get(self.name) is self:
+            return (_problem_member, (prob, table, self.name))
+        return AffinExp.__reduce_ex__(self, protocol)
+
     def __iadd__(self, term):
         raise NotImplementedError('variable must not be changed inplace. Try to cast the first term of the sum as an AffinExp, e.g. by adding 0 to it.')
 
@@ -3439,11 +3525,15 @@ class Variable(AffinExp):
     @property
     def startIndex(self):
         """starting position in the global vector of all variables"""
+        if self.parent_problem._removed_varnames:
+            self.parent_problem._compact_variables()
         return self._startIndex
 
     @property
     def endIndex(self):
         """end position in the global vector of all variables"""
+        if self.parent_problem._removed_varnames:
+            self.parent_problem._compact_variables()
         return self._endIndex
 
     @property
@@ -3901,6 +3991,40 @@ class Variable(AffinExp):
         return AffinExp(newfacs, newcons, newsize, newstr)
 
 
+class Parameter(Variable):
+    """This class stores a parameter of a problem, i.e. a constant whose
+    value can be changed after the constraints have been added. It derives
+    from :class:`Variable<picos.Variable>`, so that it can be combined with
+    other expressions in the same way, but it is not part of the vector of
+    variables passed to the solvers. Parameters are created with the function
+    :func:`add_parameter() <picos.Problem.add_parameter>`.
+    """
+
+    def __init__(self, parent_problem, name, size, value):
+        Variable.__init__(self, parent_problem, name, size, None, 0)
+        self._startIndex = None
+        self._endIndex = None
+        self.value = value
+
+    def __repr__(self):
+        return '# parameter {0}:({1} x {2}) #'.format(
+            self.name, self.size[0], self.size[1])
+
+    def eval(self, ind=None):
+        # the value of a parameter does not depend on the solution
+        return cvx.matrix(self._value)
+
+    def set_value(self, value):
+        Variable.set_value(self, value)
+        self.parent_problem._parameters_changed = True
+
+    value = property(eval, set_value, None, "value of the parameter")
+    """value of the parameter. Setting it updates the constraints and
+       the objective of the parent problem at the next call to
+       :func:`solve() <picos.Problem.solve>`.
+    """
+
+
 class Set(object):
     """
     Parent class for set objects
@@ -32,13 +32,22 @@ import cvxopt as cvx
 import numpy as np
 import sys
 import six
+import itertools
+import threading
 from six.moves import zip, range
 
 from .tools import *
 from .expression import *
 from .constraint import *
 
-__all__ = ['Problem', 'Variable']
+__all__ = ['Problem', 'Variable', 'solve_many']
+
+# source of the values of Problem._layout_version
+_layout_versions = itertools.count()
+
+# state of the solve running in the current thread: ``cancel`` is the event
+# which requests the cancellation of an asynchronous solve (cf. solve_async)
+_solve_state = threading.local()
 
 global INFINITY
 INFINITY = 1e16
@@ -87,6 +96,11 @@ class Problem(object):
         """size of the s-vecotrized matrices involved in SDP constraints"""
         self.countGeomean = 0
         """number of geomean (and other nonstandard convex) inequalities"""
+        self._layout_version = next(_layout_versions)
+        """identifies the current position of the variables in the
+        global vector of all variables; it changes whenever some
+        variables are moved (and the blocks cached by
+        :func:`_makeGandh` become invalid)"""
         self.cvxoptVars = {'c': None,
                            'A': None, 'b': None,  # equalities
                            'Gl': None, 'hl': None,  # inequalities
@@ -125,6 +139,19 @@ class Problem(object):
         self.sdpa_executable = None
         self.sdpa_dats_filename = None
         self.sdpa_out_filename = None
+        # the running sdpa process, if any (killed on interruption)
+        self.sdpa_process = None
+        # future of the asynchronous solve in progress, cf. solve_async()
+        self._async_solve = None
+
+        # (key, realP) where realP is the real problem returned by to_real(),
+        # reused to solve the same complex problem again
+        self._real_problem = None
+        # (blocks, G) where G stacks the blocks G of the affine
+        # expressions of the constraints, cf. feasibility_report()
+        self._feasibility_operator = None
+        # (key, matrix) cached by solution_pool()
+        self._pool = None
 
         self.groupsOfConstraints = {}
         self.listOfVars = {}
@@ -139,7 +166,14 @@ class Problem(object):
         self.number_solutions = 0
 
         self.longestkey = 0  # for a nice display of constraints
-        self.varNames = []
+        self._varNames = []
+        self._removed_varnames = set()
+        """names of removed variables that are still listed in ``varNames``;
+           they are dropped at once by :meth:`_compact_variables`."""
+        self.parameters = {}
+        """dictionary of the parameters of the problem, indexed by their names"""
+        self._parameters_changed = False
+        self._param_objective = None  # objective depending on parameters
 
         self.status = 'unsolved'
         """status returned by the solver. The default when
@@ -343,6 +377,7 @@ class Problem(object):
 
     def reset_solver_instances(self):
 
+        self._real_problem = None
         self.reset_cvxopt_instance(False)
         self.reset_gurobi_instance(False)
         self.reset_cplex_instance(False)
@@ -425,9 +460,13 @@ class Problem(object):
                      or maximized. This parameter will be ignored
                      if ``typ=='find'``.
         """
+        self._param_objective = None
         if typ == 'find':
             self.objective = (typ, expr)
             return
+        if _has_parameters(expr):
+            self._param_objective = expr
+            expr = _resolve_parameters(expr)
         if (isinstance(expr, AffinExp) and expr.size != (1, 1)):
             raise Exception('objective should be scalar')
         if not (isinstance(expr, AffinExp) or isinstance(expr, LogSumExp)
@@ -500,6 +539,7 @@ class Problem(object):
             if self.variables[name].vtype in ('symmetric',):
                 valuemat = svec(valuemat)
             self.variables[name].value_alt[ind] = valuemat
+            self._pool = None
             if optimalvar:
                 self.number_solutions = max(self.number_solutions, ind + 1)
 
@@ -508,21 +548,32 @@ class Problem(object):
         this method creates a bloc matrix G to be multiplied by the large
         vectorized vector of all variables,
         and returns the vector h corresponding to the constant term.
+        The blocks are cached in the expression, as long as the
+        layout of the variables does not change.
         """
+        key = (self._layout_version, self.numberOfVars)
+        cached = getattr(affExpr, '_Gh_cache', None)
         n1 = affExpr.size[0] * affExpr.size[1]
-        # matrix G
-        I = []
-        J = []
-        V = []
-        for var in affExpr.factors:
-            si = var.startIndex
-            facvar = affExpr.factors[var]
-            if not isinstance(facvar, cvx.base.spmatrix):
-                facvar = cvx.sparse(facvar)
-            I.extend(facvar.I)
-            J.extend([si + j for j in facvar.J])
-            V.extend(facvar.V)
-        G = spmatrix(V, I, J, (n1, self.numberOfVars))
+        if cached is not None and cached[0] == key:
+            G = cached[1]
+            if cached[2] is not None:
+                return G, cached[2]
+            # only the constant term has changed (cf. _update_parameters)
+        else:
+            # matrix G (built in one call; _triplets_to_spmatrix avoids the
+            # slow spmatrix constructor when the factors have dense columns)
+            I = []
+            J = []
+            V = []
+            for var in affExpr.factors:
+                si = var.startIndex
+                facvar = affExpr.factors[var]
+                if not isinstance(facvar, cvx.base.spmatrix):
+                    facvar = cvx.sparse(facvar)
+                I.extend(facvar.I)
+                J.extend([si + j for j in facvar.J])
+                V.extend(facvar.V)
+            G = _triplets_to_spmatrix(V, I, J, (n1, self.numberOfVars))
 
         # is it really sparse ?
         # if cvx.nnz(G)/float(G.size[0]*G.size[1])>0.5:
@@ -536,6 +587,7 @@ class Problem(object):
             h = cvx.matrix(h, tc='d')
         if h.typecode != 'd':
             h = cvx.matrix(h, tc='d')
+        affExpr._Gh_cache = (key, G, h)
         return G, h
 
     def set_all_options_to_default(self):
@@ -552,6 +604,20 @@ class Problem(object):
             ``'cvxopt'``, ``'cplex'``, ``'mosek'``, ``'gurobi'``, ``'smcp'``, ``'zibopt'``.
             The default
             ``None`` means that you let picos select a suitable solver for you.
+            With ``'race'``, the problem is solved in parallel processes by
+            the available solvers that are suitable for it (cf. the option
+            ``race_solvers``), and the first solution which is feasible up to
+            the tolerance ``feastol`` (or ``1e-5`` if ``feastol`` is ``None``)
+            is kept; the other processes are killed. If no solution is
+            feasible (e.g. for an infeasible problem), the first solution
+            returned is kept. The solver which won the race is given by the
+            key ``'solver'`` of the returned dictionary.
+
+          * ``race_solvers = None`` : list of the solvers which compete when
+            ``solver='race'``. The default ``None`` means all the available
+            solvers that are suitable for the problem, in the order of
+            preference of picos. At most one process per processor is
+            running at a time; a solver starts when another one failed.
 
           * ``tol = 1e-8`` : Relative gap termination tolerance
             for interior-point optimizers (feasibility and complementary slackness).
@@ -560,6 +626,15 @@ class Problem(object):
             (for simplex or interior-point optimizers).
             *This option is currently ignored by zibopt*.
 
+          * ``strings = True`` : how the string representations of the affine expressions
+            involving the variables of this problem are built.
+            If ``True``, strings are computed at each operation on the expressions.
+            If ``'lazy'``, the operations only store a symbolic recipe, and the strings
+            are rendered the first time they are displayed.
+            If ``False``, no string is built at all (expressions are displayed as ``?``),
+            which is faster for large models that are never printed.
+            This option should be set when the problem is created, e.g. ``Problem(strings='lazy')``.
+
           * ``lp_root_method = None`` : algorithm used to solve continuous LP
             problems, including the root relaxation of mixed integer problems.
             The default ``None`` selects automatically an algorithm.
@@ -594,11 +669,20 @@ class Problem(object):
           * ``nbsol = None`` : maximum number of feasible solution nodes visited
             when solving a mixed integer problem.
 
-          * ``hotstart = False`` : if ``True``, the MIP optimizer tries to start from
-            the solution
-            specified (even partly) in the :attr:`value<picos.Variable.value>` attribute of the
-            problem variables.
-            *This option currently works only with cplex, mosek and gurobi*.
+          * ``hotstart = False`` : if ``True``, the solver tries to start from the
+            values of the variables, e.g. those of a previous solve.
+            *This option currently works only with cplex, mosek, gurobi and cvxopt*:
+
+              * with cplex, mosek and gurobi, the MIP optimizer starts from the
+                solution specified (even partly) in the :attr:`value<picos.Variable.value>`
+                attribute of the problem variables;
+
+              * with cvxopt, the interior point method is warm-started from the
+                values of the variables and the duals of the constraints.
+
+            The warm start is not used when the dual problem is passed to the solver
+            (cf. ``solve_via_dual`` below; with the default ``None``, this happens for
+            some SDPs): set ``solve_via_dual=False`` to use it.
 
           * ``convert_quad_to_socp_if_needed = True`` : Do we convert the convex quadratics to
             second order cone constraints when the solver does not handle them directly ?
@@ -733,6 +817,8 @@ class Problem(object):
 
           * ``sdpa_params = {'-pt': 0}`` : dictionary of extra parameters to pass to sdpa.
             Set 'read_solution': 'filename.out' for reading an already existing solution.
+            Each solve works in its own temporary directory, so distinct problems
+            can be solved with sdpa concurrently (for example from several threads).
         """
         # Additional, hidden option (requires a patch of smcp, to use conlp to
         # interface the feasible starting point solver):
@@ -745,6 +831,7 @@ class Problem(object):
                            'maxit': None,
                            'verbose': 1,
                            'solver': None,
+                           'race_solvers': None,
                            'step_sqp': 1,  # undocumented
                            'harmonic_steps': 1,  # undocumented
                            'noprimals': False,
@@ -775,6 +862,7 @@ class Problem(object):
                            'return_constraints' : False,
                            'sdpa_executable': 'sdpa',
                            'sdpa_params': {'-pt': 0},
+                           'strings': True,
                            }
 
         self._options = _NonWritableDict(default_options)
@@ -964,6 +1052,7 @@ class Problem(object):
                 else:
                     self.listOfVars[lisname]['type'] = 'dict'
 
+        self._compact_variables()
         countvar = self.countVar
         numbervar = self.numberOfVars
 
@@ -1029,7 +1118,7 @@ class Problem(object):
             return exp
         else:
             self.numberOfVars += size[0] * size[1]
-        self.varNames.append(name)
+        self._varNames.append(name)
         self.countVar += 1
 
         # svec operation
@@ -1054,6 +1143,90 @@ class Problem(object):
 
         return self.variables[name]
 
+    def add_parameter(self, name, value):
+        """
+        adds a parameter in the problem,
+        and returns the corresponding instance of the :class:`Parameter <picos.Parameter>`.
+
+        Contrarily to the constant expressions returned by
+        :func:`new_param() <picos.tools.new_param>`, the value of a parameter
+        can be changed after the constraints have been added, by setting its
+        :attr:`value <picos.Parameter.value>` attribute. The constraints and
+        the objective are then updated at the next call to
+        :func:`solve() <picos.Problem.solve>`, without rebuilding the
+        expressions. A parameter can appear linearly in the constraints
+        (e.g. in a right-hand side), and linearly or in a product with a
+        variable in the objective (e.g. as a cost vector).
+
+        >>> prob=pic.Problem()
+        >>> x=prob.add_variable('x',2)
+        >>> b=prob.add_parameter('b',[1,2])
+        >>> prob.add_constraint(x > b)
+        >>> prob.set_objective('min',(1|x))
+        >>> b
+        # parameter b:(2 x 1) #
+
+        :param name: The name of the parameter.
+        :type name: str.
+        :param value: The initial value of the parameter. Its size
+                      determines the size of the parameter.
+        :type value: Any type recognized by the function
+                      :func:`_retrieve_matrix() <picos.tools._retrieve_matrix>`.
+        :returns: An instance of the class :class:`Parameter <picos.Parameter>`.
+        """
+        if name in self.variables or name in self.parameters:
+            raise Exception('this parameter already exists')
+        size = _retrieve_matrix(value)[0].size
+        par = Parameter(self, name, size, value)
+        self.parameters[name] = par
+        return par
+
+    def _update_parameters(self):
+        """
+        updates the constraints and the objective which depend on a parameter,
+        after the value of a parameter has been changed.
+        The coefficients of the variables of an affine constraint do not depend
+        on the parameters, so only the constant term of such a constraint is
+        replaced, and the blocks cached by :func:`_makeGandh` are kept.
+        """
+        self._parameters_changed = False
+        for cons in self.constraints:
+            origs = getattr(cons, '_param_exps', None)
+            if origs is None:
+                continue
+            for attr, orig in six.iteritems(origs):
+                exp = getattr(cons, attr)
+                if isinstance(orig, QuadExp):
+                    setattr(cons, attr, _resolve_parameters(orig))
+                else:
+                    exp.constant = _resolve_parameters(orig).constant
+                    if exp._Gh_cache is not None:
+                        exp._Gh_cache = exp._Gh_cache[:2] + (None,)
+        if self._param_objective is not None:
+            self.set_objective(self.objective[0], self._param_objective)
+        self.reset_solver_instances()
+
+    def _resolve_constraint_parameters(self, cons):
+        """
+        replaces the expressions of the constraint ``cons`` which depend on
+        a parameter by their current value. The original expressions are kept
+        in ``cons._param_exps``, for :func:`_update_parameters`.
+        """
+        origs = {}
+        for attr in ('Exp1', 'Exp2', 'Exp3'):
+            exp = getattr(cons, attr)
+            if not _has_parameters(exp):
+                continue
+            if isinstance(exp, QuadExp) and any(
+                    [isinstance(i, Parameter) or isinstance(j, Parameter)
+                     for (i, j) in exp.quad]):
+                raise Exception(
+                    'a parameter can only appear linearly in a constraint')
+            origs[attr] = exp
+            setattr(cons, attr, _resolve_parameters(exp))
+        if origs:
+            cons._param_exps = origs
+
     def remove_variable(self, name):
         """
         Removes the variable ``name`` from the problem.
@@ -1077,14 +1250,47 @@ class Problem(object):
         var = self.variables[name]
         sz = var.size
         self.numberOfVars -= sz[0] * sz[1]
-        self.varNames.remove(name)
         del self.variables[name]
+        # the indices of the remaining variables are recomputed lazily,
+        # so that removing k variables costs a single O(n) pass
+        self._removed_varnames.add(name)
+        self.reset_cvxopt_instance(False)
+        self.reset_gurobi_instance(False)
+        self.reset_cplex_instance(False)
+        self.reset_mosek_instance(False)
+        self.reset_scip_instance(False)
+        self.reset_sdpa_instance(False)
+
+    @property
+    def varNames(self):
+        """names of the variables of the problem, in the order of their
+        position in the global vector of all variables"""
+        self._compact_variables()
+        return self._varNames
+
+    @varNames.setter
+    def varNames(self, names):
+        self._removed_varnames = set()
+        self._varNames = names
+
+    def _compact_variables(self):
+        """
+        Drops the variables removed by :func:`remove_variable() <picos.Problem.remove_variable>`
+        from ``varNames`` and recomputes the start and end indices of the
+        remaining variables. Does nothing if no variable was removed since the
+        last call.
+        """
+        if not self._removed_varnames:
+            return
+        removed, self._removed_varnames = self._removed_varnames, set()
+        self._varNames = [nam for nam in self._varNames if nam not in removed]
         self._recomputeStartEndIndices()
         self.reset_solver_instances()
 
     def _recomputeStartEndIndices(self):
+        self._layout_version = next(_layout_versions)
         ind = 0
-        for nam in self.varNames:
+        for nam in self._varNames:
             var = self.variables[nam]
             var._startIndex = ind
             if var.vtype in ('symmetric',):
@@ -1098,24 +1304,23 @@ class Problem(object):
         Remove the variables __tmp...
         created by the solvers to cast the problem as socp
         """
+        self._compact_variables()
+        self._layout_version = next(_layout_versions)
         offset = 0
-        todel = []
-        for nam in self.varNames:
+        kept = []
+        for nam in self._varNames:
             var = self.variables[nam]
             if '__tmp' in nam or '__noconstant' in nam:
                 self.countVar -= 1
                 sz = self.variables[nam].size
                 offset += sz[0] * sz[1]
                 self.numberOfVars -= sz[0] * sz[1]
-                # self.varNames.remove(nam)
-                todel.append(nam)
                 del self.variables[nam]
             else:
+                kept.append(nam)
                 var._startIndex -= offset
                 var._endIndex -= offset
-
-        for nam in todel:
-            self.varNames.remove(nam)
+        self._varNames = kept
 
         if '__tmprhs' in self.listOfVars:
             del self.listOfVars['__tmprhs']
@@ -1123,8 +1328,13 @@ class Problem(object):
             del self.listOfVars['__tmplhs']
 
     def copy(self):
-        """creates a copy of the problem."""
-        import copy
+        """creates a copy of the problem.
+
+        The copy has its own variables and constraints, but the coefficient
+        matrices of its expressions are shared with the original problem.
+        This is safe because these matrices are never modified inplace: an
+        update of an expression replaces the matrix instead.
+        """
         cop = Problem()
         cvars = {}
         for (iv, v) in sorted([(v.startIndex, v)
@@ -1147,12 +1357,109 @@ class Problem(object):
         obj = _copy_exp_to_new_vars(self.objective[1], cvars)
         cop.set_objective(self.objective[0], obj)
 
-        cop.consNumbering = copy.deepcopy(self.consNumbering)
-        cop.groupsOfConstraints = copy.deepcopy(self.groupsOfConstraints)
+        cop.consNumbering = list(self.consNumbering)
+        # the items of each group are immutable, no deepcopy needed
+        cop.groupsOfConstraints = dict((k, list(goc)) for k, goc
+                                       in six.iteritems(self.groupsOfConstraints))
         cop._options = _NonWritableDict(self.options)
 
         return cop
 
+    def __getstate__(self):
+        """
+        Returns a flat description of the problem, used for pickling and by
+        ``copy.deepcopy``: a table of the variables, the constraints and the
+        objective, where each coefficient matrix is a reference to a range of
+        three flat numpy arrays of triplets (cf. :class:`_FlatMatrices`).
+        The solver instances are not part of this description.
+        """
+        if '_pickled_state' in self.__dict__:  # not rebuilt yet
+            return self.__dict__['_pickled_state']
+        flat = _FlatMatrices()
+        variables = []
+        for name in self.varNames:
+            var = self.variables[name]
+            value_alt = dict((k, flat.ref(v))
+                             for k, v in six.iteritems(var.value_alt))
+            variables.append((name, var.size, var.vtype, dict(var.bnd),
+                              var._bndtext, var._semiDef,
+                              flat.ref(var._value), value_alt))
+        parameters = [(name, flat.ref(par._value))
+                      for name, par in six.iteritems(self.parameters)]
+        constraints = []
+        for cons in self.constraints:
+            origs = getattr(cons, '_param_exps', {})
+            exps = [_expression_state(origs.get(attr, getattr(cons, attr)), flat)
+                    for attr in ('Exp1', 'Exp2', 'Exp3')]
+            constraints.append((cons.typeOfConstraint, cons.key, exps,
+                                flat.ref(cons.dualVariable),
+                                cons.myconstring, cons.myfullconstring))
+        obj = self.objective[1]
+        if self._param_objective is not None:
+            obj = self._param_objective
+        return {'options': dict(self.options),
+                'variables': variables,
+                'parameters': parameters,
+                'constraints': constraints,
+                'objective': (self.objective[0], _expression_state(obj, flat)),
+                'countCons': self.countCons,
+                'consNumbering': list(self.consNumbering),
+                'groupsOfConstraints': self.groupsOfConstraints,
+                'listOfVars': self.listOfVars,
+                'countGeomean': self.countGeomean,
+                'longestkey': self.longestkey,
+                'status': self.status,
+                'number_solutions': self.number_solutions,
+                'arrays': flat.arrays()}
+
+    def __setstate__(self, state):
+        # the problem is rebuilt at the first access to one of its attributes
+        self.__dict__['_pickled_state'] = state
+
+    def __getattr__(self, name):
+        # only called when the attribute is not found, e.g. when the problem
+        # has been unpickled but not rebuilt yet
+        if name.startswith('__') or '_pickled_state' not in self.__dict__:
+            raise AttributeError(name)
+        self._rebuild_from_state(self.__dict__.pop('_pickled_state'))
+        return getattr(self, name)
+
+    def _rebuild_from_state(self, state):
+        """rebuilds the problem from the output of :func:`__getstate__`"""
+        flat = _FlatMatrices(*state['arrays'])
+        Problem.__init__(self, **state['options'])
+        for (name, size, vtype, bnd, bndtext, semidef,
+             value, value_alt) in state['variables']:
+            var = self.add_variable(name, size, vtype)
+            for i, (lo, up) in six.iteritems(bnd):
+                var.bnd._set(i, (lo, up))
+            var._bndtext = bndtext
+            var._semiDef = semidef
+            var._value = flat.get(value)
+            var.value_alt = dict((k, flat.get(v))
+                                 for k, v in six.iteritems(value_alt))
+        for name, value in state['parameters']:
+            self.add_parameter(name, flat.get(value))
+        for (typ, key, exps, dual, constring,
+             fullconstring) in state['constraints']:
+            exps = [_expression_from_state(st, flat, self) for st in exps]
+            cons = Constraint(typ, None, *exps)
+            self.add_constraint(cons, key)
+            cons.dualVariable = flat.get(dual)
+            cons.myconstring = constring
+            cons.myfullconstring = fullconstring
+        sense, obj = state['objective']
+        self.set_objective(sense, _expression_from_state(obj, flat, self))
+        self.countCons = state['countCons']
+        self.consNumbering = state['consNumbering']
+        self.groupsOfConstraints = state['groupsOfConstraints']
+        self.listOfVars = state['listOfVars']
+        self.countGeomean = state['countGeomean']
+        self.longestkey = state['longestkey']
+        self.status = state['status']
+        self.number_solutions = state['number_solutions']
+        self._parameters_changed = False
+
     def add_constraint(self, cons, key=None, ret=False):
         """Adds a constraint in the problem.
 
@@ -1175,6 +1482,7 @@ class Problem(object):
                 si = self.variables[uiname].startIndex
                 ei = self.variables[uiname].endIndex
                 self.variables[uiname] = vui
+                self.variables[uiname].parent_problem = self
                 self.variables[uiname]._startIndex = si
                 self.variables[uiname]._endIndex = ei
                 self.variables[uiname].name = uiname
@@ -1189,6 +1497,8 @@ class Problem(object):
             else:
                 return
 
+        if self.parameters:
+            self._resolve_constraint_parameters(cons)
         cons.key = key
         if not key is None:
             self.longestkey = max(self.longestkey, len(key))
@@ -1410,6 +1720,114 @@ class Problem(object):
         if self.options['return_constraints'] or ret:
             return lst
 
+    def add_linear_constraints(self, A, x, sense, b, key=None, ret=False):
+        """adds the block of linear constraints ``A*x[:] < b``,
+        ``A*x[:] > b`` or ``A*x[:] == b`` in the problem, as a single constraint.
+        Unlike :func:`add_list_of_constraints() <picos.Problem.add_list_of_constraints>`,
+        no expression is built for the individual rows, so this function
+        should be preferred when the data of a large number of constraints
+        is already available as a sparse matrix.
+
+        :param A: The matrix of coefficients, in any format accepted by
+                  :func:`new_param() <picos.tools.new_param>`
+                  (:func:`cvxopt matrix <cvxopt:cvxopt.matrix>` or
+                  :func:`sparse matrix <cvxopt:cvxopt.spmatrix>`, numpy array,
+                  scipy sparse matrix...).
+                  Its number of columns must match the number of
+                  elements of ``x``.
+        :param x: A variable, or an affine expression, which is vectorized
+                  (in column-major order) before being multiplied by ``A``.
+        :type x: :class:`AffinExp <picos.AffinExp>`.
+        :param sense: ``'<'``, ``'>'`` or ``'='`` (``'<='``, ``'>='``, ``'=='`` are also accepted).
+        :type sense: str.
+        :param b: The right hand side (a vector with as many elements as rows in ``A``,
+                  or a scalar).
+        :param key: Optional parameter to describe the constraint with a key string.
+        :type key: str.
+        :param ret: Do you want the added constraint to be returned ?
+        :type ret: bool.
+
+        **Example:**
+
+        >>> import picos as pic
+        >>> import cvxopt as cvx
+        >>> prob=pic.Problem()
+        >>> x=prob.add_variable('x',3)
+        >>> A=cvx.spmatrix([1.,2.,1.,-1.],[0,0,1,1],[0,1,1,2])
+        >>> prob.add_linear_constraints(A,x,'<',[1,2],ret=True)
+        # (2x1)-affine constraint : [ 2 x 3 MAT ]*x < [ 2 x 1 MAT ] #
+        """
+        if sense in ('<', '<='):
+            sense = '<'
+        elif sense in ('>', '>='):
+            sense = '>'
+        elif sense in ('=', '=='):
+            sense = '='
+        else:
+            raise ValueError("sense must be '<', '>' or '='")
+        lhs = _matrix_times_exp(A, x)
+        bmat, bstring = _retrieve_matrix(b, lhs.size)
+        rhs = AffinExp({}, constant=cvx.matrix(bmat[:]), size=lhs.size,
+                       string=bstring)
+        cons = Constraint('lin' + sense, None, lhs, rhs)
+        return self.add_constraint(cons, key, ret)
+
+    def add_soc_constraint(self, A, x, b=0, c=None, d=0, key=None, ret=False):
+        """adds the second order cone constraint
+        ``||A*x[:] + b|| < c.T*x[:] + d`` in the problem, where the data
+        ``A, b, c, d`` is given in matrix form (see
+        :func:`add_linear_constraints() <picos.Problem.add_linear_constraints>`
+        for the accepted formats).
+
+        :param A: The matrix of the expression inside the norm.
+        :param x: A variable, or an affine expression (vectorized in column-major order).
+        :type x: :class:`AffinExp <picos.AffinExp>`.
+        :param b: The constant term inside the norm (vector or scalar).
+        :param c: The vector of coefficients of the right hand side
+                  (``None`` for a constant right hand side).
+        :param d: The constant term of the right hand side.
+        :type d: float.
+        :param key: Optional parameter to describe the constraint with a key string.
+        :type key: str.
+        :param ret: Do you want the added constraint to be returned ?
+        :type ret: bool.
+        """
+        inside = _matrix_times_exp(A, x) + b
+        if c is None:
+            rhs = AffinExp({}, constant=cvx.matrix(float(d), (1, 1)),
+                           size=(1, 1), string=str(float(d)))
+        else:
+            cmat, cstring = _retrieve_matrix(c)
+            rhs = _matrix_times_exp(cmat.T, x) + d
+        return self.add_constraint(abs(inside) < rhs, key, ret)
+
+    def add_psd_constraint(self, F, x, F0=0, key=None, ret=False):
+        """adds the linear matrix inequality ``F(x) + F0 >> 0`` in the problem,
+        where the linear map ``F`` is given by a matrix with ``n**2`` rows:
+        the column-major vectorization of the ``n x n`` matrix ``F(x)`` is
+        ``F*x[:]`` (see
+        :func:`add_linear_constraints() <picos.Problem.add_linear_constraints>`
+        for the accepted formats). As for the operator ``>>``, only the lower
+        triangular part of ``F(x) + F0`` is taken into account.
+
+        :param F: The matrix of the linear map.
+        :param x: A variable, or an affine expression (vectorized in column-major order).
+        :type x: :class:`AffinExp <picos.AffinExp>`.
+        :param F0: The constant term (``n x n`` matrix or scalar).
+        :param key: Optional parameter to describe the constraint with a key string.
+        :type key: str.
+        :param ret: Do you want the added constraint to be returned ?
+        :type ret: bool.
+        """
+        Fmat, Fstring = _retrieve_matrix(F)
+        n = int(round(Fmat.size[0]**0.5))
+        if n * n != Fmat.size[0]:
+            raise ValueError('the number of rows of F must be a square')
+        lhs = _matrix_times_exp(Fmat, x, (n, n))
+        if not _is_numeric(F0) or F0 != 0:
+            lhs = lhs + F0
+        return self.add_constraint(lhs >> 0, key, ret)
+
     def get_valued_variable(self, name):
         """
         Returns the value of the variable (as an :func:`cvxopt matrix <cvxopt:cvxopt.matrix>`)
@@ -1830,6 +2248,186 @@ class Problem(object):
             xx = cvx.matrix([xx, self.variables[v].value[:]])
         return xx
 
+    def _value_vector(self):
+        """
+        Returns the vector ``x`` of the values of all variables, ordered
+        by their start indices (the symmetric variables appear in svec form),
+        so that the value of an affine expression is ``G*x+h``,
+        where ``(G,h)`` is returned by :func:`_makeGandh`.
+        """
+        self._compact_variables()
+        x = cvx.matrix(0., (self.numberOfVars, 1))
+        for var in self.variables.values():
+            if var._value is None:
+                raise Exception(var.name + ' is not valued')
+            x[var.startIndex:var.endIndex] = cvx.matrix(var._value)[:]
+        return x
+
+    def feasibility_report(self):
+        """
+        Returns the list of the violations of the constraints by the
+        current value of the variables, in the order of
+        ``self.constraints``. A violation is ``0.`` for a satisfied
+        constraint, and otherwise
+
+          * the largest negative part of the slack for an inequality or
+            a cone constraint, and the largest absolute residual
+            for an equality;
+          * the largest of the asymmetry of the slack matrix and of
+            minus its smallest eigenvalue for a SDP constraint.
+
+        The affine expressions of the linear, cone and SDP constraints
+        are evaluated together, by a single sparse product with the vector
+        of all variables. The smallest eigenvalue of a large slack matrix
+        is computed with ``scipy.sparse.linalg.eigsh``, if scipy is
+        available.
+
+        **Example:**
+
+        >>> import picos as pic
+        >>> prob = pic.Problem()
+        >>> x = prob.add_variable('x', 2)
+        >>> c1 = prob.add_constraint(x > 1)
+        >>> c2 = prob.add_constraint(abs(x) < 2)
+        >>> x.value = [1, 2]
+        >>> ['{0:.3f}'.format(v) for v in prob.feasibility_report()]
+        ['0.000', '0.236']
+        """
+        if self.is_complex():
+            return [_slack_violation(cs.typeOfConstraint, cs.slack)
+                    for cs in self.constraints]
+
+        # affine expressions involved in each constraint
+        exps = []
+        for cs in self.constraints:
+            typ = cs.typeOfConstraint
+            if typ[:3] in ('lin', 'sdp'):
+                exps.append((cs.Exp1, cs.Exp2))
+            elif typ == 'SOcone':
+                exps.append((cs.Exp1, cs.Exp2))
+            elif typ == 'RScone':
+                exps.append((cs.Exp1, cs.Exp2, cs.Exp3))
+            else:
+                exps.append(None)
+
+        # evaluate them all at once; the stacked matrix is kept for the
+        # next call, as long as the blocks cached by _makeGandh are the
+        # same objects (a block is rebuilt when its expression is modified,
+        # or when the layout of the variables changes)
+        x = self._value_vector()
+        allexps = [e for ex in exps for e in (ex or ())]
+        Gs, hs = [], []
+        for e in allexps:
+            G, h = self._makeGandh(e)
+            Gs.append(G)
+            hs.append(h)
+        if Gs:
+            cached = self._feasibility_operator
+            if (cached is not None and len(cached[0]) == len(Gs) and
+                    all([G1 is G2 for G1, G2 in zip(cached[0], Gs)])):
+                G = cached[1]
+            else:
+                # (concatenating the transposes is faster with cvxopt)
+                G = cvx.sparse([[Gi.T] for Gi in Gs]).T
+                self._feasibility_operator = (Gs, G)
+            vals = np.array(G * x + cvx.matrix(hs)).ravel()
+
+        violations = []
+        ind = 0
+        for cs, ex in zip(self.constraints, exps):
+            typ = cs.typeOfConstraint
+            if ex is None:
+                violations.append(_slack_violation(typ, cs.slack))
+                continue
+            parts = []
+            for e in ex:
+                sz = e.size[0] * e.size[1]
+                parts.append(vals[ind:ind + sz])
+                ind += sz
+            if typ == 'SOcone':
+                viol = np.linalg.norm(parts[0]) - parts[1][0]
+            elif typ == 'RScone':
+                viol = (np.linalg.norm(parts[0])**2 -
+                        parts[1][0] * parts[2][0])
+            elif typ == 'lin=':
+                viol = np.abs(parts[0] - parts[1]).max() if len(
+                    parts[0]) else 0.
+            else:
+                if typ[3] == '<':
+                    sl = parts[1] - parts[0]
+                else:
+                    sl = parts[0] - parts[1]
+                if typ[:3] == 'sdp':
+                    n = cs.Exp1.size[0]
+                    viol = _sdp_violation(sl.reshape((n, n), order='F'))
+                else:
+                    viol = -sl.min() if len(sl) else 0.
+            violations.append(max(0., float(viol)))
+        return violations
+
+    def solution_pool(self):
+        """
+        Returns the pool of alternative solutions returned by the solver
+        (with the option ``pool_size``), or set with
+        :func:`set_var_value() <picos.Problem.set_var_value>`,
+        as a dense matrix whose kth column is the vector of all variables
+        of the kth solution (ordered as in :func:`_makeGandh`).
+        The matrix is built once, and then reused until the pool or
+        the variables change.
+        Use :func:`compile_expressions() <picos.Problem.compile_expressions>`
+        to evaluate expressions over the whole pool.
+        """
+        key = (self._layout_version, self.numberOfVars)
+        if self._pool is not None and self._pool[0] == key:
+            return self._pool[1]
+        self._compact_variables()
+        npool = max([max(var.value_alt) + 1 for var in self.variables.values()
+                     if var.value_alt] or [0])
+        pool = cvx.matrix(0., (self.numberOfVars, npool))
+        for var in self.variables.values():
+            for ind in range(npool):
+                if ind not in var.value_alt:
+                    raise Exception(
+                        var.name +
+                        ' does not have a value for the index ' +
+                        str(ind))
+                pool[var.startIndex:var.endIndex, ind] = \
+                    cvx.matrix(var.value_alt[ind])[:]
+        self._pool = (key, pool)
+        return pool
+
+    def compile_expressions(self, exps):
+        """
+        Compiles a list of expressions involving the variables of the
+        problem, so that they can be evaluated together. The affine parts
+        of the expressions are stacked in a single sparse matrix, which is
+        multiplied by the vector of all variable values, and the quadratic
+        terms are evaluated from the triplets of all quadratic forms at once.
+
+        Returns an object whose method ``eval()`` returns the list of the
+        values of the expressions (the same as their ``value`` attribute),
+        for the current values of the variables.
+        The method ``eval_pool()`` evaluates the expressions over the
+        pool of solutions of the problem (cf. :func:`solution_pool()
+        <picos.Problem.solution_pool>`), with a single product by
+        the matrix of the pool.
+        Parameters are evaluated with their current value; the expressions
+        are compiled again if the variables of the problem change.
+        Expressions of other types (e.g. a :class:`GeoMeanExp
+        <picos.GeoMeanExp>`) are evaluated as usual.
+
+        **Example:**
+
+        >>> import picos as pic
+        >>> prob = pic.Problem()
+        >>> x = prob.add_variable('x', 2)
+        >>> kpis = prob.compile_expressions([x[0] + 2*x[1], abs(x), x[0]*x[1] + 1])
+        >>> x.value = [3, 4]
+        >>> [v[0] for v in kpis.eval()]
+        [11.0, 5.0, 13.0]
+        """
+        return _CompiledExpressions(self, exps)
+
     def check_current_value_feasibility(self, tol=1e-5):
         """
         returns ``True`` if the
@@ -1838,32 +2436,17 @@ class Problem(object):
         tolerance ``tol``. If ``tol`` is set to ``None``,
         the option parameter ``options['tol']`` is used instead.
         The integer feasibility is checked with a tolerance of 1e-3.
+        The violation of each constraint is given by
+        :func:`feasibility_report() <picos.Problem.feasibility_report>`.
         """
         if tol is None:
             if not(self.options['feastol'] is None):
                 tol = self.options['feastol']
             else:
                 tol = self.options['tol']
-        for cs in self.constraints:
-            sl = cs.slack
-            if not(isinstance(sl, cvx.matrix) or isinstance(sl, cvx.spmatrix)):
-                sl = cvx.matrix(sl)
-            if cs.typeOfConstraint.startswith('sdp'):
-                # check symmetry
-                if min(sl - sl.T) < -tol:
-                    return (False, -min(sl - sl.T))
-                if min(sl.T - sl) < -tol:
-                    return (False, -min(sl.T - sl))
-                # check positive semidefiniteness
-                if isinstance(sl, cvx.spmatrix):
-                    sl = cvx.matrix(sl)
-                sl = np.array(sl)
-                eg = np.linalg.eigvalsh(sl)
-                if min(eg) < -tol:
-                    return (False, -min(eg))
-            else:
-                if min(sl) < -tol:
-                    return (False, -min(sl))
+        for viol in self.feasibility_report():
+            if viol > tol:
+                return (False, viol)
         # integer feasibility
         if not(self.is_continuous()):
             for vnam, v in six.iteritems(self.variables):
@@ -1887,6 +2470,7 @@ class Problem(object):
         """
         defines the variables gurobi_Instance and grbvar
         """
+        self._compact_variables()
 
         '''
         #this is not needed anymore, because we handle deleted constraints dynamically
@@ -2495,6 +3079,7 @@ class Problem(object):
         Defines the variables cplex_Instance and cplexvar,
         used by the cplex solver.
         """
+        self._compact_variables()
         try:
             import cplex
         except:
@@ -3129,6 +3714,7 @@ class Problem(object):
         new_cvxopt_cons_only: if True, consider only cons where 'cvxopt' not in passed
         reset: if True, reset the cvxoptVars at the beginning.
         """
+        self._compact_variables()
         if any([('cvxopt' not in cs.passed) for cs in self._deleted_constraints]):
             for cs in self._deleted_constraints:
                 if 'cvxopt' not in cs.passed:
@@ -3219,6 +3805,13 @@ class Problem(object):
             prog = ProgressBar(0, limitbar, None, mode='fixed')
             oldprog = str(prog)
 
+        # blocks of rows to append to A,b,Gl,hl,F,g; the matrices are
+        # built only once, at the end
+        A_blocks, b_blocks = [self.cvxoptVars['A']], [self.cvxoptVars['b']]
+        Gl_blocks, hl_blocks = [self.cvxoptVars['Gl']], [self.cvxoptVars['hl']]
+        F_blocks, g_blocks = [self.cvxoptVars['F']], [self.cvxoptVars['g']]
+        nGl = self.cvxoptVars['Gl'].size[0]
+
         # constraints
         for k, consk in enumerate(self.constraints):
             if self.options['verbose'] > 1:
@@ -3245,20 +3838,16 @@ class Problem(object):
                 (G_lhs, h_lhs) = self._makeGandh(consk.Exp1)
                 (G_rhs, h_rhs) = self._makeGandh(consk.Exp2)
                 if sense == '=':
-                    self.cvxoptVars['A'] = cvx.sparse(
-                        [self.cvxoptVars['A'], G_lhs - G_rhs])
-                    self.cvxoptVars['b'] = cvx.matrix(
-                        [self.cvxoptVars['b'], h_rhs - h_lhs])
+                    A_blocks.append(G_lhs - G_rhs)
+                    b_blocks.append(h_rhs - h_lhs)
                 elif sense == '<':
-                    self.cvxoptVars['Gl'] = cvx.sparse(
-                        [self.cvxoptVars['Gl'], G_lhs - G_rhs])
-                    self.cvxoptVars['hl'] = cvx.matrix(
-                        [self.cvxoptVars['hl'], h_rhs - h_lhs])
+                    Gl_blocks.append(G_lhs - G_rhs)
+                    hl_blocks.append(h_rhs - h_lhs)
+                    nGl += G_lhs.size[0]
                 elif sense == '>':
-                    self.cvxoptVars['Gl'] = cvx.sparse(
-                        [self.cvxoptVars['Gl'], G_rhs - G_lhs])
-                    self.cvxoptVars['hl'] = cvx.matrix(
-                        [self.cvxoptVars['hl'], h_lhs - h_rhs])
+                    Gl_blocks.append(G_rhs - G_lhs)
+                    hl_blocks.append(h_lhs - h_rhs)
+                    nGl += G_lhs.size[0]
                 else:
                     raise NameError('unexpected case')
             elif consk.typeOfConstraint == 'SOcone':
@@ -3268,8 +3857,7 @@ class Problem(object):
                     self.cvxoptVars['Gq'].append(cvx.sparse([-c, -A]))
                     self.cvxoptVars['hq'].append(cvx.matrix([d, b]))
                 else:
-                    self.cvxoptVars['quadcons'].append(
-                        (k, self.cvxoptVars['Gl'].size[0]))
+                    self.cvxoptVars['quadcons'].append((k, nGl))
                     if aff_part_of_quad:
                         raise Exception('cone_as_quad + aff_part_of_quad')
             elif consk.typeOfConstraint == 'RScone':
@@ -3282,25 +3870,22 @@ class Problem(object):
                     self.cvxoptVars['hq'].append(
                         cvx.matrix([d1 + d2, 2 * b, d1 - d2]))
                 else:
-                    self.cvxoptVars['quadcons'].append(
-                        (k, self.cvxoptVars['Gl'].size[0]))
+                    self.cvxoptVars['quadcons'].append((k, nGl))
                     if aff_part_of_quad:
                         raise Exception('cone_as_quad + aff_part_of_quad')
             elif consk.typeOfConstraint == 'lse':
                 (F, g) = self._makeGandh(consk.Exp1)
-                self.cvxoptVars['F'] = cvx.sparse([self.cvxoptVars['F'], F])
-                self.cvxoptVars['g'] = cvx.matrix([self.cvxoptVars['g'], g])
+                F_blocks.append(F)
+                g_blocks.append(g)
                 self.cvxoptVars['K'].append(F.size[0])
             elif consk.typeOfConstraint == 'quad':
-                self.cvxoptVars['quadcons'].append(
-                    (k, self.cvxoptVars['Gl'].size[0]))
+                self.cvxoptVars['quadcons'].append((k, nGl))
                 if aff_part_of_quad:
                     # quadratic part handled later
                     (G_lhs, h_lhs) = self._makeGandh(consk.Exp1.aff)
-                    self.cvxoptVars['Gl'] = cvx.sparse(
-                        [self.cvxoptVars['Gl'], G_lhs])
-                    self.cvxoptVars['hl'] = cvx.matrix(
-                        [self.cvxoptVars['hl'], -h_lhs])
+                    Gl_blocks.append(G_lhs)
+                    hl_blocks.append(-h_lhs)
+                    nGl += G_lhs.size[0]
             elif consk.typeOfConstraint[:3] == 'sdp':
                 sense = consk.typeOfConstraint[3]
                 (G_lhs, h_lhs) = self._makeGandh(consk.Exp1)
@@ -3323,16 +3908,23 @@ class Problem(object):
                 for ind, (lo, up) in six.iteritems(variable.bnd):
                     if not(lo is None):
                         (G_lhs, h_lhs) = self._makeGandh(variable[ind])
-                        self.cvxoptVars['Gl'] = cvx.sparse(
-                            [self.cvxoptVars['Gl'], -G_lhs])
-                        self.cvxoptVars['hl'] = cvx.matrix(
-                            [self.cvxoptVars['hl'], -lo])
+                        Gl_blocks.append(-G_lhs)
+                        hl_blocks.append(cvx.matrix(-lo, (1, 1), tc='d'))
                     if not(up is None):
                         (G_lhs, h_lhs) = self._makeGandh(variable[ind])
-                        self.cvxoptVars['Gl'] = cvx.sparse(
-                            [self.cvxoptVars['Gl'], G_lhs])
-                        self.cvxoptVars['hl'] = cvx.matrix(
-                            [self.cvxoptVars['hl'], up])
+                        Gl_blocks.append(G_lhs)
+                        hl_blocks.append(cvx.matrix(up, (1, 1), tc='d'))
+
+        # assemble the blocks
+        if len(A_blocks) > 1:
+            self.cvxoptVars['A'] = _vstack(A_blocks, ss)
+            self.cvxoptVars['b'] = cvx.matrix(b_blocks)
+        if len(Gl_blocks) > 1:
+            self.cvxoptVars['Gl'] = _vstack(Gl_blocks, ss)
+            self.cvxoptVars['hl'] = cvx.matrix(hl_blocks)
+        if len(F_blocks) > 1:
+            self.cvxoptVars['F'] = _vstack(F_blocks, ss)
+            self.cvxoptVars['g'] = cvx.matrix(g_blocks)
 
         # reshape hs matrices as square matrices
         # for m in self.cvxoptVars['hs']:
@@ -3436,6 +4028,7 @@ class Problem(object):
             self.reset_mosek_instance(True)
         '''
 
+        self._compact_variables()
         if self.options['verbose'] > 0:
             print('build mosek instance')
         #import mosek
@@ -4471,6 +5064,7 @@ class Problem(object):
         Defines the variables sdpa_executable, sdpa_dats_filename, and
         sdpa_out_filename used by the sdpa solver.
         """
+        self._compact_variables()
         if any([('sdpa' not in cs.passed) for cs in self._deleted_constraints]):
             for cs in self._deleted_constraints:
                 if 'sdpa' not in cs.passed:
@@ -4500,13 +5094,19 @@ class Problem(object):
         if which(sdpa_executable) is None:
             raise OSError(sdpa_executable + " is not in the path")
 
+        # each run has its own temporary directory, so that several
+        # sdpa processes can run at the same time
         import tempfile
-        tempfile_ = tempfile.NamedTemporaryFile()
-        tmp_filename = tempfile_.name
-        tempfile_.close()
-        self.sdpa_dats_filename = tmp_filename + ".dat-s"
-        self.sdpa_out_filename = tmp_filename + ".out"
-        self._write_sdpa(self.sdpa_dats_filename)
+        import os
+        import shutil
+        tmp_dir = tempfile.mkdtemp(prefix='picos_sdpa_')
+        self.sdpa_dats_filename = os.path.join(tmp_dir, 'problem.dat-s')
+        self.sdpa_out_filename = os.path.join(tmp_dir, 'problem.out')
+        try:
+            self._write_sdpa(self.sdpa_dats_filename)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
 
     def _convert_picos_exp_to_scip_exp(self,expression):
         """
@@ -4548,6 +5148,7 @@ class Problem(object):
         Defines the variables scip_solver, scip_vars and scip_obj,
         used by the zibopt solver.
         """
+        self._compact_variables()
         if any([('scip' not in cs.passed) for cs in self._deleted_constraints]):
             for cs in self._deleted_constraints:
                 if 'scip' not in cs.passed:
@@ -4693,16 +5294,204 @@ class Problem(object):
                   which depends on the solver and contains information about the solving process.
 
         """
+        if self._async_solve is not None and not self._async_solve.done():
+            raise Exception('an asynchronous solve of this problem is running')
+        sol, primals, duals = self._solve(options)
+        return self._set_solution(sol, primals, duals)
+
+    def solve_async(self, **options):
+        """
+        Solves the problem in a worker thread, and returns at once a
+        :class:`Future <concurrent.futures.Future>` of the solution.
+
+        The solve is the same as with :func:`solve() <picos.Problem.solve>`,
+        but the values of the variables, the duals of the constraints and the
+        status of the problem are only written back when the caller collects
+        the solution with the method ``result()`` of the future (which returns
+        the dictionary returned by :func:`solve() <picos.Problem.solve>`, or
+        raises the exception of the solver). In an ``asyncio`` event loop,
+        the future can be awaited with
+        ``sol = await asyncio.wrap_future(prob.solve_async())``.
+
+        The cancellation is cooperative: the method ``cancel()`` of the
+        future asks the solve to stop, which happens at the next check
+        point (between the building of the solver instance and the call to
+        the solver, between two SQP iterations, or at once for the
+        ``sdpa`` executable, which is killed); ``result()`` then raises a
+        :class:`CancelledError <concurrent.futures.CancelledError>`.
+        A solver which is running in the current process cannot be
+        interrupted, so a solve which has reached it stops when the
+        solver returns.
+
+        :keyword options: options to update before the call to the solver,
+                          as in :func:`solve() <picos.Problem.solve>`.
+
+        .. note :: The problem must not be modified while it is solved; the
+                   solves of distinct problems can run at the same time.
+                   Problems with a general objective function are solved
+                   (by SQP) on a copy of the problem.
+                   The options of smcp (and those of cvxopt, for versions of
+                   cvxopt older than 1.1.9) are set in the global dictionary
+                   ``solvers.options`` of the module, so concurrent solves
+                   with these solvers share the options ``tol``, ``maxit``,
+                   ``verbose``, etc.: they should use the same values.
+        """
+        if _Future is object:
+            raise ImportError('concurrent.futures not found')
+        if self._async_solve is not None and not self._async_solve.done():
+            raise Exception('an asynchronous solve of this problem is running')
+        future = _SolveFuture(self)
+        self._async_solve = future
+        worker = threading.Thread(target=future._run, args=(options,))
+        worker.daemon = True
+        worker.start()
+        return future
+
+    def _solve_detached(self, options):
+        """
+        solves the problem like :func:`_solve`, without modifying the values
+        of the variables (the SQP iterates are computed on a copy of the
+        problem).
+        """
+        if not isinstance(self.objective[1], GeneralFun):
+            return self._solve(options)
+        cop = self.copy()
+        for name, var in six.iteritems(self.variables):
+            if var.is_valued():
+                cop.variables[name].value = var.value
+        sol = cop.solve(**options)
+        primals = dict((name, var.value) for name, var
+                       in six.iteritems(cop.variables) if var.is_valued())
+        duals = [cs.dual for cs in cop.constraints]
+        return sol, primals, duals
+
+    def _race_solve(self):
+        """
+        Solves the problem with several solvers in parallel processes, cf.
+        the option ``solver='race'``, and returns the best result as
+        :func:`_solve`.
+        """
+        import multiprocessing
+        if self.options['race_solvers'] is None:
+            avs = available_solvers()
+            solvers = [sv for sv in self._solver_order()
+                       if sv in avs and _import_solver(sv)]
+        else:
+            # (a solver runs at most once)
+            solvers = []
+            for sv in self.options['race_solvers']:
+                if sv not in solvers:
+                    solvers.append(sv)
+        if not solvers:
+            raise NotAppropriateSolverError(
+                'no solver available for problem of type {0}'.format(
+                    self.type))
+        if len(solvers) == 1:
+            try:
+                sol, primals, duals = self._solve({'solver': solvers[0]})
+            finally:
+                self.set_option('solver', 'race')
+            sol['solver'] = solvers[0]
+            return sol, primals, duals
+
+        if self.options['feastol'] is None:
+            tol = 1e-5
+        else:
+            tol = self.options['feastol']
+        options = {'verbose': max(self.options['verbose'] - 1, 0)}
+        queue = multiprocessing.Queue()
+        waiting = list(reversed(solvers))
+        running = {}
+        first = None
+        errors = []
+        try:
+            while waiting or running:
+                while waiting and len(running) < multiprocessing.cpu_count():
+                    solver = waiting.pop()
+                    proc = multiprocessing.Process(
+                        target=_race_worker,
+                        args=(self, dict(options, solver=solver), tol, queue))
+                    proc.daemon = True
+                    proc.start()
+                    running[solver] = proc
+                try:
+                    solver, res, feasible = queue.get(timeout=0.05)
+                except six.moves.queue.Empty:
+                    _check_cancelled()
+                    for solver, proc in list(running.items()):
+                        if not proc.is_alive() and proc.exitcode != 0:
+                            # the process died without a result
+                            del running[solver]
+                            errors.append('{0}: exit code {1}'.format(
+                                solver, proc.exitcode))
+                    continue
+                running.pop(solver).join()
+                if res is None:
+                    errors.append('{0}: {1}'.format(solver, feasible))
+                    continue
+                primals, duals, status, sol = res
+                sol['solver'] = solver
+                if feasible:
+                    return sol, primals, duals
+                if first is None:
+                    first = (sol, primals, duals)
+        finally:
+            for proc in running.values():
+                proc.terminate()
+            for proc in running.values():
+                # a process running a solver compiled code may not see the
+                # SIGTERM before the end of this code
+                proc.join(0.1)
+                if proc.is_alive():
+                    getattr(proc, 'kill', proc.terminate)()
+                    proc.join()
+        if first is not None:
+            return first
+        raise Exception('no solver of the race returned a solution ('
+                        + '; '.join(errors) + ')')
+
+    def _set_solution(self, sol, primals, duals):
+        """
+        writes the values of the variables (``primals``) and the duals of
+        the constraints (``duals``) returned by :func:`_solve`, and the
+        status of the solution ``sol``, which is returned.
+        """
+        if primals is not None:
+            for k in primals:
+                if not primals[k] is None:
+                    self.set_var_value(k, primals[k], optimalvar=True)
+        if duals is not None:
+            for i, d in enumerate(duals):
+                self.constraints[i].set_dualVar(d)
+        if sol['obj'] == 'toEval' and not(self.objective[1] is None):
+            sol['obj'] = self.objective[1].eval()[0]
+        self.status = sol['status']
+        return sol
+
+    def _solve(self, options):
+        """
+        Solves the problem and returns ``(sol, primals, duals)``, where ``sol``
+        is the dictionary returned by :func:`solve`, ``primals`` is the
+        dictionary of the values of the variables and ``duals`` the list of
+        the duals of the constraints, which are not written in the problem yet
+        (they are ``None`` when they are not retrieved).
+        """
+        _check_cancelled()
         if options is None:
             options = {}
         self.update_options(**options)
+        if self._parameters_changed:
+            self._update_parameters()
+        if self.options['solver'] == 'race':
+            return self._race_solve()
         if self.options['solver'] is None:
             self.solver_selection()
 
         # self._eliminate_useless_variables()
 
         if isinstance(self.objective[1], GeneralFun):
-            return self._sqpsolve(options)
+            # the SQP iterates are written in the variables
+            return self._sqpsolve(options), None, None
 
         # is it a complex SDP that we must transform to a real problem ?
         complexSDP = self.is_complex()
@@ -4723,7 +5512,21 @@ class Problem(object):
             if self.options['verbose'] > 0:
                 print('*** Making the problem real...  ***')
 
-            realP = self.to_real()
+            # the real problem is built again only if the variables, the
+            # constraints or the objective changed since the last solve
+            key = (self._layout_version, self.numberOfVars, self.objective,
+                   tuple(self.constraints))
+            if (self._real_problem is not None and
+                    self._real_problem[0][:2] == key[:2] and
+                    self._real_problem[0][2] is key[2] and
+                    len(self._real_problem[0][3]) == len(key[3]) and
+                    all([c1 is c2 for c1, c2 in
+                         zip(self._real_problem[0][3], key[3])])):
+                realP = self._real_problem[1]
+                realP._options = _NonWritableDict(self.options)
+            else:
+                realP = self.to_real()
+                self._real_problem = (key, realP)
             if self.options['verbose'] > 0:
                 print(
                     '*** OK, solve the real problem and transform the solution as in the original problem...  ***')
@@ -4810,7 +5613,7 @@ class Problem(object):
                             "\033[1;31m Error raised when dualizing the problem: \033[0m")
                         print(ex)
                         print ('I retry to solve without dualizing')
-                    return self.solve(solve_via_dual=False)
+                    return self._solve({'solve_via_dual': False})
 
                 for cs in self.constraints:
                     if self.options['solver'].startswith('mosek'):
@@ -4894,6 +5697,7 @@ class Problem(object):
                             duals.append(X)
                             isdp += 1
         else:
+            _check_cancelled()
             try:
                 # WARNING: Bug with cvxopt-mosek ?
                 if (self.options['solver'] == 'CVXOPT'  # obolete name, use lower case
@@ -4934,34 +5738,111 @@ class Problem(object):
                     pcop = self.copy()
                     pcop.convert_quad_to_socp()
                     sol = pcop.solve()
-                    self.status = sol['status']
-                    for vname, v in six.iteritems(self.variables):
-                        v.value = pcop.get_variable(vname).value
-                    for i, cs in enumerate(self.constraints):
-                        dui = pcop.constraints[i].dual
-                        if not(dui is None):
-                            cs.set_dualVar(dui)
-                    return sol
+                    primals = dict((vname, pcop.get_variable(vname).value)
+                                   for vname in self.variables)
+                    # (the conversion appends constraints to the copy)
+                    duals = [cs.dual if pcs.dual is None else pcs.dual
+                             for cs, pcs in zip(self.constraints,
+                                                pcop.constraints)]
+                    return sol, primals, duals
                 else:
                     raise
+            _check_cancelled()
 
         if 'noprimals' in self.options and self.options['noprimals']:
-            pass
-        else:
-            for k in primals:
-                if not primals[k] is None:
-                    self.set_var_value(k, primals[k], optimalvar=True)
-
+            primals = None
         if 'noduals' in self.options and self.options['noduals']:
-            pass
-        else:
-            for i, d in enumerate(duals):
-                self.constraints[i].set_dualVar(d)
-        if obj == 'toEval' and not(self.objective[1] is None):
-            obj = self.objective[1].eval()[0]
+            duals = None
         sol['obj'] = obj
-        self.status = sol['status']
-        return sol
+        return sol, primals, duals
+
+    def _cvxopt_starting_point(self, G, h, dims, P):
+        """
+        Builds the arguments ``primalstart`` and ``dualstart`` of
+        ``cvxopt.solvers.conelp()`` from the values of the variables and the
+        duals of the constraints, typically those of a previous solve.
+        ``P`` is the matrix which removes the trivial rows ``0==0`` of ``A``.
+        The slacks and the duals are moved to the interior of the cones when
+        needed. A part of the starting point which cannot be built (some
+        variable or dual is missing) is left out.
+        """
+        def to_interior(v):
+            # moves v along the identity of the cone (1 for the linear part,
+            # (1,0,...,0) for a SOC block, the identity for a SDP block),
+            # so that its smallest 'eigenvalue' is at least margin
+            nl = dims['l']
+            mins = [min(v[:nl])] if nl else []
+            ind = nl
+            for m in dims['q']:
+                mins.append(v[ind] - np.linalg.norm(v[ind + 1:ind + m]))
+                ind += m
+            for m in dims['s']:
+                V = np.array(v[ind:ind + m * m]).reshape((m, m), order='F')
+                mins.append(np.linalg.eigvalsh(0.5 * (V + V.T))[0])
+                ind += m * m
+            if not mins:
+                return v
+            margin = 1e-3 * max(1., np.linalg.norm(v))
+            shift = margin - min(mins)
+            if shift > 0:
+                v = +v
+                v[:nl] += shift
+                ind = nl
+                for m in dims['q']:
+                    v[ind] += shift
+                    ind += m
+                for m in dims['s']:
+                    v[ind:ind + m * m:m + 1] += shift
+                    ind += m * m
+            return v
+
+        start = {}
+
+        # primal point: x from the values of the variables, s = h - G*x
+        x = cvx.matrix(0., (self.numberOfVars, 1))
+        try:
+            for var in self.variables.values():
+                val = var.value
+                if var.vtype == 'symmetric':
+                    val = svec(val)
+                x[var.startIndex:var.endIndex] = cvx.matrix(val)[:]
+        except Exception:
+            pass  # some variable is not valued
+        else:
+            start['primalstart'] = {'x': x, 's': to_interior(h - G * x)}
+
+        # dual point: y and z from the duals of the constraints, in the order
+        # in which _cvxopt_solve() retrieves them
+        z = cvx.matrix(0., (G.size[0], 1))
+        yfull = []
+        (indzl, indzq) = (0, dims['l'])
+        indzs = dims['l'] + _bsum(dims['q'])
+        for consk in self.constraints:
+            dual = consk.dual
+            if dual is None:
+                return start
+            dual = cvx.matrix(dual)[:]
+            consSz = dual.size[0]
+            if consk.typeOfConstraint == 'lin=':
+                yfull.append(dual)
+            elif consk.typeOfConstraint[:3] == 'lin':
+                z[indzl:indzl + consSz] = dual
+                indzl += consSz
+            elif consk.typeOfConstraint[2:] == 'cone':
+                z[indzq] = dual[0]
+                z[indzq + 1:indzq + consSz] = -dual[1:]
+                indzq += consSz
+            elif consk.typeOfConstraint[:3] == 'sdp':
+                z[indzs:indzs + consSz] = dual
+                indzs += consSz
+            else:
+                return start
+        if yfull:
+            y = P * cvx.matrix(yfull)
+        else:
+            y = cvx.matrix(0., (P.size[0], 1))
+        start['dualstart'] = {'y': y, 'z': to_interior(z)}
+        return start
 
     def _cvxopt_solve(self):
         """
@@ -5018,12 +5899,19 @@ class Problem(object):
         maxit = self.options['maxit']
         if maxit is None:
             maxit = 999999
-        cvx.solvers.options['maxiters'] = maxit
-        cvx.solvers.options['abstol'] = abstol
-        cvx.solvers.options['feastol'] = feastol
-        cvx.solvers.options['reltol'] = reltol
-        cvx.solvers.options['show_progress'] = bool(
-            self.options['verbose'] > 0)
+        cvxopt_options = dict(cvx.solvers.options)
+        cvxopt_options['maxiters'] = maxit
+        cvxopt_options['abstol'] = abstol
+        cvxopt_options['feastol'] = feastol
+        cvxopt_options['reltol'] = reltol
+        cvxopt_options['show_progress'] = bool(self.options['verbose'] > 0)
+        if _cvxopt_version() >= (1, 1, 9):
+            # the options are passed to each call rather than set in
+            # cvx.solvers.options, which is shared by concurrent solves
+            opts = {'options': cvxopt_options}
+        else:
+            cvx.solvers.options.update(cvxopt_options)
+            opts = {}
         try:
             import smcp.solvers
             smcp.solvers.options['maxiters'] = maxit
@@ -5057,7 +5945,8 @@ class Problem(object):
             sol = cvx.solvers.gp(self.cvxoptVars['K'],
                                  self.cvxoptVars['F'], self.cvxoptVars['g'],
                                  self.cvxoptVars['Gl'], self.cvxoptVars['hl'],
-                                 self.cvxoptVars['A'], self.cvxoptVars['b'])
+                                 self.cvxoptVars['A'], self.cvxoptVars['b'],
+                                 **opts)
         # changes to adapt the problem for the conelp interface:
         elif currentsolver == 'mosek':
             if len(self.cvxoptVars['Gs']) > 0:
@@ -5073,7 +5962,7 @@ class Problem(object):
                     self.cvxoptVars['hl'],
                     self.cvxoptVars['A'],
                     self.cvxoptVars['b'],
-                    solver=currentsolver)
+                    solver=currentsolver, **opts)
                 probtype = 'LP'
             else:
                 if self.options['verbose'] > 0:
@@ -5088,7 +5977,7 @@ class Problem(object):
                     self.cvxoptVars['hq'],
                     self.cvxoptVars['A'],
                     self.cvxoptVars['b'],
-                    solver=currentsolver)
+                    solver=currentsolver, **opts)
                 probtype = 'SOCP'
         else:
             dims = {}
@@ -5151,10 +6040,13 @@ class Problem(object):
                     print('--------------------------')
                     print('  cvxopt CONELP solver')
                     print('--------------------------')
+                if self.options['hotstart']:
+                    opts.update(self._cvxopt_starting_point(G, h, dims, P))
                 sol = cvx.solvers.conelp(self.cvxoptVars['c'],
                                          G, h, dims,
                                          self.cvxoptVars['A'],
-                                         self.cvxoptVars['b'])
+                                         self.cvxoptVars['b'],
+                                         **opts)
             probtype = 'ConeLP'
 
         tend = time.time()
@@ -5564,13 +6456,9 @@ class Problem(object):
                 if numsol > 1:
                     for ii, ind in enumerate(indsols):
                         for var in self.variables.values():
-                            value = []
-                            sz_var = var.endIndex - var.startIndex
-                            for i in range(sz_var):
-                                name = var.name + '_' + str(i)
-                                value.append(
-                                    c.solution.pool.get_values(
-                                        ind, name))
+                            # a range query, as for the main solution
+                            value = c.solution.pool.get_values(
+                                ind, var.startIndex, var.endIndex - 1)
                             if var.vtype in ('symmetric',):
                                 value = svecm1(
                                     cvx.matrix(value))  # varvect was the svec
@@ -6691,6 +7579,7 @@ class Problem(object):
         #-----------------------------#
         import time
         import os
+        import shutil
         #--------------------#
         #  call the solver   #
         #--------------------#
@@ -6700,80 +7589,31 @@ class Problem(object):
             if not any(self.cvxoptVars.values()):
                 self._make_cvxopt_instance(hard_coded_bounds=True)
         else:
-            from subprocess import call
             self._make_sdpaopt(self.options['sdpa_executable'])
             tstart = time.time()
             params = [self.sdpa_executable, '-ds', self.sdpa_dats_filename,
                       '-o', self.sdpa_out_filename]
             for key in self.options['sdpa_params']:
                 params += [key, str(self.options['sdpa_params'][key])]
-            if self.options['verbose'] >= 1:
-                call(params)
-            else:
-                with open(os.devnull, "w") as fnull:
-                    call(params, stdout=fnull, stderr=fnull)
+            try:
+                self._run_sdpa(params)
+            except BaseException:
+                shutil.rmtree(os.path.dirname(self.sdpa_dats_filename),
+                              ignore_errors=True)
+                raise
         tend = time.time()
         #-----------------------#
         # retrieve the solution #
         #-----------------------#
-        file_ = open(self.sdpa_out_filename, 'r')
-        for line in file_:
-            if line.find("phase.value") > -1:
-                if line.find("pdOPT") > -1:
-                    status = 'optimal'
-                elif line.find("pdFEAS") > -1:
-                    status = 'primal-dual feasible'
-                elif line.find("INF") > -1:
-                    status = 'infeasible'
-                elif line.find("UNBD") > -1:
-                    status = 'unbounded'
-                else:
-                    status = 'unknown'
-            if line.find("objValPrimal") > -1:
-                obj = float((line.split())[2])
-                if self.objective[0]=='max':
-                    obj *= -1
-            if line.find("xVec =") > -1:
-                line = six.next(file_)
-                x_vec = [
-                    float(x) for x in line[
-                        line.rfind('{') + 1:line.find('}')].strip().split(',')]
-            if line.find("yMat =") > -1:
-                dual_solution = []
-                while True:
-                    sol_mat = None
-                    in_matrix = False
-                    i = 0
-                    for row in file_:
-                        if row.find('}') < 0:
-                            continue
-                        if row.startswith('}'):
-                            break
-                        if row.find('{') != row.rfind('{'):
-                            in_matrix = True
-                        numbers = row[row.rfind('{')+1:
-                                      row.find('}')].strip().split(',')
-                        if sol_mat is None:
-                            if in_matrix:
-                                sol_mat = cvx.matrix(0.0, (len(numbers),
-                                                           len(numbers)))
-                            else:
-                                sol_mat = cvx.matrix(0.0, (1, len(numbers)))
-                        for j, number in enumerate(numbers):
-                            sol_mat[i, j] = float(number)
-                        if row.find('}') != row.rfind('}') or not in_matrix:
-                            break
-                        i += 1
-                    dual_solution.append(sol_mat)
-                    if row.startswith('}'):
-                        break
-                if len(dual_solution) > 0 and dual_solution[-1] is None:
-                    dual_solution = dual_solution[:-1]
-
-        file_.close()
-        if 'read_solution' not in self.options['sdpa_params']:
-            os.remove(self.sdpa_dats_filename)
-            os.remove(self.sdpa_out_filename)
+        try:
+            with open(self.sdpa_out_filename, 'r') as file_:
+                status, obj, x_vec, dual_solution = _parse_sdpa_output(file_)
+        finally:
+            if 'read_solution' not in self.options['sdpa_params']:
+                shutil.rmtree(os.path.dirname(self.sdpa_dats_filename),
+                              ignore_errors=True)
+        if obj is not None and self.objective[0] == 'max':
+            obj *= -1
         dims = {}
         dims['s'] = [int(np.sqrt(Gsi.size[0]))
                      for Gsi in self.cvxoptVars['Gs']]
@@ -6853,51 +7693,99 @@ class Problem(object):
         solt['time'] = tend - tstart
         return (primals, duals, obj, solt)
 
+    def _run_sdpa(self, params):
+        """
+        runs the sdpa executable with the command line ``params``
+        and waits for it. The process is stored in ``self.sdpa_process``
+        while it runs, and it is killed if the wait is interrupted or if
+        the solve is cancelled (cf. :func:`solve_async`).
+        """
+        import os
+        from subprocess import Popen
+        cancel = getattr(_solve_state, 'cancel', None)
+        with open(os.devnull, "w") as fnull:
+            if self.options['verbose'] >= 1:
+                self.sdpa_process = Popen(params)
+            else:
+                self.sdpa_process = Popen(params, stdout=fnull, stderr=fnull)
+            try:
+                if cancel is None:
+                    self.sdpa_process.wait()
+                else:
+                    while (self.sdpa_process.poll() is None and
+                           not cancel.wait(0.05)):
+                        pass
+            finally:
+                if self.sdpa_process.poll() is None:
+                    self.sdpa_process.kill()
+                    self.sdpa_process.wait()
+                self.sdpa_process = None
+        _check_cancelled()
+
     def _sqpsolve(self, options):
         """
         Solves the problem by sequential Quadratic Programming.
+        The quadratic subproblems are solved on a single copy of the problem,
+        whose constraints are passed to the solver only once: at each
+        iteration, only its objective (and the centers of the trust regions
+        of the option ``harmonic_steps``, which are parameters) is updated,
+        and the solver is warm-started from the previous iterate.
         """
-        import copy
         for v in self.variables:
-            if self.variables[v].value is None:
-                self.set_var_value(v, cvx.uniform(self.variables[v].size))
-        # lower the display level for mosek
-        self.options['verbose'] -= 1
+            if not self.variables[v].is_valued():
+                self.set_var_value(v, cvx.uniform(*self.variables[v].size))
+        verbose = self.options['verbose']
+        sense = self.objective[0]
+        maxit = self.options['maxit']
+        if maxit is None:
+            maxit = 999999
+        subprob = self.copy()
+        # the function is applied to subexp in the subproblem
+        subexp = subprob.objective[1].Exp
+        # lower the display level for the subproblems
+        subprob.update_options(verbose=max(verbose - 1, 0), hotstart=True)
+        subvars = [(self.variables[v], subprob.variables[v])
+                   for v in self.variables]
+        for var, subvar in subvars:
+            subvar.value = var.value
+
+        if self.options['harmonic_steps']:
+            # trust region ||x-x0|| < radius around the current iterate;
+            # it is inactive at the first iteration
+            radius = subprob.add_parameter('__sqp_radius', 1e10)
+            for var, subvar in subvars:
+                center = subprob.add_parameter('__sqp_center_' + var.name,
+                                               var.value)
+                subprob.add_constraint(abs(subvar - center) < radius)
+
         oldvar = self._eval_all()
-        subprob = copy.deepcopy(self)
-        if self.options['verbose'] > 0:
+        if verbose > 0:
             print('solve by SQP method with proximal convexity enforcement')
             print('it:     crit\t\tproxF\tstep')
             print('---------------------------------------')
         converged = False
         k = 1
         while not converged:
-            obj, grad, hess = self.objective[
-                1].fun(self.objective[1].Exp.eval())
-            diffExp = self.objective[1].Exp - self.objective[1].Exp.eval()
+            _check_cancelled()
+            expval = self.objective[1].Exp.eval()
+            obj, grad, hess = self.objective[1].fun(expval)
+            diffExp = subexp - expval
             quadobj0 = obj + grad.T * diffExp + 0.5 * diffExp.T * hess * diffExp
+            proxterm = abs(diffExp)**2
             proxF = self.options['step_sqp']
-            # VARIANT IN CONSTRAINTS: DO NOT FORCE CONVEXITY...
-            # for v in subprob.variables.keys():
-            #        x=subprob.get_varExp(v)
-            #        x0=self.get_variable(v).eval()
-            #        subprob.add_constraint((x-x0).T*(x-x0)<0.5)
+            if self.options['harmonic_steps'] and k > 1:
+                radius.value = (10. / float(k - 1))**0.5
+                for var, subvar in subvars:
+                    subprob.parameters['__sqp_center_' + var.name].value = \
+                        var.value
             solFound = False
             while (not solFound):
-                if self.objective[0] == 'max':
+                if sense == 'max':
                     # (proximal + force convexity)
-                    quadobj = quadobj0 - proxF * abs(diffExp)**2
+                    subprob.set_objective(sense, quadobj0 - proxF * proxterm)
                 else:
                     # (proximal + force convexity)
-                    quadobj = quadobj0 + proxF * abs(diffExp)**2
-                subprob = copy.deepcopy(self)
-                subprob.set_objective(self.objective[0], quadobj)
-                if self.options['harmonic_steps'] and k > 1:
-                    for v in subprob.variables.keys():
-                        x = subprob.get_varExp(v)
-                        x0 = self.get_variable(v).eval()
-                        subprob.add_constraint(
-                            (x - x0).T * (x - x0) < (10. / float(k - 1)))
+                    subprob.set_objective(sense, quadobj0 + proxF * proxterm)
                 try:
                     sol = subprob.solve()
                     solFound = True
@@ -6905,23 +7793,19 @@ class Problem(object):
                     if str(ex)[:6] == '(1296)':  # function not convex
                         proxF *= (1 + cvx.uniform(1))
                     else:
-                        # reinit the initial verbosity
-                        self.options['verbose'] += 1
                         raise
             if proxF >= 100 * self.options['step_sqp']:
-                # reinit the initial verbosity
-                self.options['verbose'] += 1
                 raise Exception(
                     'function not convex before proxF reached 100 times the initial value')
 
-            for v in subprob.variables:
-                self.set_var_value(v, subprob.get_valued_variable(v))
+            for var, subvar in subvars:
+                var.value = subvar.value
             newvar = self._eval_all()
             step = np.linalg.norm(newvar - oldvar)
             if isinstance(step, cvx.matrix):
                 step = step[0]
             oldvar = newvar
-            if self.options['verbose'] > 0:
+            if verbose > 0:
                 if k == 1:
                     print(
                         '  {0}:         --- \t{1:6.3f} {2:10.4e}'.format(k, proxF, step))
@@ -6933,12 +7817,11 @@ class Problem(object):
             # have we converged ?
             if step < self.options['tol']:
                 converged = True
-            if k > self.options['maxit']:
+            if k > maxit:
                 converged = True
                 print('Warning: no convergence after {0} iterations'.format(k))
 
-        # reinit the initial verbosity
-        self.options['verbose'] += 1
+        self.status = sol['status']
         sol['lastStep'] = step
         return sol
 
@@ -7021,6 +7904,18 @@ class Problem(object):
         """Selects an appropriate solver for this problem
         and sets the option ``'solver'``.
         """
+        avs = available_solvers()
+        for sol in self._solver_order():
+            if sol in avs and _import_solver(sol):
+                self.set_option('solver', sol)
+                return
+        #not found
+        raise NotAppropriateSolverError(
+            'no solver available for problem of type {0}'.format(self.type))
+
+    def _solver_order(self):
+        """returns the list of the solvers which can handle the type of this
+        problem, by order of preference"""
         tp = self.type
         if tp == 'LP':
             order = [
@@ -7068,14 +7963,7 @@ class Problem(object):
         else:
             raise Exception(
                 'no solver available for problem of type {0}'.format(tp))
-        avs = available_solvers()
-        for sol in order:
-            if sol in avs:
-                self.set_option('solver', sol)
-                return
-        #not found
-        raise NotAppropriateSolverError(
-            'no solver available for problem of type {0}'.format(tp))
+        return order
 
     def write_to_file(self, filename, writer='picos'):
         """
@@ -7107,6 +7995,10 @@ class Problem(object):
                                   This format is suitable to save semidefinite programs (SDP). SOC constraints are
                                   stored as semidefinite constraints with an *arrow pattern*.
 
+                         If the name ends with ``'.gz'`` (e.g. ``'problem.lp.gz'``),
+                         the file is compressed with gzip; the format is then
+                         given by the extension that precedes ``'.gz'``.
+
         :type filename: str.
         :param writer: The default writer is ``picos``, which has its own *LP*, *CBF*, and
                        *sparse SDPA* write functions. If cplex, mosek or gurobi is installed,
@@ -7146,6 +8038,8 @@ class Problem(object):
                         a problem that is described in a file created by PICOS, the optimal symmetric variables
                         returned will also be in symmetric vectorized form.
         """
+        if self._parameters_changed:
+            self._update_parameters()
         if self.numberLSEConstraints:
             raise Exception('gp are not supported')
         if not(
@@ -7154,6 +8048,13 @@ class Problem(object):
                 GeneralFun):
             raise Exception('general-obj are not supported')
 
+        # gzip-compressed output
+        if filename[-3:] == '.gz':
+            gzext = '.gz'
+            filename = filename[:-3]
+        else:
+            gzext = ''
+
         # automatic extension recognition
         if not(filename[-4:] in ('.mps', '.opf', '.cbf') or
                filename[-3:] == '.lp' or
@@ -7176,7 +8077,7 @@ class Problem(object):
                     if self.options['convert_quad_to_socp_if_needed']:
                         pcop = self.copy()
                         pcop.convert_quad_to_socp()
-                        pcop.write_to_file(filename, writer)
+                        pcop.write_to_file(filename + gzext, writer)
                         return
                     else:
                         raise QuadAsSocpError(
@@ -7191,6 +8092,7 @@ class Problem(object):
                     filename += '.cbf'
             else:
                 raise Exception('unexpected writer')
+        filename += gzext
 
         if writer == 'cplex':
             if self.cplex_Instance is None:
@@ -7205,11 +8107,12 @@ class Problem(object):
                 self._make_gurobi_instance()
             self.gurobi_Instance.write(filename)
         elif writer == 'picos':
-            if filename[-3:] == '.lp':
+            base = filename[:len(filename) - len(gzext)]
+            if base[-3:] == '.lp':
                 self._write_lp(filename)
-            elif filename[-6:] == '.dat-s':
+            elif base[-6:] == '.dat-s':
                 self._write_sdpa(filename)
-            elif filename[-4:] == '.cbf':
+            elif base[-4:] == '.cbf':
                 self._write_cbf(filename)
             else:
                 raise Exception('unexpected file extension')
@@ -7219,9 +8122,10 @@ class Problem(object):
     def _write_lp(self, filename):
         """
         writes problem in  lp format
+        (gzip-compressed if the filename ends with ``.gz``)
         """
         # add extension
-        if filename[-3:] != '.lp':
+        if filename[-3:] != '.lp' and filename[-6:] != '.lp.gz':
             filename += '.lp'
         # check lp compatibility
         if (self.numberConeConstraints +
@@ -7229,85 +8133,75 @@ class Problem(object):
                 self.numberLSEConstraints +
                 self.numberSDPConstraints) > 0:
             raise Exception('the picos LP writer only accepts (MI)LP')
-        # open file
-        f = open(filename, 'w')
-        f.write("\\* file " + filename + " generated by picos*\\\n")
         # cvxoptVars
         if not any(self.cvxoptVars.values()):
             self._make_cvxopt_instance()
         # variable names
-        varnames = {}
+        varnames = [None] * self.numberOfVars
         for name, v in six.iteritems(self.variables):
-            j = 0
-            k = 0
-            for i in range(v.startIndex, v.endIndex):
-                if v.size == (1, 1):
-                    varnames[i] = name
-                elif v.size[1] == 1:
-                    varnames[i] = name + '(' + str(j) + ')'
-                    j += 1
-                else:
-                    varnames[i] = name + '(' + str(j) + ',' + str(k) + ')'
-                    j += 1
-                    if j == v.size[0]:
-                        k += 1
-                        j = 0
-                varnames[i] = varnames[i].replace('[', '(')
-                varnames[i] = varnames[i].replace(']', ')')
-        # affexpr writer
+            name = name.replace('[', '(').replace(']', ')')
+            if v.size == (1, 1):
+                names = [name]
+            elif v.size[1] == 1:
+                names = [name + '(' + str(j) + ')' for j in range(v.size[0])]
+            else:
+                names = [name + '(' + str(j) + ',' + str(k) + ')'
+                         for k in range(v.size[1]) for j in range(v.size[0])]
+            varnames[v.startIndex:v.endIndex] = names[:v.endIndex -
+                                                      v.startIndex]
+
+        def sorted_rows(M):
+            # the rows of M, as a list of (i,J,V), sorted by i and then j
+            I = np.array(M.I).ravel()
+            J = np.array(M.J).ravel()
+            V = np.array(M.V).ravel()
+            order = np.lexsort((J, I))
+            I, J, V = I[order], J[order], V[order]
+            starts = np.flatnonzero(np.r_[True, I[1:] != I[:-1]]) if len(
+                I) else np.array([], dtype=int)
+            bounds = np.r_[starts, len(I)]
+            I, J, V = I.tolist(), J.tolist(), V.tolist()
+            return [(I[starts[r]], J[bounds[r]:bounds[r + 1]],
+                     V[bounds[r]:bounds[r + 1]]) for r in range(len(starts))]
 
         def affexp_writer(name, indices, coefs):
-            s = ''
-            s += name
-            s += ' : '
-            start = True
-            for (i, v) in zip(indices, coefs):
-                if v > 0 and not(start):
-                    s += '+ '
-                s += "%.12g" % v
-                s += ' '
-                s += varnames[i]
-                # not the first term anymore
-                start = False
-            if not(coefs):
-                s += '0.0 '
-                s += varnames[0]
-            return s
+            # the coefficients are formatted for the whole row at once
+            if not len(coefs):
+                return name + ' : 0.0 ' + varnames[0]
+            terms = [("%.12g" % v) + ' ' + varnames[i]
+                     for (i, v) in zip(indices, coefs)]
+            return name + ' : ' + terms[0] + ''.join(
+                [('+ ' + t if v > 0 else t) for (t, v) in
+                 zip(terms[1:], coefs[1:])])
 
         print('writing problem in ' + filename + '...')
+        f = _open_output(filename)
+        lines = []
+
+        def flush(force=False):
+            # writes the pending lines by large blocks
+            if force or len(lines) >= 10000:
+                f.write(''.join(lines))
+                del lines[:]
+
+        lines.append("\\* file " + filename + " generated by picos*\\\n")
 
         # objective
+        c = self.cvxoptVars['c']
         if self.objective[0] == 'max':
-            f.write("Maximize\n")
+            lines.append("Maximize\n")
             # max handled directly
-            self.cvxoptVars['c'] = -self.cvxoptVars['c']
+            c = -c
         else:
-            f.write("Minimize\n")
-        I = cvx.sparse(self.cvxoptVars['c']).I
-        V = cvx.sparse(self.cvxoptVars['c']).V
-
-        f.write(affexp_writer('obj', I, V))
-        f.write('\n')
+            lines.append("Minimize\n")
+        c = cvx.sparse(c)
+        lines.append(affexp_writer('obj', c.I, c.V) + '\n')
 
-        f.write("Subject To\n")
+        lines.append("Subject To\n")
         bounds = {}
         # equality constraints:
-        Ai, Aj, Av = (self.cvxoptVars['A'].I, self.cvxoptVars[
-                      'A'].J, self.cvxoptVars['A'].V)
-        ijvs = sorted(zip(Ai, Aj, Av))
-        del Ai, Aj, Av
-        itojv = {}
-        lasti = -1
-        for (i, j, v) in ijvs:
-            if i == lasti:
-                itojv[i].append((j, v))
-            else:
-                lasti = i
-                itojv[i] = [(j, v)]
         ieq = 0
-        for i, jv in six.iteritems(itojv):
-            J = [jvk[0] for jvk in jv]
-            V = [jvk[1] for jvk in jv]
+        for i, J, V in sorted_rows(self.cvxoptVars['A']):
             if len(J) == 1:
                 # fixed variable
                 b = self.cvxoptVars['b'][i] / V[0]
@@ -7315,31 +8209,17 @@ class Problem(object):
             else:
                 # affine equality
                 b = self.cvxoptVars['b'][i]
-                f.write(affexp_writer('eq' + str(ieq), J, V))
-                f.write(' = ')
-                f.write("%.12g" % b)
-                f.write('\n')
+                lines.append(affexp_writer('eq' + str(ieq), J, V) +
+                             ' = ' + ("%.12g" % b) + '\n')
                 ieq += 1
+                flush()
 
         # inequality constraints:
-        Gli, Glj, Glv = (self.cvxoptVars['Gl'].I, self.cvxoptVars[
-                         'Gl'].J, self.cvxoptVars['Gl'].V)
-        ijvs = sorted(zip(Gli, Glj, Glv))
-        del Gli, Glj, Glv
-        itojv = {}
-        lasti = -1
-        for (i, j, v) in ijvs:
-            if i == lasti:
-                itojv[i].append((j, v))
-            else:
-                lasti = i
-                itojv[i] = [(j, v)]
+        quadrows = set([t[1] for t in self.cvxoptVars['quadcons']])
         iaff = 0
-        for i, jv in six.iteritems(itojv):
-            J = [jvk[0] for jvk in jv]
-            V = [jvk[1] for jvk in jv]
-            if len(J) == 1 and self.options['pass_simple_cons_as_bound'] and (not (i in [t[1]
-                                           for t in self.cvxoptVars['quadcons']])):
+        for i, J, V in sorted_rows(self.cvxoptVars['Gl']):
+            if len(J) == 1 and self.options['pass_simple_cons_as_bound'] and (
+                    i not in quadrows):
                 # bounded variable
                 if J[0] in bounds:
                     bl, bu = bounds[J[0]]
@@ -7356,11 +8236,10 @@ class Problem(object):
             else:
                 # affine inequality
                 b = self.cvxoptVars['hl'][i]
-                f.write(affexp_writer('in' + str(iaff), J, V))
-                f.write(' <= ')
-                f.write("%.12g" % b)
-                f.write('\n')
+                lines.append(affexp_writer('in' + str(iaff), J, V) +
+                             ' <= ' + ("%.12g" % b) + '\n')
                 iaff += 1
+                flush()
 
         # bounds
         #hard-coded
@@ -7380,47 +8259,47 @@ class Problem(object):
                 nup = min(cup, up)
                 bounds[var.startIndex + ind] = (nlo, nup)
 
-
-        f.write("Bounds\n")
+        lines.append("Bounds\n")
         for i in range(self.numberOfVars):
-            if i in bounds:
-                bl, bu = bounds[i]
-            else:
-                bl, bu = -INFINITY, INFINITY
+            if i not in bounds:
+                lines.append(varnames[i] + ' free\n')
+                continue
+            bl, bu = bounds[i]
             if bl == -INFINITY and bu == INFINITY:
-                f.write(varnames[i] + ' free')
+                lines.append(varnames[i] + ' free')
             elif bl == bu:
-                f.write(varnames[i] + (" = %.12g" % bl))
+                lines.append(varnames[i] + (" = %.12g" % bl))
             elif bl < bu:
                 if bl == -INFINITY:
-                    f.write('-inf <= ')
+                    lines.append('-inf <= ')
                 else:
-                    f.write("%.12g" % bl)
-                    f.write(' <= ')
-                f.write(varnames[i])
+                    lines.append(("%.12g" % bl) + ' <= ')
+                lines.append(varnames[i])
                 if bu == INFINITY:
-                    f.write('<= +inf')
+                    lines.append('<= +inf')
                 else:
-                    f.write(' <= ')
-                    f.write("%.12g" % bu)
-            f.write('\n')
+                    lines.append(' <= ' + ("%.12g" % bu))
+            lines.append('\n')
+            flush()
+        flush()
 
         # general integers
-        f.write("Generals\n")
+        lines.append("Generals\n")
         for name, v in six.iteritems(self.variables):
             if v.vtype == 'integer':
-                for i in range(v.startIndex, v.endIndex):
-                    f.write(varnames[i] + '\n')
+                lines.extend([varnames[i] + '\n'
+                              for i in range(v.startIndex, v.endIndex)])
             if v.vtype == 'semiint' or v.vtype == 'semicont':
                 raise Exception(
                     'semiint and semicont variables not handled by this LP writer')
         # binary variables
-        f.write("Binaries\n")
+        lines.append("Binaries\n")
         for name, v in six.iteritems(self.variables):
             if v.vtype == 'binary':
-                for i in range(v.startIndex, v.endIndex):
-                    f.write(varnames[i] + '\n')
-        f.write("End\n")
+                lines.extend([varnames[i] + '\n'
+                              for i in range(v.startIndex, v.endIndex)])
+        lines.append("End\n")
+        flush(True)
         print('done.')
         f.close()
 
@@ -7444,24 +8323,23 @@ class Problem(object):
                      for Gsi in self.cvxoptVars['Gs']]
         dims['l'] = self.cvxoptVars['Gl'].size[0]
         dims['q'] = [Gqi.size[0] for Gqi in self.cvxoptVars['Gq']]
-        G = self.cvxoptVars['Gl']
-        h = self.cvxoptVars['hl']
+        Gs = [self.cvxoptVars['Gl']]
+        hs = [self.cvxoptVars['hl']]
 
         # handle the equalities as 2 ineq
         if self.cvxoptVars['A'].size[0] > 0:
-            G = cvx.sparse([G, self.cvxoptVars['A']])
-            G = cvx.sparse([G, -self.cvxoptVars['A']])
-            h = cvx.matrix([h, self.cvxoptVars['b']])
-            h = cvx.matrix([h, -self.cvxoptVars['b']])
+            Gs.extend([self.cvxoptVars['A'], -self.cvxoptVars['A']])
+            hs.extend([self.cvxoptVars['b'], -self.cvxoptVars['b']])
             dims['l'] += (2 * self.cvxoptVars['A'].size[0])
 
-        for i in range(len(dims['q'])):
-            G = cvx.sparse([G, self.cvxoptVars['Gq'][i]])
-            h = cvx.matrix([h, self.cvxoptVars['hq'][i]])
-
-        for i in range(len(dims['s'])):
-            G = cvx.sparse([G, self.cvxoptVars['Gs'][i]])
-            h = cvx.matrix([h, self.cvxoptVars['hs'][i]])
+        Gs.extend(self.cvxoptVars['Gq'])
+        hs.extend(self.cvxoptVars['hq'])
+        Gs.extend(self.cvxoptVars['Gs'])
+        hs.extend(self.cvxoptVars['hs'])
+        # stacked at once (the transposed blocks are concatenated, which
+        # is much faster than a vertical concatenation in cvxopt)
+        G = cvx.sparse([[cvx.sparse(Gi).T] for Gi in Gs]).T
+        h = cvx.matrix([cvx.matrix(hi) for hi in hs])
 
         # Remove the lines in A and b corresponding to 0==0
         JP = list(set(self.cvxoptVars['A'].I))
@@ -7501,7 +8379,7 @@ class Problem(object):
 
         # write data
         # add extension
-        if filename[-6:] != '.dat-s':
+        if filename[-6:] != '.dat-s' and filename[-9:] != '.dat-s.gz':
             filename += '.dat-s'
         # check lp compatibility
         if (self.numberQuadConstraints + self.numberLSEConstraints) > 0:
@@ -7515,7 +8393,7 @@ class Problem(object):
                     'Problem should not have quad or gp constraints. ' +
                     'Try to convert the problem to an SOCP with the function convert_quad_to_socp()')
         # open file
-        f = open(filename, 'w')
+        f = _open_output(filename)
         f.write('"file ' + filename + ' generated by picos"\n')
         if self.options['verbose'] >= 1:
             print('writing problem in ' + filename + '...')
@@ -7527,51 +8405,71 @@ class Problem(object):
         # c vector (objective)
         f.write(str(list(-P_b)).replace('[', '{').replace(']', '}'))
         f.write('\n')
-        # coefs
-        for k in range(P_m + 1):
-            if k != 0:
-                v = sparse(G[:, k - 1])
-            else:
-                v = +sparse(h)
-
-            ptr = 0
-            block = 0
-            # lin. constraints
-            if Nl:
-                u = v[:Nl]
-                for i, j, value in zip(u.I, u.I, u.V):
-                    f.write(
-                        '{0}\t{1}\t{2}\t{3}\t{4}\n'.format(
-                            k, block + 1, j + 1, i + 1, -value))
-                ptr += Nl
-                block += 1
-
-            # SOC constraints
-            for nq in Nq:
-                u0 = v[ptr]
-                u1 = v[ptr + 1:ptr + nq]
-                tmp = spmatrix(
-                    u1.V, [nq - 1 for j in range(len(u1))], u1.I, (nq, nq))
-                if not u0 == 0.0:
-                    tmp += spmatrix(u0, range(nq), range(nq), (nq, nq))
-                for i, j, value in zip(tmp.I, tmp.J, tmp.V):
-                    f.write(
-                        '{0}\t{1}\t{2}\t{3}\t{4}\n'.format(
-                            k, block + 1, j + 1, i + 1, -value))
-                ptr += nq
-                block += 1
-
-            # SDP constraints
-            for ns in Ns:
-                u = v[ptr:ptr + ns**2]
-                for index_k, index in enumerate(u.I):
-                    j, i = divmod(index, ns)
-                    if j <= i:
-                        f.write(
-                            '{0}\t{1}\t{2}\t{3}\t{4}\n'.format(
-                                k, block + 1, j + 1, i + 1, -u.V[index_k]))
-                ptr += ns**2
-                block += 1
+
+        # coefs: the matrix k is given by the column k of [h,G], whose
+        # rows are mapped to the entries (block, a, b) written below,
+        # in the order of the index key
+        nrows = G.size[0]
+        rowblock = np.zeros(nrows, dtype=np.int64)
+        rowa = np.zeros(nrows, dtype=np.int64)
+        rowb = np.zeros(nrows, dtype=np.int64)
+        rowkey = np.zeros(nrows, dtype=np.int64)
+        rowok = np.ones(nrows, dtype=bool)
+        # the first entry of a SOC is repeated on the diagonal
+        headrow = np.zeros(nrows, dtype=np.int64)
+        ptr = 0
+        block = 0
+        # lin. constraints
+        if Nl:
+            rowblock[:Nl] = block + 1
+            rowa[:Nl] = rowb[:Nl] = np.arange(1, Nl + 1)
+            rowkey[:Nl] = np.arange(Nl)
+            ptr += Nl
+            block += 1
+
+        # SOC constraints
+        for nq in Nq:
+            rowblock[ptr:ptr + nq] = block + 1
+            headrow[ptr] = nq
+            rowa[ptr + 1:ptr + nq] = np.arange(1, nq)
+            rowb[ptr + 1:ptr + nq] = nq
+            rowkey[ptr + 1:ptr + nq] = np.arange(nq - 1) * nq + nq - 1
+            ptr += nq
+            block += 1
+
+        # SDP constraints
+        for ns in Ns:
+            j, i = divmod(np.arange(ns**2), ns)
+            rowblock[ptr:ptr + ns**2] = block + 1
+            rowa[ptr:ptr + ns**2] = j + 1
+            rowb[ptr:ptr + ns**2] = i + 1
+            rowkey[ptr:ptr + ns**2] = np.arange(ns**2)
+            rowok[ptr:ptr + ns**2] = (j <= i)
+            ptr += ns**2
+            block += 1
+
+        hsp = sparse(h)
+        R = np.r_[np.array(hsp.I, dtype=np.int64).ravel(),
+                  np.array(G.I, dtype=np.int64).ravel()]
+        K = np.r_[np.zeros(len(hsp), dtype=np.int64),
+                  np.array(G.J, dtype=np.int64).ravel() + 1]
+        V = np.r_[np.array(hsp.V, dtype=float).ravel(),
+                  np.array(G.V, dtype=float).ravel()]
+        plain = rowok[R] & (headrow[R] == 0)
+        heads = (headrow[R] > 0) & (V != 0)
+        nh = headrow[R[heads]]
+        d = np.arange(nh.sum()) - np.repeat(np.cumsum(nh) - nh, nh)
+        Kh = np.repeat(K[heads], nh)
+        blocks = np.r_[rowblock[R[plain]], np.repeat(rowblock[R[heads]], nh)]
+        K = np.r_[K[plain], Kh]
+        A = np.r_[rowa[R[plain]], d + 1]
+        B = np.r_[rowb[R[plain]], d + 1]
+        keys = np.r_[rowkey[R[plain]], d * np.repeat(nh, nh) + d]
+        V = np.r_[V[plain], np.repeat(V[heads], nh)]
+        order = np.lexsort((keys, blocks, K))
+        _write_coords(f, '%s\t%s\t%s\t%s\t%s\n',
+                      (K[order], blocks[order], A[order], B[order],
+                       -V[order]))
 
         f.close()
 
@@ -7582,7 +8480,7 @@ class Problem(object):
 
         # write data
         # add extension
-        if filename[-4:] != '.cbf':
+        if filename[-4:] != '.cbf' and filename[-7:] != '.cbf.gz':
             filename += '.cbf'
         # check lp compatibility
         if (self.numberQuadConstraints + self.numberLSEConstraints) > 0:
@@ -7646,7 +8544,7 @@ class Problem(object):
                     'semidef vars with integer elements are not supported')
 
         # open file
-        f = open(filename, 'w')
+        f = _open_output(filename)
         f.write('#file ' + filename + ' generated by picos\n')
         print('writing problem in ' + filename + '...')
 
@@ -7719,12 +8617,6 @@ class Problem(object):
         # constraints
         psdcons = []
         isdp = 0
-        Fcoord = []
-        Hcoord = []
-        Dcoord = []
-        ObjAcoord = []
-        ObjBcoord = []
-        ObjFcoord = []
         # dummy constraint for the objective
         if self.objective[1] is None:
             dummy_cons = (AffinExp() > 0)
@@ -7732,6 +8624,16 @@ class Problem(object):
             dummy_cons = (self.objective[1] > 0)
         dummy_cons.typeOfConstraint = 'lin0'
 
+        # the coefficients of the constraints are collected as triplets
+        # (row, column, value), where the rows of all cones are numbered
+        # consecutively (and those of the LMIs separately)
+        conetrip = ([], [], [], [])  # rowoffset, I, J, V
+        conecst = ([], [], [])
+        objtrip = ([], [], [], [])
+        objcst = ([], [], [])
+        sdptrip = ([], [], [], [])  # isdp, I, J, V
+        sdpcst = ([], [], [])
+        sdpdims = []
         for cons in ([dummy_cons] + self.constraints):
             if cons.typeOfConstraint.startswith('sdp'):
                 v = cons.semidefVar
@@ -7772,85 +8674,31 @@ class Problem(object):
 
                 else:
                     raise Exception('unexpected typeOfConstraint')
-                ijv = []
-                for var, fact in six.iteritems((expcone).factors):
-                    if not isinstance(fact, cvx.base.spmatrix):
-                        fact = cvx.sparse(fact)
-                    sj = var.startIndex
-                    ijv.extend(zip(fact.I, fact.J + sj, fact.V))
-                ijvs = sorted(ijv)
-
-                itojv = {}
-                lasti = -1
-                for (i, j, v) in ijvs:
-                    if i == lasti:
-                        itojv[i].append((j, v))
-                    else:
-                        lasti = i
-                        itojv[i] = [(j, v)]
 
-                if conetype:
-                    if conetype != '0':
-                        dim = expcone.size[0] * expcone.size[1]
-                        conecons.append((conetype, dim))
+                if conetype == '0':
+                    trip, cst, offset = objtrip, objcst, 0
+                elif conetype:
+                    dim = expcone.size[0] * expcone.size[1]
+                    conecons.append((conetype, dim))
+                    trip, cst, offset = conetrip, conecst, iaff
                 else:
                     dim = expcone.size[0]
                     psdcons.append(dim)
-
-                if conetype:
-                    for i, jv in six.iteritems(itojv):
-                        J = [jvk[0] for jvk in jv]
-                        V = [jvk[1] for jvk in jv]
-                        J, V, mats = self._separate_linear_cons(
-                            J, V, idxsdpvars)
-                        for j, v in zip(J, V):
-                            if conetype != '0':
-                                Acoord.append((iaff + i, j, v))
-                            else:
-                                ObjAcoord.append((j, v))
-                        for k, mat in enumerate(mats):
-                            for row, col, v in zip(mat.I, mat.J, mat.V):
-                                if conetype != '0':
-                                    Fcoord.append((iaff + i, k, row, col, v))
-                                else:
-                                    ObjFcoord.append((k, row, col, v))
-                                if uptri and row != col:
-                                    if conetype != '0':
-                                        Fcoord.append(
-                                            (iaff + i, k, col, row, v))
-                                    else:
-                                        ObjFcoord.append((k, col, row, v))
-                    constant = expcone.constant
-                    if not(constant is None):
-                        constant = cvx.sparse(constant)
-                        for i, v in zip(constant.I, constant.V):
-                            if conetype != '0':
-                                Bcoord.append((iaff + i, v))
-                            else:
-                                ObjBcoord.append(v)
-                else:
-                    for i, jv in six.iteritems(itojv):
-                        col, row = divmod(i, dim)
-                        if not(uptri) and row < col:
-                            continue
-                        J = [jvk[0] for jvk in jv]
-                        V = [jvk[1] for jvk in jv]
-                        J, V, mats = self._separate_linear_cons(
-                            J, V, idxsdpvars)
-                        if any([bool(m) for m in mats]):
-                            raise Exception(
-                                'SDP cons should not depend on PSD var')
-                        for j, v in zip(J, V):
-                            Hcoord.append((isdp, j, row, col, v))
-
-                    constant = expcone.constant
-                    if not(constant is None):
-                        constant = cvx.sparse(constant)
-                        for i, v in zip(constant.I, constant.V):
-                            col, row = divmod(i, dim)
-                            if row < col:
-                                continue
-                            Dcoord.append((isdp, row, col, v))
+                    sdpdims.append(dim)
+                    trip, cst, offset = sdptrip, sdpcst, isdp
+                for var, fact in six.iteritems((expcone).factors):
+                    if not isinstance(fact, cvx.base.spmatrix):
+                        fact = cvx.sparse(fact)
+                    trip[0].append((offset, len(fact)))
+                    trip[1].append(fact.I)
+                    trip[2].append(fact.J + var.startIndex)
+                    trip[3].append(fact.V)
+                constant = expcone.constant
+                if not(constant is None):
+                    constant = cvx.sparse(constant)
+                    cst[0].append((offset, len(constant)))
+                    cst[1].append(constant.I)
+                    cst[2].append(constant.V)
 
                 if conetype:
                     if conetype != '0':
@@ -7860,6 +8708,109 @@ class Problem(object):
             else:
                 raise Exception('unexpected typeOfConstraint')
 
+        def triplets(trip):
+            # I (shifted by the row offsets), J, V as numpy arrays
+            if not trip[0]:
+                return (np.zeros(0, dtype=np.int64),) * 3 + (np.zeros(0),)
+            offsets, lengths = zip(*trip[0])
+            shift = np.repeat(np.array(offsets, dtype=np.int64), lengths)
+            return (shift,) + tuple(
+                np.concatenate([np.array(m).ravel() for m in col]).astype(dt)
+                for col, dt in zip(trip[1:], [np.int64, np.int64, float]))
+
+        # column indices of the PSD bar variables and of the others
+        barstarts = np.array(sorted([si for si, ei in idxsdpvars]),
+                             dtype=np.int64)
+        barends = np.array(sorted([ei for si, ei in idxsdpvars]),
+                           dtype=np.int64)
+        barcum = np.cumsum(barends - barstarts)
+
+        def separate(J):
+            # whether J is in a bar variable, which one, and the index of J
+            # among the scalar variables (or in the svec of the bar variable)
+            pos = np.searchsorted(barstarts, J, side='right') - 1
+            if not len(barstarts):
+                return np.zeros(len(J), dtype=bool), pos, J
+            inbar = (pos >= 0) & (J < barends[np.maximum(pos, 0)])
+            K = np.where(inbar, J - barstarts[np.maximum(pos, 0)],
+                         J - np.where(pos >= 0,
+                                      barcum[np.maximum(pos, 0)], 0))
+            return inbar, pos, K
+
+        def linear_and_bar(I, J, V):
+            # A coordinates (sorted by row and column), and
+            # F coordinates of the lower triangles (as in svecm1(.).T)
+            order = np.lexsort((J, I))
+            I, J, V = I[order], J[order], V[order]
+            inbar, k, K = separate(J)
+            lin = ~inbar
+            Ib, kb, Sb, Vb = I[inbar], k[inbar], K[inbar], V[inbar]
+            cb = (np.sqrt(1 + 8 * Sb) - 1).astype(np.int64) // 2
+            rb = Sb - cb * (cb + 1) // 2
+            Vb = np.where(rb == cb, Vb, Vb / np.sqrt(2))
+            order = np.lexsort((cb, rb, kb, Ib))
+            Ib, kb, rb, cb, Vb = (Ib[order], kb[order], rb[order],
+                                  cb[order], Vb[order])
+            if uptri:
+                # each off-diagonal element is followed by its symmetric
+                dup = np.repeat(rb != cb, 2)
+                dup[::2] = True
+                Ib, kb, Vb = [np.repeat(a, 2)[dup] for a in (Ib, kb, Vb)]
+                rb, cb = (np.column_stack((cb, rb)).ravel()[dup],
+                          np.column_stack((rb, cb)).ravel()[dup])
+                return (I[lin], K[lin], V[lin]), (Ib, kb, rb, cb, Vb)
+            return (I[lin], K[lin], V[lin]), (Ib, kb, cb, rb, Vb)
+
+        def constants(cst):
+            # row offsets, I, V as numpy arrays, sorted by offset and row
+            if not cst[0]:
+                return (np.zeros(0, dtype=np.int64),) * 2 + (np.zeros(0),)
+            offsets, lengths = zip(*cst[0])
+            shift = np.repeat(np.array(offsets, dtype=np.int64), lengths)
+            I = np.concatenate([np.array(m).ravel()
+                                for m in cst[1]]).astype(np.int64)
+            V = np.concatenate([np.array(m).ravel()
+                                for m in cst[2]]).astype(float)
+            order = np.lexsort((I, shift))
+            return shift[order], I[order], V[order]
+
+        # objective
+        shift, I, J, V = triplets(objtrip)
+        (_, ObjAJ, ObjAV), (_, ObjFk, ObjFrow, ObjFcol, ObjFV) = \
+            linear_and_bar(shift + I, J, V)
+        _, _, ObjBV = constants(objcst)
+
+        # cones
+        shift, I, J, V = triplets(conetrip)
+        (AI, AJ, AV), (FI, Fk, Frow, Fcol, FV) = linear_and_bar(
+            shift + I, J, V)
+        bndA = np.array(Acoord, dtype=float).reshape((-1, 3))
+        AI = np.r_[bndA[:, 0].astype(np.int64), AI]
+        AJ = np.r_[bndA[:, 1].astype(np.int64), AJ]
+        AV = np.r_[bndA[:, 2], AV]
+        shift, BI, BV = constants(conecst)
+        BI += shift
+        bndB = np.array(Bcoord, dtype=float).reshape((-1, 2))
+        BI = np.r_[bndB[:, 0].astype(np.int64), BI]
+        BV = np.r_[bndB[:, 1], BV]
+
+        # LMIs
+        Hs, I, J, V = triplets(sdptrip)
+        order = np.lexsort((J, I, Hs))
+        Hs, I, J, V = Hs[order], I[order], J[order], V[order]
+        dims = np.array(sdpdims, dtype=np.int64)[Hs]
+        Hcol, Hrow = I // dims, I % dims
+        keep = (Hrow >= Hcol) if not uptri else np.ones(len(I), dtype=bool)
+        inbar, _, HJ = separate(J[keep])
+        if inbar.any():
+            raise Exception('SDP cons should not depend on PSD var')
+        Hs, HJ, Hrow, Hcol, HV = Hs[keep], HJ, Hrow[keep], Hcol[keep], V[keep]
+        Ds, DI, DV = constants(sdpcst)
+        dims = np.array(sdpdims, dtype=np.int64)[Ds]
+        Dcol, Drow = DI // dims, DI % dims
+        keep = Drow >= Dcol
+        Ds, Drow, Dcol, DV = Ds[keep], Drow[keep], Dcol[keep], DV[keep]
+
         if iaff > 0:
             f.write("CON\n")
             f.write(str(iaff) + ' ' + str(len(conecons)) + '\n')
@@ -7876,59 +8827,52 @@ class Problem(object):
                 f.write(str(n) + '\n')
             f.write('\n')
 
-        if ObjFcoord:
+        if len(ObjFV):
             f.write("OBJFCOORD\n")
-            f.write(str(len(ObjFcoord)) + '\n')
-            for (k, row, col, v) in ObjFcoord:
-                f.write('{0} {1} {2} {3}\n'.format(k, row, col, v))
+            f.write(str(len(ObjFV)) + '\n')
+            _write_coords(f, '%s %s %s %s\n', (ObjFk, ObjFrow, ObjFcol, ObjFV))
             f.write('\n')
 
-        if ObjAcoord:
+        if len(ObjAV):
             f.write("OBJACOORD\n")
-            f.write(str(len(ObjAcoord)) + '\n')
-            for (j, v) in ObjAcoord:
-                f.write('{0} {1}\n'.format(j, v))
+            f.write(str(len(ObjAV)) + '\n')
+            _write_coords(f, '%s %s\n', (ObjAJ, ObjAV))
             f.write('\n')
 
-        if ObjBcoord:
+        if len(ObjBV):
             f.write("OBJBCOORD\n")
-            v = ObjBcoord[0]
+            v = float(ObjBV[0])
             f.write('{0}\n'.format(v))
             f.write('\n')
 
-        if Fcoord:
+        if len(FV):
             f.write("FCOORD\n")
-            f.write(str(len(Fcoord)) + '\n')
-            for (i, k, row, col, v) in Fcoord:
-                f.write('{0} {1} {2} {3} {4}\n'.format(i, k, row, col, v))
+            f.write(str(len(FV)) + '\n')
+            _write_coords(f, '%s %s %s %s %s\n', (FI, Fk, Frow, Fcol, FV))
             f.write('\n')
 
-        if Acoord:
+        if len(AV):
             f.write("ACOORD\n")
-            f.write(str(len(Acoord)) + '\n')
-            for (i, j, v) in Acoord:
-                f.write('{0} {1} {2}\n'.format(i, j, v))
+            f.write(str(len(AV)) + '\n')
+            _write_coords(f, '%s %s %s\n', (AI, AJ, AV))
             f.write('\n')
 
-        if Bcoord:
+        if len(BV):
             f.write("BCOORD\n")
-            f.write(str(len(Bcoord)) + '\n')
-            for (i, v) in Bcoord:
-                f.write('{0} {1}\n'.format(i, v))
+            f.write(str(len(BV)) + '\n')
+            _write_coords(f, '%s %s\n', (BI, BV))
             f.write('\n')
 
-        if Hcoord:
+        if len(HV):
             f.write("HCOORD\n")
-            f.write(str(len(Hcoord)) + '\n')
-            for (i, j, row, col, v) in Hcoord:
-                f.write('{0} {1} {2} {3} {4}\n'.format(i, j, row, col, v))
+            f.write(str(len(HV)) + '\n')
+            _write_coords(f, '%s %s %s %s %s\n', (Hs, HJ, Hrow, Hcol, HV))
             f.write('\n')
 
-        if Dcoord:
+        if len(DV):
             f.write("DCOORD\n")
-            f.write(str(len(Dcoord)) + '\n')
-            for (i, row, col, v) in Dcoord:
-                f.write('{0} {1} {2} {3}\n'.format(i, row, col, v))
+            f.write(str(len(DV)) + '\n')
+            _write_coords(f, '%s %s %s %s\n', (Ds, Drow, Dcol, DV))
             f.write('\n')
 
         print('done.')
@@ -7936,10 +8880,10 @@ class Problem(object):
 
     def _read_cbf(self, filename):
         try:
-            f = open(filename, 'r')
+            f = _LineBuffer(filename)
         except IOError:
             filename += '.cbf'
-            f = open(filename, 'r')
+            f = _LineBuffer(filename)
         print('importing problem data from ' + filename + '...')
         self.__init__()
 
@@ -8015,7 +8959,6 @@ class Problem(object):
                     lsplit[0], f, parsed_blocks)
                 seen_blocks.append(lsplit[0])
 
-        f.close()
         # variables
         if 'VAR' in parsed_blocks:
             Nvars, varsz, x = parsed_blocks['VAR']
@@ -8071,29 +9014,40 @@ class Problem(object):
                 bb[i] = new_param('b[' + str(i) + ']', bi)
                 consexp.append(new_param('b[' + str(i) + ']', bi))
 
-            A = parsed_blocks.get(
-                'ACOORD', spmatrix(
-                    [], [], [], (Ncons, Nvars)))
-            Ablc = _break_rows(A, szcons)
-            for i, Ai in enumerate(Ablc):
-                Aiblocs = _break_cols(Ai, varsz)
-                for j, Aij in enumerate(Aiblocs):
-                    if Aij:
-                        AA[i, j] = new_param('A[' + str((i, j)) + ']', Aij)
-                        consexp[i] += AA[i, j] * x[j]
+            # the terms of the constraints are built directly
+            # in the sparse form of the factors of the variables
+            if 'ACOORD' in parsed_blocks:
+                Ablc = _break_blocks(parsed_blocks['ACOORD'], szcons, varsz)
+                for (i, j), Aij in sorted(six.iteritems(Ablc)):
+                    AA[i, j] = new_param('A[' + str((i, j)) + ']', Aij)
+                    consexp[i] += AffinExp({x[j]: Aij}, size=(szcons[i], 1),
+                                           string=AA[i, j].string + '*' +
+                                           x[j].string)
 
             Fcoords = parsed_blocks.get('FCOORD', {})
-            for k, mats in six.iteritems(Fcoords):
-                i, row = _block_idx(k, szcons)
-                row_exp = AffinExp()
-                for j, mat in enumerate(mats):
+            consrows = np.cumsum([0] + szcons)
+            Frows = {}
+            for k in sorted(Fcoords):
+                i = int(np.searchsorted(consrows, k, side='right')) - 1
+                row = k - int(consrows[i])
+                for j, mat in enumerate(Fcoords[k]):
                     if mat:
                         FF[i, j, row] = new_param(
                             'F[' + str((i, j, row)) + ']', mat)
-                        row_exp += (FF[i, j, row] | X[j])
-
-                consexp[i] += (('e_' + str(row) +
-                                '(' + str(szcons[i]) + ',1)') * row_exp)
+                        nj = mat.size[0]
+                        I, J, V = Frows.setdefault((i, j), ([], [], []))
+                        I.extend([row] * len(mat.V))
+                        J.extend([a + b * nj for a, b in zip(mat.I, mat.J)])
+                        V.extend(mat.V)
+            for (i, j), (I, J, V) in sorted(six.iteritems(Frows)):
+                # the rows of consexp[i] are the scalar products
+                # with vec(X[j]), expressed in terms of svec(X[j])
+                R = _triplets_to_spmatrix(V, I, J,
+                                          (szcons[i], X[j].size[0]**2))
+                consexp[i] += AffinExp(
+                    {X[j]: R * X[j].factors[X[j]]}, size=(szcons[i], 1),
+                    string='Σ_r e_r*〈 F[(%d, %d, r)] | %s 〉' % (
+                        i, j, X[j].string))
 
             for i, (tp, sz) in enumerate(structcons):
                 if tp == 'F':
@@ -8126,13 +9080,29 @@ class Problem(object):
                 DD[i] = new_param('D[' + str(i) + ']', Di)
                 consexp.append(new_param('D[' + str(i) + ']', Di))
 
-            for j, Hj in six.iteritems(Hblocks):
-                i, col = _block_idx(j, varsz)
-                for k, Hij in enumerate(Hj):
+            varcols = np.cumsum([0] + varsz)
+            Hcols = {}
+            for j in sorted(Hblocks):
+                i = int(np.searchsorted(varcols, j, side='right')) - 1
+                col = j - int(varcols[i])
+                for k, Hij in enumerate(Hblocks[j]):
                     if Hij:
                         HH[k, i, col] = new_param(
                             'H[' + str((k, i, col)) + ']', Hij)
-                        consexp[k] += HH[k, i, col] * x[i][col]
+                        nk = Hij.size[0]
+                        I, J, V = Hcols.setdefault((k, i), ([], [], []))
+                        I.extend([a + b * nk for a, b in zip(Hij.I, Hij.J)])
+                        J.extend([col] * len(Hij.V))
+                        V.extend(Hij.V)
+            for (k, i), (I, J, V) in sorted(six.iteritems(Hcols)):
+                # the column col of the factor of x[i] is vec(H[k,i,col])
+                nk = consexp[k].size[0]
+                consexp[k] += AffinExp(
+                    {x[i]: _triplets_to_spmatrix(V, I, J,
+                                                 (nk**2, varsz[i]))},
+                    size=(nk, nk),
+                    string='Σ_c H[(%d, %d, c)]*%s[c]' % (
+                        k, i, x[i].string))
 
             for exp in consexp:
                 self.add_constraint(exp >> 0)
@@ -8199,10 +9169,12 @@ class Problem(object):
             return Nscalar, var_structure, xx
         elif blocname == 'INT':
             n = int(f.readline())
+            sizes = parsed_blocks['VAR'][1]
+            J = f.read_array(n, 1)[:, 0].astype(np.int64)
+            blocks = np.searchsorted(np.cumsum(sizes), J, side='right')
+            cols = J - np.r_[0, np.cumsum(sizes)][blocks]
             ints = {}
-            for k in range(n):
-                j = int(f.readline())
-                i, col = _block_idx(j, parsed_blocks['VAR'][1])
+            for i, col in zip(blocks.tolist(), cols.tolist()):
                 ints.setdefault(i, [])
                 ints[i].append(col)
             x = parsed_blocks['VAR'][2]
@@ -8236,96 +9208,67 @@ class Problem(object):
             return psdcons_structure
         elif blocname == 'OBJACOORD':
             n = int(f.readline())
-            J = []
-            V = []
-            for i in range(n):
-                lsplit = f.readline().split()
-                j, v = int(lsplit[0]), float(lsplit[1])
-                J.append(j)
-                V.append(v)
-            return spmatrix(
-                V, [0] * len(J), J, (1, parsed_blocks['VAR'][0]))
+            J, V = f.read_array(n, 2).T
+            return _triplets_to_spmatrix(V, np.zeros(n), J,
+                                         (1, parsed_blocks['VAR'][0]))
         elif blocname == 'OBJBCOORD':
             return float(f.readline())
         elif blocname == 'OBJFCOORD':
             n = int(f.readline())
-            Fobj = [spmatrix([], [], [], (ni, ni))
-                    for ni in parsed_blocks['PSDVAR'][0]]
-            for k in range(n):
-                lsplit = f.readline().split()
-                j, row, col, v = (int(lsplit[0]), int(lsplit[1]),
-                                  int(lsplit[2]), float(lsplit[3]))
-                Fobj[j][row, col] = v
-                if row != col:
-                    Fobj[j][col, row] = v
+            dims = parsed_blocks['PSDVAR'][0]
+            j, row, col, v = f.read_array(n, 4).T
+            j = j.astype(np.int64)
+            Fobj = [spmatrix([], [], [], (ni, ni)) for ni in dims]
+            for jj, Fj in _symmetric_blocks(j, row, col, v,
+                                            np.array(dims)[j]):
+                Fobj[jj] = Fj
             return Fobj
         elif blocname == 'FCOORD':
             n = int(f.readline())
+            dims = parsed_blocks['PSDVAR'][0]
+            i, j, row, col, v = f.read_array(n, 5).T
+            i, j = i.astype(np.int64), j.astype(np.int64)
             Fblocks = {}
-            for k in range(n):
-                lsplit = f.readline().split()
-                i, j, row, col, v = (int(lsplit[0]), int(lsplit[1]), int(
-                    lsplit[2]), int(lsplit[3]), float(lsplit[4]))
-                if i not in Fblocks:
-                    Fblocks[i] = [
-                        spmatrix(
-                            [], [], [], (ni, ni)) for ni in parsed_blocks['PSDVAR'][0]]
-
-                Fblocks[i][j][row, col] = v
-                if row != col:
-                    Fblocks[i][j][col, row] = v
+            for key, Fij in _symmetric_blocks(i * len(dims) + j, row, col, v,
+                                              np.array(dims)[j]):
+                ii, jj = divmod(key, len(dims))
+                if ii not in Fblocks:
+                    Fblocks[ii] = [
+                        spmatrix([], [], [], (ni, ni)) for ni in dims]
+                Fblocks[ii][jj] = Fij
             return Fblocks
         elif blocname == 'ACOORD':
             n = int(f.readline())
-            J = []
-            V = []
-            I = []
-            for k in range(n):
-                lsplit = f.readline().split()
-                i, j, v = int(lsplit[0]), int(lsplit[1]), float(lsplit[2])
-                I.append(i)
-                J.append(j)
-                V.append(v)
-            return spmatrix(
+            I, J, V = f.read_array(n, 3).T
+            return _triplets_to_spmatrix(
                 V, I, J, (parsed_blocks['CON'][0], parsed_blocks['VAR'][0]))
         elif blocname == 'BCOORD':
             n = int(f.readline())
-            V = []
-            I = []
-            for k in range(n):
-                lsplit = f.readline().split()
-                i, v = int(lsplit[0]), float(lsplit[1])
-                I.append(i)
-                V.append(v)
-            return spmatrix(
-                V, I, [0] * len(I), (parsed_blocks['CON'][0], 1))
+            I, V = f.read_array(n, 2).T
+            return _triplets_to_spmatrix(
+                V, I, np.zeros(n), (parsed_blocks['CON'][0], 1))
         elif blocname == 'HCOORD':
             n = int(f.readline())
+            dims = parsed_blocks['PSDCON']
+            i, j, row, col, v = f.read_array(n, 5).T
+            i, j = i.astype(np.int64), j.astype(np.int64)
             Hblocks = {}
-            for k in range(n):
-                lsplit = f.readline().split()
-                i, j, row, col, v = (int(lsplit[0]), int(lsplit[1]), int(
-                    lsplit[2]), int(lsplit[3]), float(lsplit[4]))
-                if j not in Hblocks:
-                    Hblocks[j] = [
-                        spmatrix(
-                            [], [], [], (ni, ni)) for ni in parsed_blocks['PSDCON']]
-
-                Hblocks[j][i][row, col] = v
-                if row != col:
-                    Hblocks[j][i][col, row] = v
+            for key, Hij in _symmetric_blocks(j * len(dims) + i, row, col, v,
+                                              np.array(dims)[i]):
+                jj, ii = divmod(key, len(dims))
+                if jj not in Hblocks:
+                    Hblocks[jj] = [
+                        spmatrix([], [], [], (ni, ni)) for ni in dims]
+                Hblocks[jj][ii] = Hij
             return Hblocks
         elif blocname == 'DCOORD':
             n = int(f.readline())
-            Dblocks = [spmatrix([], [], [], (ni, ni))
-                       for ni in parsed_blocks['PSDCON']]
-            for k in range(n):
-                lsplit = f.readline().split()
-                i, row, col, v = (int(lsplit[0]), int(
-                    lsplit[1]), int(lsplit[2]), float(lsplit[3]))
-                Dblocks[i][row, col] = v
-                if row != col:
-                    Dblocks[i][col, row] = v
+            dims = parsed_blocks['PSDCON']
+            i, row, col, v = f.read_array(n, 4).T
+            i = i.astype(np.int64)
+            Dblocks = [spmatrix([], [], [], (ni, ni)) for ni in dims]
+            for ii, Di in _symmetric_blocks(i, row, col, v, np.array(dims)[i]):
+                Dblocks[ii] = Di
             return Dblocks
         else:
             raise Exception('unexpected block name')
@@ -8336,10 +9279,12 @@ class Problem(object):
         """
         if self.options['verbose'] > 0:
             print('reformulating quads as socp...')
+        # factorizations of the quadratic forms, reused for identical forms
+        factors = {}
         for i, c in enumerate(self.constraints):
             if c.typeOfConstraint == 'quad':
                 qd = c.Exp1.quad
-                sqnorm = _quad2norm(qd)
+                sqnorm = _quad2norm(qd, factors)
                 self.constraints[i] = sqnorm < -c.Exp1.aff
                 self.numberQuadConstraints -= 1
                 self.numberConeConstraints += 1
@@ -8353,13 +9298,13 @@ class Problem(object):
             if self.objective[0] == 'min':
                 qd = self.objective[1].quad
                 aff = self.objective[1].aff
-                sqnorm = _quad2norm(qd)
+                sqnorm = _quad2norm(qd, factors)
                 self.add_constraint(sqnorm < obj - aff)
                 self.set_objective('min', obj)
             else:
                 qd = (-self.objective[1]).quad
                 aff = self.objective[1].aff
-                sqnorm = _quad2norm(qd)
+                sqnorm = _quad2norm(qd, factors)
                 self.add_constraint(sqnorm < aff - obj)
                 self.set_objective('max', obj)
             # self.numberQuadConstraints-=1 # no ! because
@@ -8561,64 +9506,66 @@ class Problem(object):
 
         dual = Problem()
         self._make_cvxopt_instance(hard_coded_bounds=True)
-        cc = new_param('cc', self.cvxoptVars['c'])
-        lincons = cc
-        obj = 0
+        c = self.cvxoptVars['c']
+        nv = c.size[0]
+        # the dual is built directly from the primal (G,h,A,b) data:
+        # the equality constraint  c + sum_k Mk.T * yk == sum_j -Sj * X[j]
+        # and the objective  sum_k bk.T * yk  are created as single affine
+        # expressions, to avoid the intermediate sums of AffinExp algebra
+        linfacts = {}
+        objfacts = {}
         # equalities
-        Ae = new_param('Ae', self.cvxoptVars['A'])
-        be = new_param('be', -self.cvxoptVars['b'])
-        if Ae.size[0] > 0:
-            mue = dual.add_variable('mue', Ae.size[0])
-            lincons += (Ae.T * mue)
-            obj += be.T * mue
+        A, b = self.cvxoptVars['A'], self.cvxoptVars['b']
+        if A.size[0] > 0:
+            mue = dual.add_variable('mue', A.size[0])
+            linfacts[mue] = A.T
+            objfacts[mue] = -b.T
         # inequalities
-        Al = new_param('Al', self.cvxoptVars['Gl'])
-        bl = new_param('bl', -self.cvxoptVars['hl'])
-        if Al.size[0] > 0:
-            mul = dual.add_variable('mul', Al.size[0])
+        Gl, hl = self.cvxoptVars['Gl'], self.cvxoptVars['hl']
+        if Gl.size[0] > 0:
+            mul = dual.add_variable('mul', Gl.size[0])
             dual.add_constraint(mul > 0)
-            lincons += (Al.T * mul)
-            obj += bl.T * mul
+            linfacts[mul] = Gl.T
+            objfacts[mul] = -hl.T
         # soc cons
-        i = 0
-        As, bs, fs, ds, zs, lbda = [], [], [], [], [], []
-        for Gq, hq in zip(self.cvxoptVars['Gq'], self.cvxoptVars['hq']):
-            As.append(new_param('As[' + str(i) + ']', -Gq[1:, :]))
-            bs.append(new_param('bs[' + str(i) + ']', hq[1:]))
-            fs.append(new_param('fs[' + str(i) + ']', -Gq[0, :].T))
-            ds.append(new_param('ds[' + str(i) + ']', hq[0]))
-            zs.append(dual.add_variable('zs[' + str(i) + ']', As[i].size[0]))
-            lbda.append(dual.add_variable('lbda[' + str(i) + ']', 1))
-            dual.add_constraint(abs(zs[i]) < lbda[i])
-            lincons += (As[i].T * zs[i] - fs[i] * lbda[i])
-            obj += (bs[i].T * zs[i] - ds[i] * lbda[i])
-            i += 1
+        for i, (Gq, hq) in enumerate(zip(self.cvxoptVars['Gq'],
+                                         self.cvxoptVars['hq'])):
+            zs = dual.add_variable('zs[' + str(i) + ']', Gq.size[0] - 1)
+            lbda = dual.add_variable('lbda[' + str(i) + ']', 1)
+            dual.add_constraint(abs(zs) < lbda)
+            linfacts[zs] = -Gq[1:, :].T
+            linfacts[lbda] = Gq[0, :].T
+            objfacts[zs] = hq[1:].T
+            objfacts[lbda] = -hq[:1]
         # sdp cons
-        j = 0
-        X = []
-        M0 = []
-        factors = {}
-        for Gs, hs in zip(self.cvxoptVars['Gs'], self.cvxoptVars['hs']):
+        sdpfacts = {}
+        for j, (Gs, hs) in enumerate(zip(self.cvxoptVars['Gs'],
+                                         self.cvxoptVars['hs'])):
             nbar = int(Gs.size[0]**0.5)
-            svecs = [svec(cvx.matrix(Gs[:, k], (nbar, nbar)),
-                          ignore_sym=True).T for k in range(Gs.size[1])]
-            msvec = cvx.sparse(svecs)
-            X.append(
-                dual.add_variable(
-                    'X[' + str(j) + ']', (nbar, nbar), 'symmetric'))
-            factors[X[j]] = -msvec
-            dual.add_constraint(X[j] >> 0)
-            M0.append(new_param('M0[' + str(j) + ']', -
-                                cvx.matrix(hs, (nbar, nbar))))
-            obj += (M0[j] | X[j])
-            j += 1
-
-        if factors:
-            maff = AffinExp(
-                factors=factors, size=(
-                    msvec.size[0], 1), string='M dot X')
+            X = dual.add_variable('X[' + str(j) + ']', (nbar, nbar),
+                                  'symmetric')
+            dual.add_constraint(X >> 0)
+            # S maps vec(M) to svec(M), ignoring the lower triangle of M
+            SI, SJ, SV = [], [], []
+            for jj in range(nbar):
+                for ii in range(jj + 1):
+                    SI.append(jj * (jj + 1) // 2 + ii)
+                    SJ.append(ii + jj * nbar)
+                    SV.append(1. if ii == jj else np.sqrt(2))
+            S = cvx.spmatrix(SV, SI, SJ, (nbar * (nbar + 1) // 2, nbar**2))
+            sdpfacts[X] = -(S * Gs).T
+            # (M0|X) with M0 = -hs
+            objfacts[X] = -hs.T * X.factors[X]
+
+        linfacts = {v: cvx.sparse(f) for v, f in linfacts.items()}
+        objfacts = {v: cvx.sparse(f) for v, f in objfacts.items()}
+        lincons = AffinExp(factors=linfacts, constant=c, size=(nv, 1),
+                           string='dual linear constraint')
+        if sdpfacts:
+            maff = AffinExp(factors=sdpfacts, size=(nv, 1), string='M dot X')
         else:
             maff = 0
+        obj = AffinExp(factors=objfacts, size=(1, 1), string='dual objective')
         dual.add_constraint(lincons == maff)
         dual.set_objective('max', obj)
         dual._options = _NonWritableDict(self.options)
@@ -8802,3 +9749,657 @@ class Problem(object):
 
     def makeCVXOPT_Instance(self):
         self._make_cvxopt_instance()
+
+
+class _LineBuffer(object):
+    """the lines of a text file (gzip-compressed if the name ends with
+    ``.gz``), read in memory at once. Lines are then served one at a
+    time with :func:`readline`, or parsed by blocks with
+    :func:`read_array`."""
+
+    def __init__(self, filename):
+        if filename[-3:] == '.gz':
+            import gzip
+            f = gzip.open(filename, 'rb')
+        else:
+            f = open(filename, 'rb')
+        try:
+            self.lines = f.read().decode('utf-8').split('\n')
+        finally:
+            f.close()
+        self.pos = 0
+
+    def readline(self):
+        if self.pos >= len(self.lines):
+            return ''
+        self.pos += 1
+        if self.pos == len(self.lines):
+            return self.lines[-1]
+        return self.lines[self.pos - 1] + '\n'
+
+    def read_array(self, n, ncols):
+        """parses the next ``n`` lines as a ``(n x ncols)`` array of floats"""
+        block = ' '.join(self.lines[self.pos:self.pos + n])
+        self.pos += n
+        arr = np.fromstring(block, sep=' ') if n else np.zeros(0)
+        if arr.size != n * ncols:
+            raise Exception('unexpected number of entries in a block of ' +
+                            str(n) + ' lines')
+        return arr.reshape((n, ncols))
+
+
+def _parse_sdpa_output(lines):
+    """
+    parses the output of sdpa, given as an iterable of lines which is read
+    only once (a file, or the stream of a pipe).
+    Returns ``(status, obj, x_vec, dual_solution)``, where ``obj`` is the
+    primal objective value of the minimization solved by sdpa, ``x_vec``
+    is a list, and ``dual_solution`` is the list of the blocks of
+    ``yMat`` (as cvxopt matrices, with a single row for the LP blocks).
+    """
+    def numbers(row):
+        return np.fromstring(row[row.rfind('{') + 1:row.find('}')], sep=',')
+
+    status = 'unknown'
+    obj = None
+    x_vec = None
+    dual_solution = []
+    lines = iter(lines)
+    for line in lines:
+        if line.find("phase.value") > -1:
+            if line.find("pdOPT") > -1:
+                status = 'optimal'
+            elif line.find("pdFEAS") > -1:
+                status = 'primal-dual feasible'
+            elif line.find("INF") > -1:
+                status = 'infeasible'
+            elif line.find("UNBD") > -1:
+                status = 'unbounded'
+            else:
+                status = 'unknown'
+        if line.find("objValPrimal") > -1:
+            obj = float((line.split())[2])
+        if line.find("xVec =") > -1:
+            line = six.next(lines)
+            x_vec = numbers(line).tolist()
+        if line.find("yMat =") > -1:
+            dual_solution = []
+            row = ''
+            while True:
+                rows = []
+                in_matrix = False
+                for row in lines:
+                    if row.find('}') < 0:
+                        continue
+                    if row.startswith('}'):
+                        break
+                    if row.find('{') != row.rfind('{'):
+                        in_matrix = True
+                    rows.append(numbers(row))
+                    if row.find('}') != row.rfind('}') or not in_matrix:
+                        break
+                else:
+                    # end of the output
+                    row = '}'
+                if not rows:
+                    dual_solution.append(None)
+                elif in_matrix:
+                    n = len(rows[0])
+                    sol_mat = np.zeros((n, n))
+                    sol_mat[:len(rows)] = rows
+                    dual_solution.append(cvx.matrix(sol_mat))
+                else:
+                    dual_solution.append(cvx.matrix(rows[0], (1, len(rows[0]))))
+                if row.startswith('}'):
+                    break
+            if len(dual_solution) > 0 and dual_solution[-1] is None:
+                dual_solution = dual_solution[:-1]
+    return status, obj, x_vec, dual_solution
+
+
+def _write_coords(f, fmt, columns, chunksize=100000):
+    """writes the lines ``fmt % row`` for the rows of the given columns
+    (numpy arrays of the same length), by chunks of ``chunksize`` lines"""
+    for start in range(0, len(columns[0]), chunksize):
+        rows = zip(*[col[start:start + chunksize].tolist()
+                     for col in columns])
+        f.write(''.join([fmt % row for row in rows]))
+
+
+def _open_output(filename):
+    """opens ``filename`` for writing through a large buffer,
+    with gzip compression if the name ends with ``.gz``"""
+    if filename[-3:] == '.gz':
+        import gzip
+        import io
+        return io.TextIOWrapper(
+            io.BufferedWriter(gzip.open(filename, 'wb'), 1 << 20))
+    return open(filename, 'w', 1 << 20)
+
+
+def _sdp_violation(S):
+    """
+    violation of the constraint S >> 0 for the (numpy) matrix S:
+    the largest of the asymmetry of S and of minus its smallest eigenvalue.
+    """
+    asym = np.abs(S - S.conj().T).max() if S.size else 0.
+    S = 0.5 * (S + S.conj().T)
+    n = S.shape[0]
+    lmin = None
+    if n >= 200 and not np.iscomplexobj(S):
+        # Lanczos iterations for the smallest eigenvalue
+        try:
+            import scipy.sparse
+            import scipy.sparse.linalg
+        except ImportError:
+            pass
+        else:
+            A = S
+            if np.count_nonzero(S) < 0.1 * n * n:
+                A = scipy.sparse.csr_matrix(S)
+            try:
+                lmin = scipy.sparse.linalg.eigsh(
+                    A, k=1, which='SA', tol=1e-10,
+                    return_eigenvectors=False)[0]
+            except scipy.sparse.linalg.ArpackError:
+                lmin = None
+    if lmin is None:
+        lmin = np.linalg.eigvalsh(S)[0] if n else 0.
+    return max(0., asym, -lmin)
+
+
+def _slack_violation(typ, sl):
+    """
+    violation of a constraint of type ``typ`` computed from its ``slack``
+    """
+    sl = np.array(cvx.matrix(sl))
+    if typ.startswith('sdp'):
+        return float(_sdp_violation(sl))
+    if sl.size == 0:
+        return 0.
+    if typ == 'lin=':
+        return float(np.abs(sl).max())
+    return max(0., float(-sl.real.min()))
+
+
+class _CompiledExpressions(object):
+    """
+    expressions compiled by :func:`Problem.compile_expressions()
+    <picos.Problem.compile_expressions>`.
+    The value of each expression is computed from ``vals = G*x + h``, where
+    ``x`` is the vector of all variable values (cf.
+    :func:`Problem._value_vector`), and, for the quadratic forms, from the
+    triplets ``(k, a, b, v)`` of their matrices: the kth form
+    is the sum of the ``v*x[a]*x[b]``.
+    """
+
+    def __init__(self, prob, exps):
+        self.prob = prob
+        self.exps = list(exps)
+        self.key = None
+
+    def _affine_part(self, exp):
+        """registers the affine expression ``exp`` in G and h,
+        and returns the position of its values in ``vals``"""
+        start = self.nrows
+        factors = {}
+        for var, fac in six.iteritems(exp.factors):
+            if isinstance(var, Parameter):
+                self.params.append((start, fac, var))
+            else:
+                factors[var] = fac
+        if len(factors) < len(exp.factors):
+            exp = AffinExp(factors, exp.constant, exp.size)
+        G, h = self.prob._makeGandh(exp)
+        self.Gs.append(G)
+        self.hs.append(h)
+        self.nrows += G.size[0]
+        return start
+
+    def _compile(self):
+        prob = self.prob
+        self.key = (prob._layout_version, prob.numberOfVars)
+        self.nrows = 0
+        self.Gs, self.hs, self.params = [], [], []
+        self.plans = []
+        qk, qa, qb, qv = [], [], [], []
+        nquad = 0
+        cplx = prob.is_complex()
+        for exp in self.exps:
+            if (cplx or exp.has_complex_coef() or
+                    not isinstance(exp, (AffinExp, QuadExp, Norm, LogSumExp,
+                                         GeneralFun))):
+                self.plans.append(('other', exp))
+            elif isinstance(exp, AffinExp):
+                self.plans.append(('aff', self._affine_part(exp), exp.size))
+            elif isinstance(exp, QuadExp) and exp.LR is not None:
+                if exp.LR[1] is None:
+                    self.plans.append(('sqnorm',
+                                       self._affine_part(exp.LR[0]),
+                                       exp.LR[0].size))
+                else:
+                    self.plans.append(('prod', self._affine_part(exp.LR[0]),
+                                       self._affine_part(exp.LR[1])))
+            elif isinstance(exp, QuadExp):
+                if _has_parameters(exp):
+                    self.plans.append(('other', exp))
+                    continue
+                if exp.aff is None:
+                    start = None
+                else:
+                    start = self._affine_part(exp.aff)
+                for (xi, xj), Q in six.iteritems(exp.quad):
+                    if not isinstance(Q, cvx.base.spmatrix):
+                        Q = cvx.sparse(Q)
+                    qk.append(np.full(len(Q.V), nquad))
+                    qa.append(np.array(Q.I).ravel() + xi.startIndex)
+                    qb.append(np.array(Q.J).ravel() + xj.startIndex)
+                    qv.append(np.array(Q.V).ravel())
+                self.plans.append(('quad', start, nquad))
+                nquad += 1
+            elif isinstance(exp, Norm):
+                self.plans.append(('norm', self._affine_part(exp.exp),
+                                   exp.exp.size))
+            elif isinstance(exp, LogSumExp):
+                self.plans.append(('lse', self._affine_part(exp.Exp),
+                                   exp.Exp.size))
+            else:
+                self.plans.append(('fun', self._affine_part(exp.Exp),
+                                   exp.Exp.size, exp.fun))
+        if self.Gs:
+            # (concatenating the transposes is faster with cvxopt)
+            self.G = cvx.sparse([[G.T] for G in self.Gs]).T
+            self.h = np.array(cvx.matrix(self.hs))
+        else:
+            self.G = None
+        del self.Gs, self.hs
+        if nquad:
+            self.qa = np.concatenate(qa)
+            self.qb = np.concatenate(qb)
+            self.qv = np.concatenate(qv)
+            qk = np.concatenate(qk)
+            # sums the products v*x[a]*x[b] of each quadratic form
+            self.qsum = spmatrix(1., qk.tolist(), list(range(len(qk))),
+                                 (nquad, len(qk)))
+
+    def _eval_columns(self, X):
+        """evaluates the affine parts and the quadratic forms for each
+        column of the (numpy) matrix X of variable values"""
+        if self.key != (self.prob._layout_version, self.prob.numberOfVars):
+            self._compile()
+        vals = quads = None
+        if self.G is not None:
+            vals = np.array(self.G * cvx.matrix(X)) + self.h
+            for (start, fac, param) in self.params:
+                term = np.array(cvx.matrix(fac * param.value[:]))
+                vals[start:start + term.shape[0]] += term
+        if hasattr(self, 'qsum'):
+            W = self.qv[:, None] * X[self.qa] * X[self.qb]
+            quads = np.array(self.qsum * cvx.matrix(W))
+        return vals, quads
+
+    def _columns(self, vals, quads, inds=None):
+        """returns, for each expression, the (numpy) matrix whose columns are
+        the vectorized values of the expression for the columns of
+        ``vals`` and ``quads``, which correspond to the pool indices
+        ``inds``. The expressions which are not compiled are evaluated
+        for these indices, or skipped (None) if ``inds`` is None."""
+        res = []
+        for plan in self.plans:
+            kind = plan[0]
+            if kind == 'other':
+                if inds is None:
+                    res.append(None)
+                else:
+                    res.append(np.hstack([np.array(plan[1].eval(ind)[:])
+                                          for ind in inds]))
+                continue
+            if kind == 'quad':
+                val = quads[plan[2]:plan[2] + 1]
+                if plan[1] is not None:
+                    val = val + vals[plan[1]:plan[1] + 1]
+                res.append(val)
+                continue
+            if kind == 'prod':
+                res.append(vals[plan[1]:plan[1] + 1] *
+                           vals[plan[2]:plan[2] + 1])
+                continue
+            start, size = plan[1], plan[2]
+            v = vals[start:start + size[0] * size[1]]
+            if kind == 'aff':
+                res.append(v)
+            elif kind == 'sqnorm':
+                res.append((v**2).sum(axis=0)[None, :])
+            elif kind == 'norm':
+                res.append(np.sqrt((v**2).sum(axis=0))[None, :])
+            elif kind == 'lse':
+                res.append(np.log(np.exp(v).sum(axis=0))[None, :])
+            else:
+                res.append(np.array([[plan[3](cvx.matrix(v[:, k], size))[0]
+                                      for k in range(v.shape[1])]]))
+        return res
+
+    def eval(self):
+        """returns the list of the values of the compiled expressions"""
+        X = np.array(self.prob._value_vector())
+        vals, quads = self._eval_columns(X)
+        res = []
+        for exp, plan, col in zip(self.exps, self.plans,
+                                  self._columns(vals, quads)):
+            if plan[0] == 'other':
+                res.append(exp.eval())
+            elif plan[0] == 'aff':
+                res.append(cvx.matrix(col[:, 0], exp.size))
+            else:
+                res.append(cvx.matrix(col[0, 0], (1, 1)))
+        return res
+
+    def eval_pool(self):
+        """
+        returns, for each compiled expression, the matrix whose kth column is
+        the (vectorized) value of the expression for the kth solution of
+        the pool of the problem (cf. :func:`Problem.solution_pool()
+        <picos.Problem.solution_pool>`)
+        """
+        X = np.array(self.prob.solution_pool())
+        vals, quads = self._eval_columns(X)
+        return [cvx.matrix(col) for col in
+                self._columns(vals, quads, range(X.shape[1]))]
+
+
+def _solve_and_collect(prob, options):
+    """solves ``prob`` in a worker process of :func:`solve_many`, and returns
+    what is needed to update the problem object of the parent process"""
+    import pickle
+    sol = prob.solve(**options)
+    primals = dict((name, var.value) for name, var
+                   in six.iteritems(prob.variables) if var.is_valued())
+    duals = [cs.dual for cs in prob.constraints]
+    # solver-specific objects (e.g. a cplex instance) cannot be sent back
+    for key in list(sol.keys()):
+        try:
+            pickle.dumps(sol[key])
+        except Exception:
+            del sol[key]
+    return primals, duals, prob.status, sol
+
+
+def _cvxopt_version():
+    """returns the version of cvxopt, as a tuple of integers"""
+    import re
+    return tuple(int(v) for v in re.findall(r'\d+', cvx.__version__)[:3])
+
+
+def _check_cancelled():
+    """raises a :class:`CancelledError <concurrent.futures.CancelledError>`
+    if the cancellation of the solve running in this thread was requested"""
+    cancel = getattr(_solve_state, 'cancel', None)
+    if cancel is not None and cancel.is_set():
+        from concurrent.futures import CancelledError
+        raise CancelledError()
+
+
+try:
+    from concurrent.futures import Future as _Future
+except ImportError:
+    _Future = object
+
+
+class _SolveFuture(_Future):
+    """
+    future of the solution of a problem, returned by
+    :func:`Problem.solve_async`. The solution is written in the problem by
+    the first call to :func:`result`, in the thread of the caller.
+    """
+
+    def __init__(self, prob):
+        _Future.__init__(self)
+        self._problem = prob
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._collected = False
+
+    def _run(self, options):
+        """solves the problem, in the worker thread"""
+        if not self.set_running_or_notify_cancel():
+            return
+        _solve_state.cancel = self._cancel
+        try:
+            res = self._problem._solve_detached(options)
+            _check_cancelled()
+        except BaseException as ex:
+            self.set_exception(ex)
+        else:
+            self.set_result(res)
+        finally:
+            _solve_state.cancel = None
+
+    def cancel(self):
+        """
+        requests the cancellation of the solve. Returns ``False`` if the
+        solve is already finished.
+        """
+        if self.done():
+            return False
+        self._cancel.set()
+        _Future.cancel(self)  # if the solve has not started yet
+        return True
+
+    def result(self, timeout=None):
+        """
+        waits for the solve, writes the solution in the problem (only once)
+        and returns the dictionary returned by
+        :func:`solve() <picos.Problem.solve>`.
+        """
+        sol, primals, duals = _Future.result(self, timeout)
+        with self._lock:
+            if not self._collected:
+                self._problem._set_solution(sol, primals, duals)
+                self._collected = True
+        return sol
+
+
+def _race_worker(prob, options, tol, queue):
+    """solves ``prob`` in a process of a race (cf. the option
+    ``solver='race'``), and puts ``(solver, result, feasible)`` in ``queue``,
+    where ``result`` is returned by :func:`_solve_and_collect` and
+    ``feasible`` tells whether the solution is feasible up to ``tol``;
+    ``result`` is ``None`` and ``feasible`` is an error message if the
+    solver failed."""
+    import os
+    import signal
+
+    def terminate(signum, frame):
+        # the sdpa executable would survive this process
+        if prob.sdpa_process is not None:
+            prob.sdpa_process.kill()
+        os._exit(1)
+    signal.signal(signal.SIGTERM, terminate)
+    solver = options['solver']
+    # (the process may be a fork of an asynchronous solve)
+    prob._async_solve = None
+    try:
+        res = _solve_and_collect(prob, options)
+    except Exception as ex:
+        queue.put((solver, None, str(ex)))
+        return
+    if prob.options['noprimals']:
+        feasible = True
+    else:
+        try:
+            feasible = prob.check_current_value_feasibility(tol)[0]
+        except Exception:  # some variable is not valued
+            feasible = False
+    queue.put((solver, res, feasible))
+
+
+def solve_many(problems, workers=None, **options):
+    """
+    Solves several independent problems in parallel, in a pool of
+    ``workers`` processes. Each problem is sent to a worker, where it is
+    solved with :func:`solve() <picos.Problem.solve>`; the optimal values
+    of the variables and the duals of the constraints are then written back
+    into the original :class:`Problem <picos.Problem>` objects.
+
+    :param problems: the problems to solve.
+    :type problems: list of :class:`Problem <picos.Problem>`.
+    :param workers: number of worker processes. The default (``None``) is
+                    the number of processors of the machine. If ``workers``
+                    is ``1``, the problems are solved one after the other
+                    in the current process.
+    :type workers: int.
+    :param options: options passed to :func:`solve() <picos.Problem.solve>`
+                    for every problem.
+    :returns: the list of the solutions returned by
+              :func:`solve() <picos.Problem.solve>`, in the order of
+              ``problems``. The entries which cannot be sent back from a
+              worker (solver-specific objects) are removed.
+
+    .. note :: The problems must be picklable; in particular, the solver
+               instances that were built for them are not transferred.
+    """
+    problems = list(problems)
+    if workers == 1:
+        return [prob.solve(**options) for prob in problems]
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+    except ImportError:
+        raise ImportError('concurrent.futures not found')
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_solve_and_collect, prob, options)
+                   for prob in problems]
+        solutions = []
+        for prob, future in zip(problems, futures):
+            primals, duals, status, sol = future.result()
+            for name, value in six.iteritems(primals):
+                prob.set_var_value(name, value, optimalvar=True)
+            for cs, dual in zip(prob.constraints, duals):
+                cs.set_dualVar(dual)
+            prob.status = status
+            solutions.append(sol)
+    return solutions
+
+
+class _FlatMatrices(object):
+    """
+    Stores cvxopt matrices in flat numpy arrays, for the compact pickling
+    of a :class:`Problem`: the entries of all matrices are concatenated in
+    ``V``, and the row and column indices of the sparse ones in ``I`` and
+    ``J``. A matrix is replaced by a reference
+    ``(dense, size, typecode, start, end, ijstart)`` to a range of ``V``
+    (and of ``I``, ``J``); a matrix shared by several expressions is stored
+    once. Objects which are not cvxopt matrices are kept as they are.
+    """
+
+    def __init__(self, I=None, J=None, V=None):
+        self.I = [] if I is None else I
+        self.J = [] if J is None else J
+        self.V = [] if V is None else V
+        self.nv = 0
+        self.nij = 0
+        self.refs = {}  # id(matrix) -> (matrix, reference)
+
+    def ref(self, mat):
+        if not isinstance(mat, (cvx.matrix, cvx.spmatrix)):
+            return mat
+        if id(mat) in self.refs:
+            return self.refs[id(mat)][1]
+        start = self.nv
+        if isinstance(mat, cvx.matrix):
+            self.V.append(np.array(mat).ravel(order='F'))
+            ijstart = None
+        else:
+            self.V.append(np.array(mat.V).ravel())
+            self.I.append(np.array(mat.I, dtype=np.int32).ravel())
+            self.J.append(np.array(mat.J, dtype=np.int32).ravel())
+            ijstart = self.nij
+            self.nij += len(mat.V)
+        self.nv += len(self.V[-1])
+        ref = (ijstart is None, mat.size, mat.typecode, start, self.nv, ijstart)
+        self.refs[id(mat)] = (mat, ref)
+        return ref
+
+    def arrays(self):
+        I = np.concatenate(self.I) if self.I else np.zeros(0, np.int32)
+        J = np.concatenate(self.J) if self.J else np.zeros(0, np.int32)
+        V = np.concatenate(self.V) if self.V else np.zeros(0)
+        return (I, J, V)
+
+    def get(self, ref):
+        if not isinstance(ref, tuple):
+            return ref
+        dense, size, tc, start, end, ijstart = ref
+        V = self.V[start:end]
+        if tc == 'd':
+            V = V.real
+        elif tc == 'i':
+            V = V.real.astype(np.int64)
+        if dense:
+            return cvx.matrix(V, size, tc)
+        ijend = ijstart + end - start
+        return spmatrix(cvx.matrix(V, tc=tc),
+                        cvx.matrix(self.I[ijstart:ijend].astype(np.int64), tc='i'),
+                        cvx.matrix(self.J[ijstart:ijend].astype(np.int64), tc='i'),
+                        size, tc)
+
+
+def _expression_state(exp, flat):
+    """flat description of the expression ``exp`` of a problem, where the
+    variables are given by their names (cf. :func:`Problem.__getstate__`)"""
+    if exp is None or not isinstance(exp, Expression):
+        return ('raw', exp)
+    elif isinstance(exp, Variable):
+        return ('var', exp.name)
+    elif isinstance(exp, AffinExp):
+        factors = [(var.name, flat.ref(fac))
+                   for var, fac in six.iteritems(exp.factors)]
+        return ('aff', exp.string, exp.size, factors, flat.ref(exp.constant))
+    elif isinstance(exp, QuadExp):
+        quad = [(i.name, j.name, flat.ref(Q))
+                for (i, j), Q in six.iteritems(exp.quad)]
+        LR = exp.LR
+        if LR is not None:
+            LR = tuple([_expression_state(e, flat) for e in LR])
+        return ('quad', exp.string, quad,
+                _expression_state(exp.aff, flat), LR)
+    elif isinstance(exp, LogSumExp):
+        return ('lse', _expression_state(exp.Exp, flat))
+    elif isinstance(exp, GeneralFun):
+        return ('fun', exp.fun, _expression_state(exp.Exp, flat),
+                exp.funstring)
+    else:
+        raise Exception('cannot describe an expression of type ' +
+                        type(exp).__name__)
+
+
+def _expression_from_state(state, flat, prob):
+    """inverse of :func:`_expression_state`"""
+    def member(name):
+        if name in prob.variables:
+            return prob.variables[name]
+        return prob.parameters[name]
+
+    kind = state[0]
+    if kind == 'raw':
+        return state[1]
+    elif kind == 'var':
+        return member(state[1])
+    elif kind == 'aff':
+        _, string, size, factors, constant = state
+        factors = dict((member(name), flat.get(fac))
+                       for name, fac in factors)
+        return AffinExp(factors, flat.get(constant), size, string)
+    elif kind == 'quad':
+        _, string, quad, aff, LR = state
+        quad = dict(((member(i), member(j)), flat.get(Q)) for i, j, Q in quad)
+        if LR is not None:
+            LR = tuple([_expression_from_state(e, flat, prob) for e in LR])
+        return QuadExp(quad, _expression_from_state(aff, flat, prob),
+                       string, LR)
+    elif kind == 'lse':
+        return LogSumExp(_expression_from_state(state[1], flat, prob))
+    elif kind == 'fun':
+        _, fun, exp, funstring = state
+        return GeneralFun(fun, _expression_from_state(exp, flat, prob),
+                          funstring)
@@ -46,14 +46,19 @@ __all__ = ['_retrieve_matrix',
            'lowtri',
            'sum',
            '_bsum',
+           '_vstack',
            'diag',
            'new_param',
            'available_solvers',
+           '_import_solver',
            'offset_in_lil',
            'import_cbf',
            'diag_vect',
            '_quad2norm',
            '_copy_exp_to_new_vars',
+           '_has_parameters',
+           '_resolve_parameters',
+           '_matrix_times_exp',
            'ProgressBar',
            '_NonWritableDict',
            'QuadAsSocpError',
@@ -64,6 +69,9 @@ __all__ = ['_retrieve_matrix',
            '_break_cols',
            '_break_rows',
            '_block_idx',
+           '_break_blocks',
+           '_symmetric_blocks',
+           '_triplets_to_spmatrix',
            '_flatten',
            '_remove_in_lil',
            'norm',
@@ -156,14 +164,18 @@ def sum(lst, it=None, indices=None):
                 1, 1), string='0')
     if not(all([isinstance(exi, Expression) for exi in lst])):
         return builtins.sum(lst)
-    #if 'z' in [m.typecode for exp in lst for m in exp.factors.values()
-    #           ]:  # complex expression
-    if any([exp.has_complex_coef() for exp in lst]):
-        affSum = new_param('', cvx.matrix(0., lst[0].size, tc='z'))
+    if all([isinstance(exi, AffinExp) and exi.size == lst[0].size
+            for exi in lst]):
+        affSum = _sum_affinexp(lst)
     else:
-        affSum = new_param('', cvx.matrix(0., lst[0].size, tc='d'))
-    for lsti in lst:
-        affSum += lsti
+        #if 'z' in [m.typecode for exp in lst for m in exp.factors.values()
+        #           ]:  # complex expression
+        if any([exp.has_complex_coef() for exp in lst]):
+            affSum = new_param('', cvx.matrix(0., lst[0].size, tc='z'))
+        else:
+            affSum = new_param('', cvx.matrix(0., lst[0].size, tc='d'))
+        for lsti in lst:
+            affSum += lsti
     if not it is None:
         sumstr = '_'
         if not indices is None:
@@ -185,64 +197,195 @@ def sum(lst, it=None, indices=None):
                 sumstr += ',' + str(it[k])
         if not indices is None:
             sumstr += ' in ' + indices + '}'
-        try:
-            indstr = putIndices([l.affstring() for l in lst], it)
-        except Exception:
-            indstr = '[' + str(len(lst)) + \
-                ' expressions (first: ' + lst[0].string + ')]'
-        sumstr += ' ' + indstr
-        sigma = 'Σ'  # 'u'\u03A3'.encode('utf-8')
-        affSum.string = sigma + sumstr
+
+        def sumstring(*strings):
+            try:
+                indstr = putIndices(list(strings), it)
+            except Exception:
+                indstr = '[' + str(len(strings)) + \
+                    ' expressions (first: ' + strings[0] + ')]'
+            sigma = 'Σ'  # 'u'\u03A3'.encode('utf-8')
+            return sigma + sumstr + ' ' + indstr
+
+        affSum._set_string(sumstring, *lst)
     return affSum
 
 
+def _sum_affinexp(lst):
+    """sum of a list of affine expressions of the same size.
+    The (I,J,V) triplets of the coefficient matrices are accumulated
+    for each variable, so that every factor (and the constant) of the
+    sum is built only once, instead of once per summand."""
+    from .expression import AffinExp, _term_string
+    size = lst[0].size
+    if any([exp.has_complex_coef() for exp in lst]):
+        tc = 'z'
+    else:
+        tc = 'd'
+    triplets = {}
+    constant = cvx.matrix(0., (size[0] * size[1], 1), tc)
+    for exp in lst:
+        for var, fact in six.iteritems(exp.factors):
+            if not isinstance(fact, cvx.base.spmatrix):
+                fact = cvx.sparse(fact)
+            if var not in triplets:
+                triplets[var] = ([], [], [], fact.size)
+            I, J, V, _ = triplets[var]
+            I.append(fact.I)
+            J.append(fact.J)
+            if fact.typecode == tc:
+                V.append(fact.V)
+            else:
+                V.append(cvx.matrix(fact.V, tc=tc))
+        if exp.constant is not None:
+            constant += exp.constant
+    factors = {}
+    for var, (I, J, V, fsize) in six.iteritems(triplets):
+        # duplicate (i,j) entries are summed by the spmatrix constructor
+        factors[var] = spmatrix(cvx.matrix(V, tc=tc), cvx.matrix(I, tc='i'),
+                                cvx.matrix(J, tc='i'), fsize, tc)
+    affSum = AffinExp(factors, constant, size)
+    affSum._set_string(lambda *strings: ''.join(
+        [_term_string(st) for st in strings]), *lst)
+    return affSum
+
+
+def _vstack(blocks, ncols):
+    """vertical concatenation of a list of (sparse or dense) matrices
+    with ``ncols`` columns. The (I,J,V) triplets of the blocks are shifted
+    by their row offsets and the sparse matrix is built only once."""
+    I, J, V = [], [], []
+    offset = 0
+    tc = 'd'
+    for blk in blocks:
+        if not isinstance(blk, cvx.base.spmatrix):
+            blk = cvx.sparse(blk)
+        I.append(blk.I + offset)
+        J.append(blk.J)
+        V.append(blk.V)
+        offset += blk.size[0]
+        if blk.typecode == 'z':
+            tc = 'z'
+    if offset == 0:
+        return spmatrix([], [], [], (0, ncols), tc=tc)
+    return spmatrix(cvx.matrix(V, tc=tc), cvx.matrix(I, tc='i'),
+                    cvx.matrix(J, tc='i'), (offset, ncols), tc)
+
+
 def _bsum(lst):
     """builtin sum operator"""
     return builtins.sum(lst)
 
 
 def _break_cols(mat, sizes):
-    n = len(sizes)
-    I, J, V = [], [], []
-    for i in range(n):
-        I.append([])
-        J.append([])
-        V.append([])
-    cumsz = np.cumsum(sizes)
-    import bisect
-    for i, j, v in zip(mat.I, mat.J, mat.V):
-        block = bisect.bisect(cumsz, j)
-        I[block].append(i)
-        V[block].append(v)
-        if block == 0:
-            J[block].append(j)
-        else:
-            J[block].append(j - cumsz[block - 1])
-    return [spmatrix(V[k], I[k], J[k], (mat.size[0], sz))
+    """splits the columns of ``mat`` in blocks of the given sizes"""
+    blocks = _break_blocks(mat, [mat.size[0]], sizes)
+    return [blocks.get((0, k), spmatrix([], [], [], (mat.size[0], sz)))
             for k, sz in enumerate(sizes)]
 
 
 def _break_rows(mat, sizes):
-    n = len(sizes)
-    I, J, V = [], [], []
-    for i in range(n):
-        I.append([])
-        J.append([])
-        V.append([])
-    cumsz = np.cumsum(sizes)
-    import bisect
-    for i, j, v in zip(mat.I, mat.J, mat.V):
-        block = bisect.bisect(cumsz, i)
-        J[block].append(j)
-        V[block].append(v)
-        if block == 0:
-            I[block].append(i)
-        else:
-            I[block].append(i - cumsz[block - 1])
-    return [spmatrix(V[k], I[k], J[k], (sz, mat.size[1]))
+    """splits the rows of ``mat`` in blocks of the given sizes"""
+    blocks = _break_blocks(mat, sizes, [mat.size[1]])
+    return [blocks.get((k, 0), spmatrix([], [], [], (sz, mat.size[1])))
             for k, sz in enumerate(sizes)]
 
 
+def _break_blocks(mat, rowsizes, colsizes):
+    """splits ``mat`` in blocks, given the sizes of the blocks of rows and
+    of columns. Returns a dict ``(i,j) -> block`` holding the nonempty
+    blocks only."""
+    if not len(mat.V):
+        return {}
+    I = np.array(mat.I, dtype=np.int64).ravel()
+    J = np.array(mat.J, dtype=np.int64).ravel()
+    V = np.array(mat.V).ravel()
+    rowcum = np.cumsum(rowsizes)
+    colcum = np.cumsum(colsizes)
+    bi = np.searchsorted(rowcum, I, side='right')
+    bj = np.searchsorted(colcum, J, side='right')
+    I = I - np.r_[0, rowcum][bi]
+    J = J - np.r_[0, colcum][bj]
+    blocks = {}
+    for key, idx in _groups(bi * len(colsizes) + bj):
+        i, j = divmod(key, len(colsizes))
+        blocks[i, j] = _triplets_to_spmatrix(V[idx], I[idx], J[idx],
+                                             (rowsizes[i], colsizes[j]))
+    return blocks
+
+
+def _triplets_to_spmatrix(V, I, J, size):
+    """same as ``spmatrix(V,I,J,size)``. The time taken by the cvxopt
+    constructor grows quadratically with the number of entries in a
+    column, so the transposed matrix is built instead when the rows
+    hold fewer entries than the columns. When both the rows and the
+    columns are dense, the matrix is obtained as the product of two
+    matrices with one entry per column, which takes linear time."""
+    I = np.asarray(I, dtype=np.int64).ravel()
+    J = np.asarray(J, dtype=np.int64).ravel()
+    V = np.asarray(V).ravel()
+    if not len(V):
+        return spmatrix([], [], [], size)
+    colcount = np.bincount(J).astype(float)
+    rowcount = np.bincount(I).astype(float)
+    rowcost = np.dot(rowcount, rowcount)
+    colcost = np.dot(colcount, colcount)
+    if min(rowcost, colcost) > 200 * len(V):
+        K = range(len(V))
+        R = spmatrix(1., I.tolist(), K, (size[0], len(V)))
+        C = spmatrix(V.tolist(), J.tolist(), K, (size[1], len(V)))
+        return R * C.T
+    if rowcost < colcost:
+        return spmatrix(V.tolist(), J.tolist(), I.tolist(),
+                        (size[1], size[0])).T
+    return spmatrix(V.tolist(), I.tolist(), J.tolist(), size)
+
+
+def _groups(keys):
+    """yields the pairs ``(key, idx)``, where ``idx`` are the positions
+    of ``key`` in the integer array ``keys``, in increasing key order.
+    The positions of a key keep their original order."""
+    if len(keys) == 0:
+        return
+    order = np.argsort(keys, kind='mergesort')
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    for s, e in zip(starts.tolist(), ends.tolist()):
+        yield int(keys[s]), order[s:e]
+
+
+def _symmetric_blocks(keys, rows, cols, vals, dims):
+    """builds symmetric matrices from triangular coordinates
+    (the format of the coordinate blocks of a CBF file).
+    Entry ``k`` sets the elements ``(rows[k],cols[k])`` and
+    ``(cols[k],rows[k])`` of the matrix ``keys[k]``, which is of
+    size ``dims[k]``; when an element is set several times, the last
+    value is kept. Returns a list of pairs ``(key, spmatrix)``."""
+    keys = np.repeat(np.asarray(keys, dtype=np.int64), 2)
+    dims = np.repeat(np.asarray(dims, dtype=np.int64), 2)
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    # each entry is followed by its transpose
+    I = np.column_stack((rows, cols)).ravel()
+    J = np.column_stack((cols, rows)).ravel()
+    V = np.repeat(np.asarray(vals, dtype=float), 2)
+    # keep the last value of each element
+    lin = I + J * dims
+    order = np.lexsort((lin, keys))
+    keys, lin = keys[order], lin[order]
+    last = np.r_[(keys[1:] != keys[:-1]) | (lin[1:] != lin[:-1]), True]
+    order = order[last]
+    keys = keys[last]
+    mats = []
+    for key, idx in _groups(keys):
+        idx = order[idx]
+        n = int(dims[idx[0]])
+        mats.append((key, _triplets_to_spmatrix(V[idx], I[idx], J[idx],
+                                                (n, n))))
+    return mats
+
+
 def _block_idx(i, sizes):
     # if there are blocks of sizes n1,...,nk and i is
     # the index of an element of the big vectorized variable,
@@ -250,7 +393,7 @@ def _block_idx(i, sizes):
     cumsz = np.cumsum(sizes)
     import bisect
     block = bisect.bisect(cumsz, i)
-    return block, (i if block == 0 else i - cumsz[block - 1])
+    return block, int(i if block == 0 else i - cumsz[block - 1])
 
 
 def geomean(exp):
@@ -1058,6 +1201,7 @@ def _retrieve_matrix(mat, exSize=None):
                     * :func:`cvxopt matrix <cvxopt:cvxopt.matrix>`
                     * :func:`cvxopt sparse matrix <cvxopt:cvxopt.spmatrix>`
                     * :func:`numpy array <numpy:numpy.array>`
+                    * scipy sparse matrix
                     * ``int`` or ``real`` [creates a vector/matrix of the size exSize *(or of size (1,1) if exSize is None)*,
                       whith all entries equal to **mat**.
                     * following strings:
@@ -1289,6 +1433,14 @@ def _retrieve_matrix(mat, exSize=None):
         if transpose:
             retmat = retmat.T
         retmat *= alpha
+    elif hasattr(mat, 'tocoo'):  # scipy sparse matrix
+        coo = mat.tocoo()
+        if np.iscomplexobj(coo.data):
+            tc = 'z'
+        else:
+            tc = 'd'
+        retmat = spmatrix(coo.data.tolist(), coo.row.tolist(),
+                          coo.col.tolist(), coo.shape, tc)
     else:
         raise NameError('unexpected mat variable')
 
@@ -1551,19 +1703,13 @@ def _svecm1_identity(vtype, size):
         s0 = size[0]
         if size[1] != s0:
             raise ValueError('should be square')
-        I = range(s0 * s0)
-        J = []
-        V = []
-        for i in I:
-            rc = (i % s0, i // s0)
-            (r, c) = (min(rc), max(rc))
-            j = c * (c + 1) // 2 + r
-            J.append(j)
-            if r == c:
-                V.append(1)
-            else:
-                V.append(1 / np.sqrt(2))
-        idmat = spmatrix(V, I, J, (s0 * s0, s0 * (s0 + 1) // 2))
+        I = np.arange(s0 * s0)
+        r = np.minimum(I % s0, I // s0)
+        c = np.maximum(I % s0, I // s0)
+        J = c * (c + 1) // 2 + r
+        V = np.where(r == c, 1., 1 / np.sqrt(2))
+        idmat = spmatrix(V.tolist(), I.tolist(), J.tolist(),
+                         (s0 * s0, s0 * (s0 + 1) // 2))
     elif vtype == 'antisym':
         s0 = size[0]
         if size[1] != s0:
@@ -1589,6 +1735,37 @@ def _svecm1_identity(vtype, size):
     return idmat
 
 
+def _matrix_times_exp(A, exp, size=None):
+    """returns the affine expression ``A*exp[:]``, where ``A`` is a constant
+    matrix (in any format accepted by :func:`_retrieve_matrix`),
+    reshaped to ``size`` (a column vector by default).
+    The product is formed directly on the coefficient matrices of ``exp``."""
+    from .expression import AffinExp, _prod_string
+    if not isinstance(exp, AffinExp):
+        raise Exception('an affine expression is expected')
+    Amat, Astr = _retrieve_matrix(A)
+    n = exp.size[0] * exp.size[1]
+    if Amat.size[1] != n:
+        raise Exception('incompatible dimensions: A has {0} columns, '
+                        'but the expression has {1} elements'.format(
+                            Amat.size[1], n))
+    if size is None:
+        size = (Amat.size[0], 1)
+    if size[0] * size[1] != Amat.size[0]:
+        raise Exception('A has {0} rows, cannot reshape to {1}'.format(
+            Amat.size[0], size))
+    factors = {}
+    for var, fact in six.iteritems(exp.factors):
+        factors[var] = Amat * fact
+    if exp.constant is None:
+        constant = None
+    else:
+        constant = cvx.matrix(Amat * exp.constant)
+    prod = AffinExp(factors, constant, size)
+    prod._set_string(lambda s: _prod_string(Astr, s), exp)
+    return prod
+
+
 def new_param(name, value):
     """
     Declare a parameter for the problem, that will be stored
@@ -1663,63 +1840,51 @@ def new_param(name, value):
         return AffinExp({}, constant=term[:], size=term.size, string=name)
 
 
-def available_solvers():
-    """Lists all available solvers"""
+_available_solvers = None
+"""list of the available solvers, cached by :func:`available_solvers`"""
+
+
+def available_solvers(refresh=False):
+    """Lists all available solvers.
+
+    The solver packages are looked for without being imported (a solver is
+    imported by picos only when it is used), and the list is cached at the
+    first call. Call ``available_solvers(refresh=True)`` to look for the
+    solvers again, e.g. after the installation of a new solver.
+
+    A solver package which is installed but cannot be imported is listed
+    nevertheless. When picos selects a solver for a problem and the import
+    of its package fails, the solver is removed from the list, and the next
+    suitable solver is selected.
+    """
+    global _available_solvers
+    if _available_solvers is None or refresh:
+        _available_solvers = _find_solvers()
+    return list(_available_solvers)
+
+
+def _find_solvers():
+    """looks for the available solvers, cf. :func:`available_solvers`"""
     lst = []
-    try:
-        import cvxopt as co
+    if _module_exists('cvxopt'):
         lst.append('cvxopt')
-        del co
-    except ImportError:
-        pass
-    try:
-        import smcp as sm
+    if _module_exists('smcp'):
         lst.append('smcp')
-        del sm
-    except ImportError:
-        pass
-    try:
-        import mosek7 as mo7
+    if _module_exists('mosek7'):
         lst.append('mosek7')
-        del mo7
-        try:
-            import mosek as mo
-            version7 = not(hasattr(mo, 'cputype'))
-            if not version7:
-                lst.append('mosek6')
-            del mo
-        except ImportError:
-            pass
-    except ImportError:  # only one default mosek available
-        try:
-            import mosek as mo
-            # True if this is the beta version 7 of MOSEK
-            version7 = not(hasattr(mo, 'cputype'))
-            del mo
-            if version7:
-                lst.append('mosek7')
-            else:
-                lst.append('mosek6')
-        except ImportError:
-            pass
-    try:
-        import cplex as cp
+        if _module_exists('mosek') and not _is_mosek7('mosek'):
+            lst.append('mosek6')
+    elif _module_exists('mosek'):  # only one default mosek available
+        if _is_mosek7('mosek'):
+            lst.append('mosek7')
+        else:
+            lst.append('mosek6')
+    if _module_exists('cplex'):
         lst.append('cplex')
-        del cp
-    except (ImportError, SyntaxError):
-        pass
-    try:
-        import pyscipopt as zo
+    if _module_exists('pyscipopt'):
         lst.append('zibopt')
-        del zo
-    except ImportError:
-        pass
-    try:
-        import gurobipy as grb
+    if _module_exists('gurobipy'):
         lst.append('gurobi')
-        del grb
-    except ImportError:
-        pass
     # TRICK to force mosek6 during tests
     # if 'mosek7' in lst:
     #        lst.remove('mosek7')
@@ -1756,6 +1921,64 @@ def available_solvers():
     return lst
 
 
+def _import_solver(name):
+    """imports the package of the solver ``name``, and tells whether this
+    succeeded. If the import fails, the solver is removed from the list of
+    available solvers, cf. :func:`available_solvers`."""
+    if name == 'sdpa':  # external executable
+        return True
+    modules = {'zibopt': 'pyscipopt',
+               'gurobi': 'gurobipy',
+               'mosek6': 'mosek'}
+    module = modules.get(name, name)
+    if name == 'mosek7' and not _module_exists('mosek7'):
+        module = 'mosek'
+    import importlib
+    try:
+        importlib.import_module(module)
+        return True
+    except (ImportError, SyntaxError):
+        if _available_solvers is not None and name in _available_solvers:
+            _available_solvers.remove(name)
+        return False
+
+
+def _module_exists(name):
+    """tells whether the (top-level) module ``name`` can be found,
+    without importing it"""
+    try:
+        from importlib.util import find_spec
+    except ImportError:  # python 2
+        import imp
+        try:
+            imp.find_module(name)
+            return True
+        except ImportError:
+            return False
+    try:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _is_mosek7(name):
+    """tells whether the module ``name`` is the version 7 (or later)
+    of mosek. The version is read in the metadata of the package when
+    possible, otherwise the module is imported."""
+    try:
+        from importlib.metadata import version
+        return int(version(name).split('.')[0]) >= 7
+    except Exception:
+        pass
+    import importlib
+    try:
+        mo = importlib.import_module(name)
+    except ImportError:
+        return False
+    # True if this is the beta version 7 of MOSEK
+    return not(hasattr(mo, 'cputype'))
+
+
 def offset_in_lil(lil, offset, lower):
     """
     substract the ``offset`` from all elements of the
@@ -1776,6 +1999,7 @@ def offset_in_lil(lil, offset, lower):
 def import_cbf(filename):
     """
     Imports the data from a CBF file, and creates a :class:`Problem` object.
+    The file may be gzip-compressed, if its name ends with ``.gz``.
 
     The created problem contains one (multidimmensional) variable
     for each cone specified in the section ``VAR`` of the .cbf file,
@@ -1825,11 +2049,15 @@ def _remove_in_lil(lil, elem):
         lil.remove([])
 
 
-def _quad2norm(qd):
+def _quad2norm(qd, cache=None):
     """
     transform the list of bilinear terms qd
     in an equivalent squared norm
     (x.T Q x) -> ||Q**0.5 x||**2
+
+    Q is factorized separately on each of its connected blocks.
+    If ``cache`` is a dict, the factors are stored in it, so that another
+    quadratic form with the same matrix Q is not factorized again.
     """
     # find all variables
     qdvars = []
@@ -1849,38 +2077,31 @@ def _quad2norm(qd):
         offsets[v] = ofs
         ofs += v.size[0] * v.size[1]
 
-    # construct quadratic matrix
+    # construct quadratic matrix: the blocks are embedded with sparse
+    # products, and Q is symmetrized only once
+    embed = {}
+    for v in qdvars:
+        nv = v.size[0] * v.size[1]
+        embed[v] = spmatrix(1., range(offsets[v], offsets[v] + nv),
+                            range(nv), (ofs, nv))
     Q = spmatrix([], [], [], (ofs, ofs))
-    I, J, V = [], [], []
     for (xi, xj), Qij in six.iteritems(qd):
-        oi = offsets[xi]
-        oj = offsets[xj]
-        Qtmp = spmatrix(Qij.V, Qij.I + oi, Qij.J + oj, (ofs, ofs))
-        Q += 0.5 * (Qtmp + Qtmp.T)
-    # cholesky factorization V.T*V=Q
-    # remove zero rows and cols
-    nz = set(Q.I)
-    P = spmatrix(1., range(len(nz)), list(nz), (len(nz), ofs))
-    Qp = P * Q * P.T
-    try:
-        import cvxopt.cholmod
-        F = cvxopt.cholmod.symbolic(Qp)
-        cvxopt.cholmod.numeric(Qp, F)
-        Z = cvxopt.cholmod.spsolve(F, Qp, 7)
-        V = cvxopt.cholmod.spsolve(F, Z, 4)
-        V = V * P
-    except ArithmeticError:  # Singular or Non-convex, we must work on the dense matrix
-        import cvxopt.lapack
-        sig = cvx.matrix(0., (len(nz), 1), tc='z')
-        U = cvx.matrix(0., (len(nz), len(nz)))
-        cvxopt.lapack.gees(cvx.matrix(Qp), sig, U)
-        sig = sig.real()
-        if min(sig) < -1e-7:
-            raise NonConvexError('I cannot convert non-convex quads to socp')
-        for i in range(len(sig)):
-            sig[i] = max(sig[i], 0)
-        V = cvx.spdiag(sig**0.5) * U.T
-        V = cvx.sparse(V) * P
+        if Qij.size == (ofs, ofs):
+            Q += Qij
+        else:
+            Q += embed[xi] * Qij * embed[xj].T
+    Q = 0.5 * (Q + Q.T)
+
+    if cache is None:
+        V = _psd_factor_by_blocks(Q)
+    else:
+        key = (tuple([v.name for v in qdvars]),
+               np.array(Q.I).tobytes(), np.array(Q.J).tobytes(),
+               np.array(Q.V).tobytes())
+        if key not in cache:
+            cache[key] = _psd_factor_by_blocks(Q)
+        V = cache[key]
+
     allvars = qdvars[0]
     for v in qdvars[1:]:
         if v.size[1] == 1:
@@ -1890,19 +2111,117 @@ def _quad2norm(qd):
     return abs(V * allvars)**2
 
 
+def _psd_factor_by_blocks(Q):
+    """
+    returns a sparse matrix V with V.T*V=Q, for a symmetric positive
+    semidefinite matrix Q. The rows and columns of Q are split in connected
+    blocks, which are factorized independently; V has no row in the
+    nullspace of Q.
+    """
+    n = Q.size[0]
+    QV = np.array(Q.V).ravel()
+    nz = np.flatnonzero(QV)
+    QI = np.array(Q.I).ravel()[nz]
+    QJ = np.array(Q.J).ravel()[nz]
+    QV = QV[nz]
+
+    # label each index with the smallest index of its connected block
+    # in the graph of the nonzero entries of Q
+    lab = np.arange(n)
+    while True:
+        new = lab.copy()
+        np.minimum.at(new, QI, lab[QJ])
+        new = new[new]
+        if (new == lab).all():
+            break
+        lab = new
+
+    # group the indices and the entries of Q by block
+    idx = np.unique(QI)
+    idx = idx[np.argsort(lab[idx], kind='mergesort')]
+    _, idxstart = np.unique(lab[idx], return_index=True)
+    ent = np.argsort(lab[QI], kind='mergesort')
+    _, entstart = np.unique(lab[QI][ent], return_index=True)
+    idxbounds = list(idxstart) + [len(idx)]
+    entbounds = list(entstart) + [len(ent)]
+
+    FI, FJ, FV = [], [], []
+    nrows = 0
+    for b in range(len(idxstart)):
+        bidx = idx[idxbounds[b]:idxbounds[b + 1]]
+        bent = ent[entbounds[b]:entbounds[b + 1]]
+        if len(bidx) == 1:
+            q = QV[bent].sum()
+            if q < -1e-7:
+                raise NonConvexError(
+                    'I cannot convert non-convex quads to socp')
+            if q > 0:
+                FI.append([nrows])
+                FJ.append(bidx)
+                FV.append([q**0.5])
+                nrows += 1
+            continue
+        # bidx is sorted, so the local indices are found by bisection
+        Qb = spmatrix(QV[bent].tolist(),
+                      np.searchsorted(bidx, QI[bent]).tolist(),
+                      np.searchsorted(bidx, QJ[bent]).tolist(),
+                      (len(bidx), len(bidx)))
+        Vb = _psd_factor(Qb)
+        FI.append(np.array(Vb.I).ravel() + nrows)
+        FJ.append(bidx[np.array(Vb.J).ravel()])
+        FV.append(np.array(Vb.V).ravel())
+        nrows += Vb.size[0]
+    if not FV:
+        return spmatrix([], [], [], (0, n))
+    return spmatrix(np.concatenate(FV).tolist(),
+                    np.concatenate(FI).tolist(),
+                    np.concatenate(FJ).tolist(), (nrows, n))
+
+
+def _psd_factor(Q):
+    """
+    returns a sparse matrix V with V.T*V=Q, for a symmetric positive
+    semidefinite matrix Q. A sparse cholesky factorization is tried first;
+    if Q is singular, the factor is obtained from an eigendecomposition,
+    and its rows corresponding to zero eigenvalues are dropped.
+    """
+    try:
+        import cvxopt.cholmod
+        F = cvxopt.cholmod.symbolic(Q)
+        cvxopt.cholmod.numeric(Q, F)
+        Z = cvxopt.cholmod.spsolve(F, Q, 7)
+        return cvxopt.cholmod.spsolve(F, Z, 4)
+    except ArithmeticError:  # Singular or Non-convex
+        import cvxopt.lapack
+        n = Q.size[0]
+        U = cvx.matrix(Q)
+        sig = cvx.matrix(0., (n, 1))
+        cvxopt.lapack.syevd(U, sig, jobz='V')
+        if min(sig) < -1e-7:
+            raise NonConvexError('I cannot convert non-convex quads to socp')
+        tol = max(max(sig), 0) * n * np.finfo(float).eps
+        keep = [i for i in range(n) if sig[i] > tol]
+        if not keep:
+            return spmatrix([], [], [], (0, n))
+        V = cvx.spdiag(cvx.matrix([sig[i]**0.5 for i in keep])) * U[:, keep].T
+        return cvx.sparse(V)
+
+
 def _copy_dictexp_to_new_vars(dct, cvars, complex=None):
     # cf function _copy_exp_to_new_vars for an explanation of the 'complex'
     # argument
+    # the coefficient matrices of expressions are never modified inplace
+    # (they are replaced), so the copy shares them with the original one
     D = {}
     import copy
     for var, value in six.iteritems(dct):
         if isinstance(var, tuple):  # quad
             if var[0].vtype == 'hermitian' or var[1].vtype == 'hermitian':
                 raise Exception('quadratic form involving hermitian variable')
-            D[cvars[var[0].name], cvars[var[1].name]] = copy.copy(value)
+            D[cvars[var[0].name], cvars[var[1].name]] = value
         else:
             if complex is None:
-                D[cvars[var.name]] = copy.copy(value)
+                D[cvars[var.name]] = value
                 continue
 
             if var.vtype == 'hermitian' and (var.name + '_RE') in cvars:
@@ -1923,13 +2242,10 @@ def _copy_dictexp_to_new_vars(dct, cvars, complex=None):
                             [], [], [],
                             (vr.size[0], cvars[var.name + '_IM_utri'].size[0]))
 
-                vv = []
-                for i in range(vr.size[0]):
-                    v = vr[i, :]
-                    AA = cvx.matrix(v, (n, n))
-                    AA = (AA + AA.T) * 0.5  # symmetrize
-                    vv.append(svec(AA).T)
-                D[cvars[var.name + '_RE']] = cvx.sparse(vv)
+                # the rows of vr are vec's of n x n matrices, which are
+                # replaced by the svec of their symmetric part
+                svecsym = _svecm1_identity('symmetric', (n, n))
+                D[cvars[var.name + '_RE']] = _drop_zeros(vr * svecsym)
                 if complex:
                     # compute the imaginary part and append it.
                     if value.typecode == 'z':
@@ -1939,14 +2255,7 @@ def _copy_dictexp_to_new_vars(dct, cvars, complex=None):
                         Him = copy.copy(value)
                         vi = spmatrix([], [], [], Him.size)
 
-                    n = int(vi.size[1]**(0.5))
-                    vv = []
-                    for i in range(vi.size[0]):
-                        v = vi[i, :]
-                        BB = cvx.matrix(v, (n, n))
-                        BB = (BB + BB.T) * 0.5  # symmetrize
-                        vv.append(svec(BB).T)
-                    Hre = cvx.sparse(vv)
+                    Hre = _drop_zeros(vi * svecsym)
 
                     D[cvars[var.name + '_RE']
                       ] = cvx.sparse([D[cvars[var.name + '_RE']], Hre])
@@ -1967,6 +2276,63 @@ def _copy_dictexp_to_new_vars(dct, cvars, complex=None):
     return D
 
 
+def _has_parameters(exp):
+    """returns True if the affine or quadratic expression ``exp``
+    depends on a :class:`Parameter <picos.Parameter>`"""
+    from .expression import AffinExp, QuadExp, Parameter
+    if isinstance(exp, QuadExp):
+        return (any([isinstance(i, Parameter) or isinstance(j, Parameter)
+                     for (i, j) in exp.quad])
+                or _has_parameters(exp.aff))
+    elif isinstance(exp, AffinExp):
+        return any([isinstance(var, Parameter) for var in exp.factors])
+    else:
+        return False
+
+
+def _resolve_parameters(exp):
+    """returns a copy of the affine or quadratic expression ``exp``,
+    where the parameters are replaced by their current value.
+    A bilinear term between a parameter and a variable becomes linear.
+    The matrices of the terms which do not involve a parameter are shared
+    with ``exp``.
+    """
+    from .expression import AffinExp, QuadExp, Parameter
+    if isinstance(exp, QuadExp):
+        if exp.aff is None:
+            aff = AffinExp({}, None, (1, 1), '0')
+        else:
+            aff = _resolve_parameters(exp.aff)
+        quad = {}
+        for (i, j), Q in six.iteritems(exp.quad):
+            ipar = isinstance(i, Parameter)
+            jpar = isinstance(j, Parameter)
+            if ipar and jpar:
+                term = AffinExp({}, i.value[:].T * Q * j.value[:])
+            elif ipar:
+                term = AffinExp({j: cvx.sparse(i.value[:].T * Q)})
+            elif jpar:
+                term = AffinExp({i: cvx.sparse((Q * j.value[:]).T)})
+            else:
+                quad[i, j] = Q
+                continue
+            term.string = ''
+            aff = aff + term
+        if quad:
+            return QuadExp(quad, aff, exp._string)
+        aff._string = exp._string
+        return aff
+    factors = {}
+    constant = exp.constant
+    for var, fac in six.iteritems(exp.factors):
+        if isinstance(var, Parameter):
+            term = fac * var.value[:]
+            constant = term if constant is None else constant + term
+        else:
+            factors[var] = fac
+    return AffinExp(factors, constant, exp.size, exp._string)
+
+
 def _copy_exp_to_new_vars(exp, cvars, complex=None):
     # if complex=None (default), the expression is copied "as is"
     # if complex=False, the exp is assumed to be real_valued and
@@ -1987,7 +2353,7 @@ def _copy_exp_to_new_vars(exp, cvars, complex=None):
         else:
             v = exp.constant
         if complex is None:
-            newcons = copy.copy(v)
+            newcons = v  # shared, cf. _copy_dictexp_to_new_vars
             newsize = exp.size
         elif complex:
             if v.typecode == 'z':
@@ -2017,7 +2383,7 @@ def _copy_exp_to_new_vars(exp, cvars, complex=None):
             return QuadExp(newqds, newaff, exp.string, (LR0, LR1))
     elif isinstance(exp, GeneralFun):
         newexp = _copy_exp_to_new_vars(exp.Exp, cvars, complex=complex)
-        return LogSumExp(exp.fun, newexp, exp.funstring)
+        return GeneralFun(exp.fun, newexp, exp.funstring)
     elif isinstance(exp, GeoMeanExp):
         newexp = _copy_exp_to_new_vars(exp.exp, cvars, complex=complex)
         return GeoMeanExp(newexp)
@@ -2071,34 +2437,59 @@ def _cplx_vecmat_to_real_vecmat(M, sym=True, times_i=False):
         raise NameError('first dimension must be a perfect square')
     m = int(m)
 
-    vv = []
     if sym:
         nn = M.size[1]
         n = nn**0.5
         if int(n) != n:
             raise NameError('2d dimension must be a perfect square')
         n = int(n)
+        # the kth column is the combination of the columns of M which
+        # correspond to the kth element of the svec of the variable
+        M = M * _svecm1_identity('symmetric', (n, n))
 
-        for k in range(n * (n + 1) // 2):
-            j = int(np.sqrt(1 + 8 * k) - 1) // 2
-            i = k - j * (j + 1) // 2
-            if i == j:
-                v = M[:, n * i + i]
-            else:
-                i1 = n * i + j
-                i2 = n * j + i
-                v = (M[:, i1] + M[:, i2]) * (1. / (2**0.5))
-            vvv = _cplx_mat_to_real_mat(cvx.matrix(v, (m, m)))[:]
-            vv.append([vvv])
-
+    blocks_re, blocks_im = _cplx_to_real_blocks(m)
+    if M.typecode == 'z':
+        R = blocks_re * M.real() + blocks_im * M.imag()
     else:
-        for i in range(M.size[1]):
-            v = M[:, i]
-            A = cvx.matrix(v, (m, m))
-            vvv = _cplx_mat_to_real_mat(A)[:]  # TODO 0.5*(A+A.H) instead ?
-            vv.append([vvv])
+        R = blocks_re * M
+    return _drop_zeros(R)
+
 
-    return cvx.sparse(vv)
+def _cplx_to_real_blocks(m):
+    """
+    returns the two sparse matrices ``(P, Q)`` such that for all m x m real
+    matrices A and B, ``P*vec(A)+Q*vec(B)`` is the vectorization of
+    the block matrix [A,-B;B,A]
+    """
+    r, c = np.meshgrid(np.arange(m), np.arange(m), indexing='ij')
+    src = (r + m * c).ravel(order='F').tolist()
+    r = r.ravel(order='F')
+    c = c.ravel(order='F')
+    topleft = (r + 2 * m * c).tolist()
+    botright = (r + m + 2 * m * (c + m)).tolist()
+    botleft = (r + m + 2 * m * c).tolist()
+    topright = (r + 2 * m * (c + m)).tolist()
+    P = spmatrix([1.] * (2 * m * m), topleft + botright, src + src,
+                 (4 * m * m, m * m))
+    Q = spmatrix([1.] * (m * m) + [-1.] * (m * m), botleft + topright,
+                 src + src, (4 * m * m, m * m))
+    return P, Q
+
+
+def _drop_zeros(M):
+    """
+    returns a sparse copy of the matrix M, without the explicit zeros
+    that may result from sparse products
+    """
+    if not isinstance(M, cvx.base.spmatrix):
+        return cvx.sparse(M)
+    V = np.array(M.V).ravel()
+    keep = np.flatnonzero(V)
+    if len(keep) == len(V):
+        return M
+    I = np.array(M.I).ravel()[keep].tolist()
+    J = np.array(M.J).ravel()[keep].tolist()
+    return spmatrix(V[keep].tolist(), I, J, M.size, M.typecode)
 
 
 def _is_idty(mat, vtype='continuous'):
@@ -2801,6 +3192,10 @@ class _NonWritableDict(dict):
         for key in self.keys():
             self._del(key)
 
+    def __reduce__(self):
+        # the default protocol of dict would call __setitem__
+        return (_NonWritableDict, (dict(self),))
+
 
 class QuadAsSocpError(Exception):
     """
@@ -260,4 +260,608 @@ solstr = """
 
 assert(cleanspace(str(U))==cleanspace(solstr))
 
+#--------------------------------------------------#
+#  CBF import without (or with empty) coordinates  #
+#--------------------------------------------------#
+
+import os
+import tempfile
+cbfdir = tempfile.mkdtemp()
+
+def import_cbf_string(name, content):
+    filename = os.path.join(cbfdir, name)
+    with open(filename, 'w') as f:
+        f.write(content)
+    return pic.import_cbf(filename)
+
+cbf_head = 'VER\n1\n\nOBJSENSE\nMIN\n\nVAR\n3 1\nF 3\n\nCON\n3 1\nQ 3\n\nOBJACOORD\n1\n0 1.0\n\n'
+
+# no BCOORD section (homogeneous cone constraint)
+P, x, X, data = import_cbf_string('nob.cbf', cbf_head +
+    'ACOORD\n3\n0 0 1.0\n1 1 2.0\n2 2 3.0\n')
+assert(len(P.constraints) == 1 and P.numberOfVars == 3)
+x[0].value = [3, 1, 1]
+assert(list((P.constraints[0].Exp1 // P.constraints[0].Exp2).value) == [2., 3., 3.])
+
+# ACOORD with no entries
+P, x, X, data = import_cbf_string('emptya.cbf', cbf_head +
+    'ACOORD\n0\n\nBCOORD\n1\n0 1.0\n')
+assert(len(P.constraints) == 1 and P.numberOfVars == 3)
+x[0].value = [3, 1, 1]
+assert(list((P.constraints[0].Exp1 // P.constraints[0].Exp2).value) == [0., 0., 1.])
+
+#------------------------------------------#
+#  general objective function (SQP method) #
+#------------------------------------------#
+
+def expsum(X=None):
+    if X is None:
+        return 'expsum'
+    v = np.exp(np.array(X).ravel())
+    return float(v.sum()), cvx.matrix(v), cvx.spdiag(cvx.matrix(v))
+
+P = pic.Problem()
+x = P.add_variable('x', 3)
+P.add_constraint((1 | x) > 1)
+P.set_objective('min', x.apply_function(expsum))
+P.solve(solver=SOLVER, verbose=0)
+assert(cvxcomp(x.value, cvx.matrix(1. / 3, (3, 1))) < 1e-4)
+
+#----------------------------#
+#  lazy and disabled strings #
+#----------------------------#
+
+for mode, expected in ((True, 'diag(2.0*x + 1.0)'), ('lazy', 'diag(2.0*x + 1.0)'), (False, '?')):
+    P = pic.Problem(strings=mode)
+    x = P.add_variable('x', 1)
+    d = (2 * x + 1).diag(3)
+    assert((mode == 'lazy') == (not isinstance(d._string, str)))
+    assert(d.string == expected)
+
+#-------------------#
+#  solver portfolio #
+#-------------------#
+
+P = pic.Problem()
+x = P.add_variable('x', 2)
+P.add_constraint(x > 1)
+P.set_objective('min', 1 | x)
+# a single suitable solver is run in this process
+sol = P.solve(solver='race', verbose=0)
+assert(sol['solver'] in pic.tools.available_solvers())
+assert(P.options['solver'] == 'race')
+assert(abs(sol['obj'] - 2) < 1e-6)
+# a solver which fails loses the race; duplicates are run once
+x.value = [0, 0]
+sol = P.solve(solver='race', race_solvers=['nosolver', SOLVER, SOLVER], verbose=0)
+assert(sol['solver'] == SOLVER and P.status == 'optimal')
+assert(cvxcomp(x.value, cvx.matrix([1., 1.])) < 1e-6)
+
+#---------------------#
+#  feasibility report #
+#---------------------#
+
+P = pic.Problem()
+x = P.add_variable('x', 2)
+X = P.add_variable('X', (2, 2), 'symmetric')
+c1 = P.add_constraint(x + 0 > 1, ret=True)
+c2 = P.add_constraint(abs(x) < 2, ret=True)
+c3 = P.add_constraint((x | 1) == 4, ret=True)
+c4 = P.add_constraint(X >> 0, ret=True)
+x.value = [1, 2]
+X.value = [[1, 0], [0, -0.5]]
+viol = P.feasibility_report()
+assert(max([abs(v - w) for v, w in zip(viol, [0., 5**0.5 - 2, 1., 0.5])]) < 1e-8)
+assert(max([abs(v - _slack_viol) for v, _slack_viol in zip(viol, [
+    max(0, -min(c1.slack)), max(0, -c2.slack[0]), max(abs(c3.slack)),
+    max(0, -min(np.linalg.eigvalsh(np.array(c4.slack))))])]) < 1e-8)
+assert(not P.check_current_value_feasibility()[0])
+# the report follows an expression modified after it was added
+c1.Exp1 += x
+assert(abs(P.feasibility_report()[0]) < 1e-8)
+x.value = [0.2, 0.4]
+assert(abs(P.feasibility_report()[0] - 0.6) < 1e-8)
+
+#----------------------#
+#  asynchronous solves #
+#----------------------#
+
+import time
+from concurrent.futures import CancelledError
+
+def sdp_problem(n):
+    P = pic.Problem()
+    x = P.add_variable('x', n)
+    X = P.add_variable('X', (n, n), 'symmetric')
+    P.add_constraint(abs(x) < 1)
+    P.add_constraint(X >> 0)
+    P.add_constraint(pic.trace(X) == 1)
+    P.set_objective('max', (1 | x) + (X | cvx.matrix(1., (n, n))))
+    return P
+
+# the solution is written back only when it is collected
+P = sdp_problem(5)
+future = P.solve_async(solver=SOLVER, verbose=0)
+while not future.done():
+    time.sleep(0.01)
+assert(P.status == 'unsolved' and not P.get_variable('x').is_valued())
+assert(P.constraints[0].dual is None)
+sol = future.result()
+assert(P.status == 'optimal' and abs(sol['obj'] - (5 + 5**0.5)) < 1e-5)
+assert(P.get_variable('x').is_valued() and P.constraints[0].dual is not None)
+
+# concurrent solves keep their own cvxopt options
+cvxopt_options = dict(cvx.solvers.options)
+P1, P2 = sdp_problem(20), sdp_problem(20)
+f1 = P1.solve_async(solver=SOLVER, verbose=0, maxit=1)
+f2 = P2.solve_async(solver=SOLVER, verbose=0)
+assert(f1.result()['status'] != 'optimal' and f2.result()['status'] == 'optimal')
+assert(cvx.solvers.options == cvxopt_options)
+
+# cancellation
+P = sdp_problem(40)
+future = P.solve_async(solver=SOLVER, verbose=0)
+assert(future.cancel())
+try:
+    future.result()
+    assert(False)
+except CancelledError:
+    pass
+assert(P.status == 'unsolved' and not P.get_variable('x').is_valued())
+
+#-----------------------------------------#
+#  sum of affine expressions (triplets)   #
+#-----------------------------------------#
+
+P = pic.Problem()
+x = P.add_variable('x', 3)
+Y = P.add_variable('Y', (3, 3))
+terms = [cvx.matrix(range(9), (3, 3), 'd') * x + i for i in range(4)]
+terms += [Y[:, i] - 2 * x for i in range(3)] + [3 * Y[:, 0]]
+iterative = terms[0] + 0
+for t in terms[1:]:
+    iterative += t
+summed = pic.sum(terms)
+x.value = [1, -2, 0.5]
+Y.value = cvx.matrix(range(9), (3, 3), 'd') / 7.
+assert(cvxcomp(summed.value, iterative.value) < 1e-12)
+assert(set(summed.factors) == set(iterative.factors))
+for var in summed.factors:
+    assert(cvxcomp(cvx.matrix(summed.factors[var]), cvx.matrix(iterative.factors[var])) < 1e-12)
+assert(cvxcomp(summed.constant, iterative.constant) < 1e-12)
+# the terms are not modified by the sum
+assert(cvxcomp(terms[4].value, (Y[:, 0] - 2 * x).value) < 1e-12)
+
+#------------------------------#
+#  matrix-form constraint API  #
+#------------------------------#
+
+def matrix_form_problems(matrix_form):
+    P = pic.Problem()
+    x = P.add_variable('x', 3)
+    A = cvx.matrix([[1., 2., 0.], [0., 1., 1.], [1., 0., 3.]])
+    B = cvx.matrix([[1., 0.], [0., 1.], [1., 1.]])
+    c = cvx.matrix([0., 0., 1.])
+    F = cvx.sparse([[1., 0., 0., 0.], [0., 0., 0., 1.], [0., 1., 1., 0.]])
+    F0 = cvx.matrix([[2., 0.], [0., 1.]])
+    if matrix_form:
+        P.add_linear_constraints(A, x, '<', [4, 5, 6])
+        P.add_linear_constraints(cvx.matrix([[1., 1., 1.]]).T, x, '=', 1)
+        P.add_soc_constraint(B, x, [0.1, 0.2], c, 2)
+        P.add_psd_constraint(F, x, F0)
+    else:
+        AA = pic.new_param('A', A)
+        P.add_constraint(AA * x < cvx.matrix([4., 5., 6.]))
+        P.add_constraint((1 | x) == 1)
+        P.add_constraint(abs(pic.new_param('B', B) * x + cvx.matrix([0.1, 0.2])) < (c | x) + 2)
+        P.add_constraint(x[0] * cvx.matrix([[1., 0.], [0., 0.]])
+                         + x[1] * cvx.matrix([[0., 0.], [0., 1.]])
+                         + x[2] * cvx.matrix([[0., 1.], [1., 0.]]) + F0 >> 0)
+    P.set_objective('max', x[0] - x[1] + 2 * x[2])
+    return P, x
+
+P1, x1 = matrix_form_problems(True)
+P2, x2 = matrix_form_problems(False)
+P1.solve(solver=SOLVER, verbose=0)
+P2.solve(solver=SOLVER, verbose=0)
+assert(P1.status == P2.status == 'optimal')
+assert(abs(P1.obj_value() - P2.obj_value()) < 1e-6)
+assert(cvxcomp(x1.value, x2.value) < 1e-5)
+for c1, c2 in zip(P1.constraints, P2.constraints):
+    assert(cvxcomp(cvx.matrix(c1.dual), cvx.matrix(c2.dual)) < 1e-5)
+
+#-------------#
+#  parameters #
+#-------------#
+
+P = pic.Problem()
+x = P.add_variable('x', 2)
+b = P.add_parameter('b', [1, 2])
+c = P.add_parameter('c', [1, 1])
+P.add_constraint(x > b)
+P.add_constraint(abs(x - b) < 3)
+P.set_objective('min', c | x)
+P.solve(solver=SOLVER, verbose=0)
+assert(abs(P.obj_value() - 3) < 1e-6)
+assert(cvxcomp(x.value, cvx.matrix([1., 2.])) < 1e-6)
+# the constraints and the objective follow the new values
+b.value = [-1, 4]
+c.value = [2, 3]
+P.solve(solver=SOLVER, verbose=0)
+assert(abs(P.obj_value() - 10) < 1e-6)
+assert(cvxcomp(x.value, cvx.matrix([-1., 4.])) < 1e-6)
+# same result as a problem built with the new values
+Q = pic.Problem()
+y = Q.add_variable('x', 2)
+Q.add_constraint(y > cvx.matrix([-1., 4.]))
+Q.add_constraint(abs(y - cvx.matrix([-1., 4.])) < 3)
+Q.set_objective('min', cvx.matrix([2., 3.]) | y)
+Q.solve(solver=SOLVER, verbose=0)
+assert(abs(P.obj_value() - Q.obj_value()) < 1e-6)
+assert(cvxcomp(cvx.matrix(P.constraints[0].dual), cvx.matrix(Q.constraints[0].dual)) < 1e-5)
+
+#-------------#
+#  solve_many #
+#-------------#
+
+def small_lp(k):
+    P = pic.Problem()
+    x = P.add_variable('x', 2)
+    P.add_constraint(x > k)
+    P.add_constraint((1 | x) < 10, key='budget')
+    P.set_objective('min', (1 | x))
+    return P
+
+problems = [small_lp(k) for k in range(3)]
+sols = pic.solve_many(problems, workers=2, solver=SOLVER, verbose=0)
+for k, (P, sol) in enumerate(zip(problems, sols)):
+    assert(abs(sol['obj'] - 2 * k) < 1e-6)
+    assert(P.status == 'optimal')
+    assert(cvxcomp(P.get_variable('x').value, cvx.matrix([k, k], tc='d')) < 1e-6)
+    assert(P.constraints[0].dual is not None)
+
+#-----------#
+#  pickling #
+#-----------#
+
+import copy
+import pickle
+
+P = pic.Problem()
+x = P.add_variable('x', 3)
+X = P.add_variable('X', (2, 2), 'symmetric')
+b = P.add_parameter('b', [1, 2, 3])
+P.add_constraint(x > b, key='lower')
+P.add_constraint(abs(x) < 10)
+P.add_constraint(X >> 0)
+P.add_constraint(pic.trace(X) == 1)
+P.set_objective('min', (1 | x) + (X | cvx.matrix([[1., 2.], [2., 3.]])))
+P.solve(solver=SOLVER, verbose=0)
+
+Q, y = pickle.loads(pickle.dumps((P, x)))
+assert(y is Q.get_variable('x'))
+assert(str(Q) == str(P))
+assert(Q.status == P.status)
+assert(cvxcomp(y.value, x.value) < 1e-12)
+assert(cvxcomp(Q.get_variable('X').value, X.value) < 1e-12)
+for c1, c2 in zip(P.constraints, Q.constraints):
+    assert(c1.key == c2.key)
+    assert(cvxcomp(cvx.matrix(c1.dual), cvx.matrix(c2.dual)) < 1e-12)
+# the copy solves like the original, and keeps its parameters
+Q.parameters['b'].value = [2, 2, 2]
+Q.solve(solver=SOLVER, verbose=0)
+P.parameters['b'].value = [2, 2, 2]
+P.solve(solver=SOLVER, verbose=0)
+assert(abs(Q.obj_value() - P.obj_value()) < 1e-6)
+assert(str(copy.deepcopy(P)) == str(P))
+
+#-----------------------------------------#
+#  compiled expressions and solution pool #
+#-----------------------------------------#
+
+P = pic.Problem()
+x = P.add_variable('x', 3)
+S = P.add_variable('S', (2, 2), 'symmetric')
+M = pic.new_param('M', cvx.matrix(range(6), (2, 3), 'd'))
+exps = [M * x + 1, abs(x - 1), x[0] * x[1] + (x | x) - 2 * x[2],
+        S[0, 1] + pic.trace(S), pic.lse(x), pic.geomean(x)]
+kpis = P.compile_expressions(exps)
+x.value = [1, 2, 3]
+S.value = [[1, -1], [-1, 4]]
+for value, exp in zip(kpis.eval(), exps):
+    assert(cvxcomp(cvx.matrix(value), cvx.matrix(exp.value)) < 1e-10)
+# values of a pool of 3 solutions
+for k in range(3):
+    P.set_var_value((k, 'x'), [k + 1, 3 - k, 2 * k + 1])
+    P.set_var_value((k, 'S'), [[k, 1], [1, k + 2]])
+pool = kpis.eval_pool()
+for col, exp in zip(pool, exps):
+    assert(col.size[1] == 3)
+    for k in range(3):
+        assert(cvxcomp(col[:, k], cvx.matrix(exp.eval(k))[:]) < 1e-10)
+
+#-------------#
+#  LP writer  #
+#-------------#
+
+import gzip
+
+writedir = tempfile.mkdtemp()
+
+def written_lines(filename):
+    if filename.endswith('.gz'):
+        with gzip.open(filename, 'rt') as f:
+            lines = f.read().splitlines()
+    else:
+        with open(filename) as f:
+            lines = f.read().splitlines()
+    return lines[1:]  # the first line holds the name of the file
+
+def writer_lp_problem():
+    P = pic.Problem()
+    x = P.add_variable('x', 3)
+    y = P.add_variable('y', 2)
+    P.add_constraint(cvx.matrix([[1., 2.], [0., 1.], [3., 0.]]) * x < cvx.matrix([4., 5.]))
+    P.add_constraint((1 | x) + y[0] == 2)
+    P.add_constraint(y > -1)
+    P.set_objective('max', x[0] - 2 * x[1] + 3 * x[2] + y[1])
+    return P
+
+expected_lp = """Maximize
+obj : 1 x(0)-2 x(1)+ 3 x(2)+ 1 y(1)
+Subject To
+eq0 : 1 x(0)+ 1 x(1)+ 1 x(2)+ 1 y(0) = 2
+in0 : 1 x(0)+ 3 x(2) <= 4
+in1 : 2 x(0)+ 1 x(1) <= 5
+in2 : -1 y(0) <= 1
+in3 : -1 y(1) <= 1
+Bounds
+x(0) free
+x(1) free
+x(2) free
+y(0) free
+y(1) free
+Generals
+Binaries
+End
+""".splitlines()
+
+P = writer_lp_problem()
+lpfile = os.path.join(writedir, 'p.lp')
+P.write_to_file(lpfile)
+assert(written_lines(lpfile) == expected_lp)
+# writing again gives the same file (the objective is not flipped twice)
+P.write_to_file(lpfile)
+assert(written_lines(lpfile) == expected_lp)
+P.write_to_file(lpfile + '.gz')
+assert(written_lines(lpfile + '.gz') == expected_lp)
+
+#-------------------------#
+#  CBF and SDPA writers   #
+#-------------------------#
+
+def writer_conic_problem():
+    P = pic.Problem()
+    x = P.add_variable('x', 3)
+    X = P.add_variable('X', (2, 2), 'symmetric')
+    P.add_constraint(abs(x[:2] - 1) < x[2])
+    P.add_constraint(X >> 0)
+    P.add_constraint(X + x[0] * cvx.matrix([[1., 0.5], [0.5, 0.]]) << 3)
+    P.add_constraint((1 | x) + pic.trace(X) == 1)
+    P.set_objective('min', x[2] + (X | cvx.matrix([[1., 2.], [2., 1.]])))
+    return P
+
+expected_cbf = """VER
+1
+
+OBJSENSE
+MIN
+
+VAR
+6 2
+F 3
+F 3
+
+CON
+4 2
+Q 3
+L= 1
+
+PSDCON
+2
+2
+2
+
+OBJACOORD
+4
+2 1.0
+3 1.0
+4 2.82842712474619
+5 1.0
+
+ACOORD
+8
+0 2 1.0
+1 0 1.0
+2 1 1.0
+3 0 1.0
+3 1 1.0
+3 2 1.0
+3 3 1.0
+3 5 1.0
+
+BCOORD
+3
+1 -1.0
+2 -1.0
+3 -1.0
+
+HCOORD
+8
+0 3 0 0 1.0
+0 4 1 0 0.7071067811865475
+0 5 1 1 1.0
+1 0 0 0 -1.0
+1 3 0 0 -1.0
+1 0 1 0 -0.5
+1 4 1 0 -0.7071067811865475
+1 5 1 1 -1.0
+
+DCOORD
+3
+1 0 0 3.0
+1 1 0 3.0
+1 1 1 3.0
+
+""".splitlines()
+
+expected_sdpa = """6 = number of vars
+4 = number of blocs
+(-2, 3, 2, 2) = BlocStructure
+{0.0, 0.0, 1.0, 1.0, 2.82842712474619, 1.0}
+0	1	1	1	-1.0
+0	1	2	2	1.0
+0	2	1	3	1.0
+0	2	2	3	1.0
+0	4	1	1	-3.0
+0	4	1	2	-3.0
+0	4	2	2	-3.0
+1	1	1	1	-1.0
+1	1	2	2	1.0
+1	2	1	3	1.0
+1	4	1	1	-1.0
+1	4	1	2	-0.5
+2	1	1	1	-1.0
+2	1	2	2	1.0
+2	2	2	3	1.0
+3	1	1	1	-1.0
+3	1	2	2	1.0
+3	2	1	1	1.0
+3	2	2	2	1.0
+3	2	3	3	1.0
+4	1	1	1	-1.0
+4	1	2	2	1.0
+4	3	1	1	1.0
+4	4	1	1	-1.0
+5	3	1	2	0.7071067811865475
+5	4	1	2	-0.7071067811865475
+6	1	1	1	-1.0
+6	1	2	2	1.0
+6	3	2	2	1.0
+6	4	2	2	-1.0
+""".splitlines()
+
+for ext, expected in (('.cbf', expected_cbf), ('.dat-s', expected_sdpa)):
+    for gz in ('', '.gz'):
+        filename = os.path.join(writedir, 'p' + ext + gz)
+        writer_conic_problem().write_to_file(filename)
+        assert(written_lines(filename) == expected)
+
+#-------------------------#
+#  CBF round trip         #
+#-------------------------#
+
+P = pic.Problem()
+x = P.add_variable('x', 3)
+X = P.add_variable('X', (2, 2), 'symmetric')
+P.add_constraint(abs(x[:2] - 1) < x[2])
+P.add_constraint(X >> 0)
+P.add_constraint(X + x[0] * cvx.matrix([[1., 0.5], [0.5, 1.]]) << 3)
+P.add_constraint((1 | x) + pic.trace(X) == 1)
+P.set_objective('min', x[2] + (X | cvx.matrix([[2., 1.], [1., 2.]])))
+cbffile = os.path.join(writedir, 'roundtrip.cbf')
+P.write_to_file(cbffile)
+# the HCOORD entries of the PSD constraint refer to scalar variables
+# outside of the first variable block
+lines = written_lines(cbffile)
+hcoord = lines[lines.index('HCOORD') + 2:lines.index('DCOORD') - 1]
+assert(any(int(l.split()[1]) >= 3 for l in hcoord))
+Q, x, X, data = pic.tools.import_cbf(cbffile)
+P.solve(solver=SOLVER, verbose=0)
+Q.solve(solver=SOLVER, verbose=0)
+assert(abs(P.obj_value() - Q.obj_value()) < 1e-5)
+
+#-------------------------#
+#  available solvers      #
+#-------------------------#
+
+solvers = pic.tools.available_solvers()
+assert(SOLVER in solvers)
+solvers.append('nosolver')
+assert('nosolver' not in pic.tools.available_solvers())
+assert(pic.tools.available_solvers(refresh=True) == solvers[:-1])
+assert(pic.tools.available_solvers() == solvers[:-1])
+
+import sys
+# a solver package which is installed but cannot be imported
+brokendir = tempfile.mkdtemp()
+os.mkdir(os.path.join(brokendir, 'cplex'))
+with open(os.path.join(brokendir, 'cplex', '__init__.py'), 'w') as f:
+    f.write('raise ImportError("broken installation")\n')
+sys.path.insert(0, brokendir)
+assert('cplex' in pic.tools.available_solvers(refresh=True))
+P = pic.Problem()
+x = P.add_variable('x', 2)
+P.add_constraint(x > 1)
+P.set_objective('min', 1 | x)
+P.solve(verbose=0)
+assert(P.options['solver'] == SOLVER)
+assert(abs(P.obj_value() - 2) < 1e-6)
+assert('cplex' not in pic.tools.available_solvers())
+sys.path.remove(brokendir)
+assert(pic.tools.available_solvers(refresh=True) == solvers[:-1])
+
+#-------------------------#
+#  building G and h       #
+#-------------------------#
+
+# one constraint over many variables (the time used to grow quadratically
+# with the number of variables)
+P = pic.Problem()
+xs = [P.add_variable('x{0}'.format(i), 1) for i in range(16000)]
+P.add_constraint(pic.sum(xs) < 1)
+start = time.time()
+P._make_cvxopt_instance()
+assert(time.time() - start < 2.)
+
+# factors with dense rows and dense columns
+P = pic.Problem()
+y = P.add_variable('y', 2)
+X = P.add_variable('X', (20, 20), 'symmetric')
+A = cvx.normal(400, 210)
+G, h = P._makeGandh(pic.AffinExp({X: A}, size=(20, 20)) + y[0])
+assert(cvxcomp(G[:, 2:], A) < 1e-10)
+assert(cvxcomp(G[:, :2], cvx.matrix([[1.] * 400, [0.] * 400])) < 1e-10)
+
+#-------------------------#
+#  SDPA temporary files   #
+#-------------------------#
+
+# the temporary directory of a run is removed if the problem cannot be
+# written
+sdpadir = tempfile.mkdtemp()
+fake_sdpa = os.path.join(sdpadir, 'sdpa')
+with open(fake_sdpa, 'w') as f:
+    f.write('#!/bin/sh\n')
+os.chmod(fake_sdpa, 0o755)
+P = pic.Problem()
+x = P.add_variable('x', 2)
+P.add_constraint(x > 1)
+P.set_objective('min', 1 | x)
+
+def failing_writer(filename):
+    raise IOError('disk full')
+
+P._write_sdpa = failing_writer
+old_tempdir = tempfile.tempdir
+tempfile.tempdir = sdpadir
+try:
+    P._make_sdpaopt(fake_sdpa)
+    assert(False)
+except IOError:
+    pass
+finally:
+    tempfile.tempdir = old_tempdir
+assert(os.listdir(sdpadir) == ['sdpa'])
+
 print('everything seems to work fine')
\ No newline at end of file